@@ -5,6 +5,14 @@ from sqlalchemy import pool
 from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import async_engine_from_config
 
+import app.models.attachment  # noqa: F401 - register tables on Base.metadata
+import app.models.audit  # noqa: F401
+import app.models.data_migration  # noqa: F401
+import app.models.id_sequence  # noqa: F401
+import app.models.item  # noqa: F401
+import app.models.job  # noqa: F401
+import app.models.tag  # noqa: F401
+import app.models.user  # noqa: F401
 from alembic import context  # type: ignore
 from app.core.database import Base
 
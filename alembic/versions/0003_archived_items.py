@@ -0,0 +1,65 @@
+"""Item archive and items.updated_at
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 12:00:02.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from fastapi_users_db_sqlalchemy.generics import GUID
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing items count as updated now, so none is archived right away.
+    updated_at = sa.Column(
+        "updated_at",
+        sa.DateTime(),
+        nullable=False,
+        server_default=sa.func.current_timestamp(),
+    )
+    if op.get_bind().dialect.name == "sqlite":
+        # SQLite can't ADD COLUMN with a non-constant default: copy the table.
+        with op.batch_alter_table("items", recreate="always") as batch_op:
+            batch_op.add_column(updated_at)
+    else:
+        op.add_column("items", updated_at)
+    op.create_index("ix_items_updated_at", "items", ["updated_at"], unique=False)
+
+    op.create_table(
+        "archived_items",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(length=100), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("owner_id", GUID(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("archived_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["owner_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_archived_items_owner_id"),
+        "archived_items",
+        ["owner_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_archived_items_owner_id"), table_name="archived_items")
+    op.drop_table("archived_items")
+    op.drop_index("ix_items_updated_at", table_name="items")
+    with op.batch_alter_table("items") as batch_op:
+        batch_op.drop_column("updated_at")
@@ -0,0 +1,57 @@
+"""Item attachments
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 12:00:04.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from fastapi_users_db_sqlalchemy.generics import GUID
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "attachments",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("item_id", sa.Integer(), nullable=False),
+        sa.Column("owner_id", GUID(), nullable=False),
+        sa.Column("filename", sa.String(length=255), nullable=False),
+        sa.Column("content_type", sa.String(length=255), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("sha256", sa.String(length=64), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["item_id"], ["items.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["owner_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_attachments_owner_item",
+        "attachments",
+        ["owner_id", "item_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_attachments_sha256"),
+        "attachments",
+        ["sha256"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_attachments_sha256"), table_name="attachments")
+    op.drop_index("ix_attachments_owner_item", table_name="attachments")
+    op.drop_table("attachments")
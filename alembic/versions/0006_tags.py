@@ -0,0 +1,55 @@
+"""Item tags
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 12:00:05.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from fastapi_users_db_sqlalchemy.generics import GUID
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "tags",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("owner_id", GUID(), nullable=False),
+        sa.Column("name", sa.String(length=50), nullable=False),
+        sa.Column("item_count", sa.Integer(), server_default="0", nullable=False),
+        sa.ForeignKeyConstraint(["owner_id"], ["user.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("owner_id", "name", name="uq_tags_owner_name"),
+    )
+    op.create_table(
+        "item_tags",
+        sa.Column("item_id", sa.Integer(), nullable=False),
+        sa.Column("tag_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["item_id"], ["items.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["tag_id"], ["tags.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("item_id", "tag_id"),
+    )
+    op.create_index(
+        "ix_item_tags_tag_item",
+        "item_tags",
+        ["tag_id", "item_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_item_tags_tag_item", table_name="item_tags")
+    op.drop_table("item_tags")
+    op.drop_table("tags")
@@ -0,0 +1,52 @@
+"""Audit log
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 12:00:06.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "audit_events",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("at", sa.DateTime(), nullable=False),
+        sa.Column("actor_id", sa.Uuid(), nullable=True),
+        sa.Column("action", sa.String(length=50), nullable=False),
+        sa.Column("target_id", sa.String(length=64), nullable=True),
+        sa.Column("details", sa.JSON(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_audit_events_action_id",
+        "audit_events",
+        ["action", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_audit_events_actor_id_id",
+        "audit_events",
+        ["actor_id", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_audit_events_actor_id_id", table_name="audit_events")
+    op.drop_index("ix_audit_events_action_id", table_name="audit_events")
+    op.drop_table("audit_events")
@@ -0,0 +1,61 @@
+"""Archived item versions; attachments of archived items
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 12:00:09.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# SQLite reflects the foreign key without a name; batch mode names it with
+# this convention so it can be dropped.
+NAMING_CONVENTION = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+
+def _item_foreign_key() -> str:
+    for key in sa.inspect(op.get_bind()).get_foreign_keys("attachments"):
+        if key["referred_table"] == "items" and key["name"]:
+            return str(key["name"])
+    return "fk_attachments_item_id_items"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Archived items keep their id and version, so they can be restored.
+    op.add_column(
+        "archived_items",
+        sa.Column("version", sa.Integer(), server_default="1", nullable=False),
+    )
+    # Attachments stay put when their item is archived, so item_id refers to
+    # items or archived_items.
+    name = _item_foreign_key()
+    with op.batch_alter_table(
+        "attachments",
+        naming_convention=NAMING_CONVENTION,
+    ) as batch_op:
+        batch_op.drop_constraint(name, type_="foreignkey")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("attachments") as batch_op:
+        batch_op.create_foreign_key(
+            "fk_attachments_item_id_items",
+            "items",
+            ["item_id"],
+            ["id"],
+            ondelete="CASCADE",
+        )
+    with op.batch_alter_table("archived_items") as batch_op:
+        batch_op.drop_column("version")
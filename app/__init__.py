@@ -1 +1,5 @@
 # FastAPI HTMX Starter Template
+import time
+
+# Reference point for the startup-timing log line in app.main.
+IMPORT_STARTED = time.perf_counter()
@@ -0,0 +1,85 @@
+from typing import Any, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.admission import admission
+from app.core.database import get_db
+from app.core.logs import pool_hold
+from app.core.page_cache import page_cache
+from app.core.singleflight import item_list_flight
+from app.core.users import fastapi_users
+from app.models.user import User
+from app.services.audit import audit_log, audit_page_query
+from app.services.item_scroll import scroll_page_size, scroll_prefetch
+from app.services.jobs import queue_stats
+from app.services.suggestions import title_index
+from app.services.tags import facet_cache
+
+router = APIRouter(tags=["admin"])
+
+current_superuser = fastapi_users.current_user(active=True, superuser=True)
+
+
+@router.get("/metrics", name="admin_metrics")
+async def get_metrics(
+    request: Request,
+    _: User = Depends(current_superuser),
+    db: AsyncSession = Depends(get_db),
+) -> dict[str, Any]:
+    """Operational metrics for this worker (superusers only)."""
+
+    job_pool = request.app.state.job_pool
+    return {
+        "jobs": {
+            "queue": await queue_stats(db),
+            "workers": job_pool.metrics.snapshot() if job_pool else None,
+        },
+        "admission": admission.snapshot(),
+        "page_cache": page_cache.snapshot(),
+        "item_list_reads": item_list_flight.snapshot(),
+        "item_scroll": {
+            "page_size": scroll_page_size.snapshot(),
+            "prefetch": scroll_prefetch.snapshot(),
+        },
+        "suggestion_index": title_index.snapshot(),
+        "tag_facets": facet_cache.snapshot(),
+        "audit": audit_log.snapshot(),
+        "db_pool": pool_hold.snapshot(),
+    }
+
+
+@router.get("/audit", name="admin_audit")
+async def get_audit_events(
+    before: Optional[int] = Query(None, description="previous page's next_before"),
+    limit: int = Query(50, ge=1, le=500),
+    actor_id: Optional[UUID] = Query(None),
+    action: Optional[str] = Query(None, max_length=50),
+    _: User = Depends(current_superuser),
+    db: AsyncSession = Depends(get_db),
+) -> dict[str, Any]:
+    """The audit trail, newest first (superusers only).
+
+    Events still buffered in a worker show up after its next flush.
+    """
+
+    result = await db.execute(
+        audit_page_query(before, limit + 1, actor_id, action),
+    )
+    events = result.scalars().all()
+    next_before = events[limit - 1].id if len(events) > limit else None
+    return {
+        "events": [
+            {
+                "id": event.id,
+                "at": event.at,
+                "actor_id": event.actor_id,
+                "action": event.action,
+                "target_id": event.target_id,
+                "details": event.details,
+            }
+            for event in events[:limit]
+        ],
+        "next_before": next_before,
+    }
@@ -0,0 +1,180 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import FileResponse, HTMLResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.sharding import allocate_ids, get_items_db
+from app.core.templates import templates
+from app.core.users import current_active_user
+from app.models.attachment import Attachment
+from app.models.user import User
+from app.services.attachments import (
+    UploadError,
+    UploadTooLarge,
+    blob_path,
+    item_attachments_query,
+    owned_attachment_query,
+    receive_upload,
+)
+from app.services.items import owned_item_row_query
+
+router = APIRouter(tags=["attachments"])
+
+# Attachments never change once uploaded, so browsers may keep them; they are
+# per-user, so shared caches must not. no-transform also keeps the compression
+# middleware from re-encoding them.
+CACHE_CONTROL = "private, max-age=31536000, immutable, no-transform"
+
+
+async def render_attachments(
+    request: Request,
+    db: AsyncSession,
+    user: User,
+    item_id: int,
+    status_code: int = 200,
+    error: str | None = None,
+) -> HTMLResponse:
+    result = await db.execute(item_attachments_query(user.id, item_id))
+    return templates.TemplateResponse(
+        "items/_attachments.jinja2",
+        {
+            "request": request,
+            "item_id": item_id,
+            "attachments": result.scalars().all(),
+            "error": error,
+        },
+        status_code=status_code,
+    )
+
+
+@router.get(
+    "/{item_id}/attachments",
+    response_class=HTMLResponse,
+    name="list_attachments",
+)
+async def list_attachments(
+    request: Request,
+    item_id: int,
+    user: User = Depends(current_active_user),
+    db: AsyncSession = Depends(get_items_db),
+) -> HTMLResponse:
+    """List an item's attachments with an upload form."""
+
+    return await render_attachments(request, db, user, item_id)
+
+
+@router.post(
+    "/{item_id}/attachments",
+    response_class=HTMLResponse,
+    name="upload_attachment",
+)
+async def upload_attachment(
+    request: Request,
+    item_id: int,
+    user: User = Depends(current_active_user),
+    db: AsyncSession = Depends(get_items_db),
+) -> HTMLResponse:
+    """Stream an uploaded file to storage and attach it to an item."""
+
+    result = await db.execute(owned_item_row_query(user.id, item_id))
+    if result.first() is None:
+        raise HTTPException(status_code=404, detail="Item not found")
+    # Give the connection back to the pool while the (possibly slow and
+    # large) body streams in.
+    await db.commit()
+
+    try:
+        stored = await receive_upload(
+            request.stream(),
+            request.headers.get("content-type", ""),
+        )
+    except UploadError as exc:
+        status_code = 413 if isinstance(exc, UploadTooLarge) else 400
+        return await render_attachments(
+            request,
+            db,
+            user,
+            item_id,
+            status_code=status_code,
+            error=str(exc),
+        )
+
+    # The item may have been deleted during the upload; the blob is then
+    # left for purge_orphan_blobs.
+    result = await db.execute(owned_item_row_query(user.id, item_id))
+    if result.first() is None:
+        raise HTTPException(status_code=404, detail="Item not found")
+    ids = await allocate_ids(Attachment, 1)
+    db.add(
+        Attachment(
+            id=ids[0] if ids else None,
+            item_id=item_id,
+            owner_id=user.id,
+            filename=stored.filename,
+            content_type=stored.content_type,
+            size=stored.size,
+            sha256=stored.sha256,
+        ),
+    )
+    await db.commit()
+
+    return await render_attachments(request, db, user, item_id)
+
+
+@router.get(
+    "/{item_id}/attachments/{attachment_id}",
+    name="download_attachment",
+)
+async def download_attachment(
+    item_id: int,
+    attachment_id: int,
+    user: User = Depends(current_active_user),
+    db: AsyncSession = Depends(get_items_db),
+) -> FileResponse:
+    """Download an attachment; supports Range requests."""
+
+    result = await db.execute(owned_attachment_query(user.id, item_id, attachment_id))
+    attachment = result.scalar_one_or_none()
+
+    if not attachment:
+        raise HTTPException(status_code=404, detail="Attachment not found")
+
+    return FileResponse(
+        blob_path(attachment.sha256),
+        media_type=attachment.content_type,
+        filename=attachment.filename,
+        headers={
+            "Cache-Control": CACHE_CONTROL,
+            "ETag": f'"{attachment.sha256}"',
+            # The media type was given by the uploader; don't let browsers
+            # second-guess it into something executable.
+            "X-Content-Type-Options": "nosniff",
+        },
+    )
+
+
+@router.delete(
+    "/{item_id}/attachments/{attachment_id}",
+    response_class=HTMLResponse,
+    name="delete_attachment",
+)
+async def delete_attachment(
+    request: Request,
+    item_id: int,
+    attachment_id: int,
+    user: User = Depends(current_active_user),
+    db: AsyncSession = Depends(get_items_db),
+) -> HTMLResponse:
+    """Remove an attachment from an item."""
+
+    result = await db.execute(owned_attachment_query(user.id, item_id, attachment_id))
+    attachment = result.scalar_one_or_none()
+
+    if not attachment:
+        raise HTTPException(status_code=404, detail="Attachment not found")
+
+    # The blob may be shared with other attachments, so it stays on disk
+    # until purge_orphan_blobs finds it unreferenced.
+    await db.delete(attachment)
+    await db.commit()
+
+    return await render_attachments(request, db, user, item_id)
@@ -0,0 +1,116 @@
+"""Superuser-only profiling endpoints, mounted only when DIAGNOSTICS is on."""
+
+from datetime import datetime
+from typing import Any, Literal
+
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import PlainTextResponse
+
+from app.api.admin import current_superuser
+from app.core.diagnostics import (
+    GroupBy,
+    by_label,
+    collapsed,
+    cpu_profiler,
+    live_object_counts,
+    memory_profiler,
+)
+from app.core.responses import FastJSONResponse
+
+# Every endpoint requires a superuser.
+router = APIRouter(tags=["diagnostics"], dependencies=[Depends(current_superuser)])
+
+
+@router.get("/memory", name="diagnostics_memory_status")
+async def memory_status() -> dict[str, Any]:
+    """Whether tracemalloc is tracing, and how much memory it traces."""
+    return memory_profiler.status()
+
+
+@router.post("/memory/start", name="diagnostics_memory_start")
+async def start_memory_tracing(
+    frames: int = Query(1, ge=1, le=50, description="stack frames per allocation"),
+) -> dict[str, Any]:
+    """Start tracing allocations; slows every allocation until stopped."""
+    memory_profiler.start(frames)
+    return memory_profiler.status()
+
+
+@router.post("/memory/stop", name="diagnostics_memory_stop")
+async def stop_memory_tracing() -> dict[str, Any]:
+    """Stop tracing and drop the baseline."""
+    memory_profiler.stop()
+    return memory_profiler.status()
+
+
+@router.post("/memory/snapshot", name="diagnostics_memory_snapshot")
+async def take_memory_snapshot(
+    limit: int = Query(25, ge=1, le=500),
+    group_by: GroupBy = Query("lineno"),
+) -> dict[str, Any]:
+    """Take a snapshot, keep it as the baseline, return its top sites."""
+    try:
+        return await anyio.to_thread.run_sync(memory_profiler.snapshot, limit, group_by)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+
+
+@router.get("/memory/diff", name="diagnostics_memory_diff")
+async def diff_memory(
+    limit: int = Query(25, ge=1, le=500),
+    group_by: GroupBy = Query("lineno"),
+    rebase: bool = Query(False, description="make this snapshot the new baseline"),
+) -> dict[str, Any]:
+    """Allocation sites that grew most since the baseline snapshot."""
+    try:
+        return await anyio.to_thread.run_sync(
+            memory_profiler.diff,
+            limit,
+            group_by,
+            rebase,
+        )
+    except RuntimeError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+
+
+@router.get("/objects", name="diagnostics_objects")
+async def object_counts() -> dict[str, Any]:
+    """Live ORM instances, item rows, sessions and garbage collector stats."""
+    return await anyio.to_thread.run_sync(live_object_counts)
+
+
+@router.get("/cpu", name="diagnostics_cpu_profile")
+async def profile_cpu(
+    seconds: float = Query(10.0, gt=0, le=120),
+    interval_ms: float = Query(5.0, ge=1, le=1000),
+    output: Literal["collapsed", "json"] = Query("collapsed"),
+    limit: int = Query(50, ge=1, le=1000, description="stacks in json output"),
+) -> Response:
+    """Sample this worker's event loop for ``seconds``.
+
+    ``collapsed`` is a file for flamegraph.pl or speedscope; ``json`` has
+    samples per route and the most frequent stacks.
+    """
+    try:
+        stacks = await cpu_profiler.profile(seconds, interval_ms / 1000)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+
+    if output == "json":
+        return FastJSONResponse(
+            {
+                "samples": sum(stacks.values()),
+                "interval_ms": interval_ms,
+                "labels": by_label(stacks),
+                "stacks": [
+                    {"stack": stack.split(";"), "samples": count}
+                    for stack, count in stacks.most_common(limit)
+                ],
+            },
+        )
+    filename = f"cpu-{datetime.utcnow():%Y%m%dT%H%M%S}.folded"
+    return PlainTextResponse(
+        collapsed(stacks),
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
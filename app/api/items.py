@@ -1,55 +1,182 @@
-from typing import Optional
+from typing import Any, Optional
 
-import sqlalchemy.sql.functions
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import HTMLResponse
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.dependencies import is_htmx
-from app.core.database import get_db
+from app.core.sharding import allocate_ids, get_items_db
+from app.core.singleflight import item_list_flight
 from app.core.templates import templates
-from app.core.users import fastapi_users
+from app.core.users import current_active_user
 from app.models.item import Item
 from app.models.user import User
 from app.schemas.item import ItemCreate, ItemUpdate
+from app.services.archive import restore_archived_item
+from app.services.attachments import delete_item_attachments_statement
+from app.services.audit import audit_log
+from app.services.item_scroll import (
+    fetch_chunk,
+    scroll_page_size,
+    scroll_prefetch,
+)
+from app.services.items import (
+    ItemRow,
+    count_query,
+    delete_item_statement,
+    item_rows,
+    item_titles_query,
+    items_query,
+    merged_items_query,
+    owned_item_query,
+    page_query,
+    update_item_statement,
+)
+from app.services.suggestions import title_index
+from app.services.tags import (
+    drop_item_tags,
+    facet_counts,
+    live_ids,
+    set_item_tags,
+    tags_by_item,
+)
 
 router = APIRouter(tags=["items"])
 
 
-@router.get("", response_class=HTMLResponse, name="list_items")
-async def list_items(
-    request: Request,
-    search: Optional[str] = Query(None),
-    page: int = Query(1, ge=1),
-    per_page: int = Query(10, ge=1, le=100),
-    htmx: bool = Depends(is_htmx),
-    user: User = Depends(fastapi_users.current_user(active=True)),
-    db: AsyncSession = Depends(get_db),
+async def render_scroll(
+    template_name: str,
+    context: dict[str, Any],
+    db: AsyncSession,
+    user: User,
+    cursor: str | None = None,
 ) -> HTMLResponse:
-    """List items with search and pagination."""
-
-    # Build query
-    query = select(Item).where(Item.owner_id == user.id)
-
-    if search:
-        query = query.where(Item.title.ilike(f"%{search}%"))
-
-    # Get total count
-    count_query = select(sqlalchemy.sql.functions.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
+    """Render one infinite-scroll chunk and start prefetching the next."""
+    search = context["search"] or None
+    include_archived = context["include_archived"]
+    tag = context["tag"] or None
+    generation = item_list_flight.generation(user.id)
+
+    chunk = None
+    if cursor is not None:
+        chunk = await scroll_prefetch.take(
+            (user.id, generation, search, include_archived, tag, cursor),
+        )
+    if chunk is None:
+        chunk = await fetch_chunk(
+            db,
+            user.id,
+            search,
+            include_archived,
+            cursor,
+            scroll_page_size.size(),
+            tag,
+        )
+
+    if chunk.next_cursor:
+        bind, next_cursor, limit = db.bind, chunk.next_cursor, scroll_page_size.size()
+
+        async def prefetch():
+            async with AsyncSession(bind, expire_on_commit=False) as session:
+                return await fetch_chunk(
+                    session,
+                    user.id,
+                    search,
+                    include_archived,
+                    next_cursor,
+                    limit,
+                    tag,
+                )
+
+        scroll_prefetch.start(
+            (user.id, generation, search, include_archived, tag, next_cursor),
+            prefetch,
+        )
+
+    def observe(render_ms: float) -> None:
+        scroll_page_size.observe(chunk.query_ms + render_ms, len(chunk.rows))
+
+    # Rendered as the response is sent, after the session has closed.
+    return templates.TemplateResponse(
+        template_name,
+        {
+            **context,
+            "items": chunk.rows,
+            "item_tags": chunk.tags,
+            "next_cursor": chunk.next_cursor,
+        },
+        on_render=observe,
+    )
 
-    # Apply pagination
-    offset = (page - 1) * per_page
-    query = query.offset(offset).limit(per_page)
 
-    # Execute query
-    result = await db.execute(query)
-    items = result.scalars().all()
+async def render_items(
+    request: Request,
+    db: AsyncSession,
+    user: User,
+    search: Optional[str],
+    page: int,
+    per_page: int,
+    include_archived: bool,
+    tag: Optional[str],
+    scroll: bool,
+    template_name: str = "items/_table.jinja2",
+    clamp_page: bool = False,
+) -> HTMLResponse:
+    """Render the item list for one view: search, tag, archived, paging mode.
+
+    With ``scroll`` the list is the first chunk of an infinite scroll instead.
+    ``clamp_page`` shows the last page instead of an empty one past the end.
+    """
+
+    if scroll:
+        return await render_scroll(
+            template_name,
+            {
+                "request": request,
+                "search": search or "",
+                "include_archived": include_archived,
+                "tag": tag or "",
+                "facets": await facet_counts(db, user.id, search),
+                "scroll": True,
+                "user": user,
+            },
+            db,
+            user,
+        )
+
+    # Build query; archived items are only scanned when asked for
+    if include_archived:
+        query = merged_items_query(user.id, search, tag)
+    else:
+        query = items_query(user.id, search, tag)
+
+    async def fetch() -> tuple[int, list, dict, list]:
+        # Get total count
+        total_result = await db.execute(count_query(query))
+        total = total_result.scalar() or 0
+
+        # Execute query for the requested page, then the tags shown with it
+        result = await db.execute(page_query(query, page, per_page))
+        items = item_rows(result)
+        item_tags = await tags_by_item(db, live_ids(items))
+        return total, items, item_tags, await facet_counts(db, user.id, search)
+
+    # Identical concurrent requests from this user share one execution
+    total, items, item_tags, facets = await item_list_flight.do(
+        user.id,
+        (search, page, per_page, include_archived, tag),
+        fetch,
+    )
 
     # Calculate pagination info
     total_pages = (total + per_page - 1) // per_page
+    if clamp_page and page > total_pages > 0:
+        page = total_pages
+        total, items, item_tags, facets = await item_list_flight.do(
+            user.id,
+            (search, page, per_page, include_archived, tag),
+            fetch,
+        )
     has_prev = page > 1
     has_next = page < total_pages
 
@@ -65,6 +192,10 @@ async def list_items(
         "request": request,
         "items": items,
         "search": search or "",
+        "include_archived": include_archived,
+        "tag": tag or "",
+        "item_tags": item_tags,
+        "facets": facets,
         "page": page,
         "per_page": per_page,
         "total": total,
@@ -75,113 +206,160 @@ async def list_items(
         "end_item": end_item,
         "page_range_start": page_range_start,
         "page_range_end": page_range_end,
+        "scroll": False,
         "user": user,
     }
 
-    if htmx:
-        return templates.TemplateResponse("items/_table.jinja2", context)
+    return templates.TemplateResponse(template_name, context)
 
-    return templates.TemplateResponse("items/index.jinja2", context)
+
+@router.get("", response_class=HTMLResponse, name="list_items")
+async def list_items(
+    request: Request,
+    search: Optional[str] = Query(None),
+    page: int = Query(1, ge=1),
+    per_page: int = Query(10, ge=1, le=100),
+    include_archived: bool = Query(False),
+    tag: Optional[str] = Query(None, max_length=50),
+    scroll: bool = Query(False),
+    htmx: bool = Depends(is_htmx),
+    user: User = Depends(current_active_user),
+    db: AsyncSession = Depends(get_items_db),
+) -> HTMLResponse:
+    """List items with search, tag filter and pagination, optionally archived.
+
+    With ``scroll`` the list is the first chunk of an infinite scroll instead.
+    """
+
+    return await render_items(
+        request,
+        db,
+        user,
+        search,
+        page,
+        per_page,
+        include_archived,
+        tag,
+        scroll,
+        "items/_table.jinja2" if htmx else "items/index.jinja2",
+    )
+
+
+@router.get("/scroll", response_class=HTMLResponse, name="scroll_items")
+async def scroll_items(
+    request: Request,
+    cursor: str = Query(..., pattern=r"^[01]:\d+$"),
+    search: Optional[str] = Query(None),
+    include_archived: bool = Query(False),
+    tag: Optional[str] = Query(None, max_length=50),
+    user: User = Depends(current_active_user),
+    db: AsyncSession = Depends(get_items_db),
+) -> HTMLResponse:
+    """The next infinite-scroll chunk: rows after ``cursor`` and a new sentinel."""
+
+    return await render_scroll(
+        "items/_scroll_rows.jinja2",
+        {
+            "request": request,
+            "search": search or "",
+            "include_archived": include_archived,
+            "tag": tag or "",
+            "scroll": True,
+        },
+        db,
+        user,
+        cursor,
+    )
+
+
+@router.get("/suggest", response_class=HTMLResponse, name="suggest_items")
+async def suggest_items(
+    request: Request,
+    search: str = Query("", max_length=100),
+    user: User = Depends(current_active_user),
+    db: AsyncSession = Depends(get_items_db),
+) -> HTMLResponse:
+    """Title suggestions for the search box, from the in-memory index."""
+
+    async def load() -> list[tuple[int, str]]:
+        result = await db.execute(item_titles_query(user.id))
+        return list(result.tuples())
+
+    suggestions = []
+    if search.strip():
+        suggestions = await title_index.complete(user.id, search.strip(), load)
+
+    return templates.TemplateResponse(
+        "items/_suggestions.jinja2",
+        {"request": request, "suggestions": suggestions},
+    )
 
 
 @router.post("", response_class=HTMLResponse, name="create_item")
 async def create_item(
     request: Request,
     item_data: ItemCreate,
-    user: User = Depends(fastapi_users.current_user(active=True)),
-    db: AsyncSession = Depends(get_db),
+    search: Optional[str] = Query(None),
+    per_page: int = Query(10, ge=1, le=100),
+    include_archived: bool = Query(False),
+    tag: Optional[str] = Query(None, max_length=50),
+    scroll: bool = Query(False),
+    user: User = Depends(current_active_user),
+    db: AsyncSession = Depends(get_items_db),
 ) -> HTMLResponse:
-    """Create a new item."""
+    """Create a new item and re-render the list view it was created from."""
 
+    ids = await allocate_ids(Item, 1)
     item = Item(
+        id=ids[0] if ids else None,
         title=item_data.title,
         description=item_data.description,
         owner_id=user.id,
     )
 
     db.add(item)
+    await db.flush()
+    if item_data.tags:
+        await set_item_tags(db, user.id, item.id, item_data.tags)
     await db.commit()
     await db.refresh(item)
-
-    # Get current search and pagination context
-    search = request.query_params.get("search")
-    page = int(request.query_params.get("page", 1))
-    per_page = int(request.query_params.get("per_page", 10))
-
-    # Recalculate the items list and pagination after creation
-    query = select(Item).where(Item.owner_id == user.id)
-    if search:
-        query = query.where(Item.title.ilike(f"%{search}%"))
-
-    # Get updated total count
-    count_query = select(sqlalchemy.sql.functions.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
-
-    # Calculate updated pagination info
-    total_pages = (total + per_page - 1) // per_page if total > 0 else 1
-
-    # For new items, we typically want to show the first page where the item appears
-    # Since items are usually ordered by creation time (newest first), go to page 1
-    page = 1
-
-    # Apply pagination
-    offset = (page - 1) * per_page
-    query = query.offset(offset).limit(per_page)
-
-    # Execute query for updated items
-    result = await db.execute(query)
-    items = result.scalars().all()
-
-    # Calculate pagination display values
-    has_prev = page > 1
-    has_next = page < total_pages
-    start_item = ((page - 1) * per_page) + 1 if total > 0 else 0
-    end_item = min(page * per_page, total)
-    page_range_start = max(1, page - 2)
-    page_range_end = min(total_pages + 1, page + 3)
-
-    context = {
-        "request": request,
-        "items": items,
-        "search": search or "",
-        "page": page,
-        "per_page": per_page,
-        "total": total,
-        "total_pages": total_pages,
-        "has_prev": has_prev,
-        "has_next": has_next,
-        "start_item": start_item,
-        "end_item": end_item,
-        "page_range_start": page_range_start,
-        "page_range_end": page_range_end,
-        "current_user": user,
-    }
-
-    # Return updated table
-    return templates.TemplateResponse("items/_table.jinja2", context)
+    item_list_flight.invalidate(user.id)
+    title_index.put(user.id, item.id, item.title)
+    audit_log.record("item.create", user.id, item.id, title=item.title)
+
+    # Show the first page of the view the item was created from
+    return await render_items(
+        request,
+        db,
+        user,
+        search,
+        1,
+        per_page,
+        include_archived,
+        tag,
+        scroll,
+    )
 
 
 @router.get("/{item_id}/edit", response_class=HTMLResponse, name="get_edit_item_form")
 async def get_edit_item_form(
     request: Request,
     item_id: int,
-    user: User = Depends(fastapi_users.current_user(active=True)),
-    db: AsyncSession = Depends(get_db),
+    user: User = Depends(current_active_user),
+    db: AsyncSession = Depends(get_items_db),
 ) -> HTMLResponse:
     """Get edit form for an item."""
 
-    result = await db.execute(
-        select(Item).where(Item.id == item_id, Item.owner_id == user.id),
-    )
+    result = await db.execute(owned_item_query(user.id, item_id))
     item = result.scalar_one_or_none()
 
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
 
+    item_tags = await tags_by_item(db, [item.id])
     return templates.TemplateResponse(
         "items/_edit_form.jinja2",
-        {"request": request, "item": item},
+        {"request": request, "item": item, "tags": item_tags.get(item.id, [])},
     )
 
 
@@ -190,27 +368,48 @@ async def update_item(
     request: Request,
     item_id: int,
     item_data: ItemUpdate,
-    user: User = Depends(fastapi_users.current_user(active=True)),
-    db: AsyncSession = Depends(get_db),
+    user: User = Depends(current_active_user),
+    db: AsyncSession = Depends(get_items_db),
 ) -> HTMLResponse:
-    """Update an item."""
+    """Update an item with a single UPDATE ... RETURNING."""
 
-    result = await db.execute(
-        select(Item).where(Item.id == item_id, Item.owner_id == user.id),
+    values = item_data.model_dump(exclude_none=True, exclude={"version", "tags"})
+    updated = await db.execute(
+        update_item_statement(user.id, item_id, values, item_data.version),
     )
-    item = result.scalar_one_or_none()
-
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
-
-    # Update fields
-    if item_data.title is not None:
-        item.title = item_data.title
-    if item_data.description is not None:
-        item.description = item_data.description
-
+    row = updated.one_or_none()
+
+    if row is None:
+        # Either there is no such item, or another tab saved it first
+        result = await db.execute(owned_item_query(user.id, item_id))
+        current = result.scalar_one_or_none()
+        if not current:
+            raise HTTPException(status_code=404, detail="Item not found")
+        item_tags = await tags_by_item(db, [current.id])
+        return templates.TemplateResponse(
+            "items/_edit_form.jinja2",
+            {
+                "request": request,
+                "item": current,
+                "tags": item_tags.get(current.id, []),
+                "conflict": True,
+            },
+            status_code=409,
+        )
+
+    if item_data.tags is not None:
+        await set_item_tags(db, user.id, item_id, item_data.tags)
     await db.commit()
-    await db.refresh(item)
+    item = ItemRow(id=row.id, title=row.title, description=row.description)
+    item_tags = await tags_by_item(db, [item.id])
+    item_list_flight.invalidate(user.id)
+    title_index.put(user.id, item.id, item.title)
+    audit_log.record(
+        "item.update",
+        user.id,
+        item.id,
+        fields=sorted(item_data.model_dump(exclude_unset=True, exclude={"version"})),
+    )
 
     # Get pagination context from query params for consistency
     search = request.query_params.get("search", "")
@@ -223,6 +422,7 @@ async def update_item(
         {
             "request": request,
             "item": item,
+            "item_tags": item_tags,
             "current_user": user,
             "search": search,
             "page": page,
@@ -235,93 +435,93 @@ async def update_item(
 async def delete_item(
     request: Request,
     item_id: int,
-    user: User = Depends(fastapi_users.current_user(active=True)),
-    db: AsyncSession = Depends(get_db),
+    search: Optional[str] = Query(None),
+    page: int = Query(1, ge=1),
+    per_page: int = Query(10, ge=1, le=100),
+    include_archived: bool = Query(False),
+    tag: Optional[str] = Query(None, max_length=50),
+    scroll: bool = Query(False),
+    user: User = Depends(current_active_user),
+    db: AsyncSession = Depends(get_items_db),
 ) -> HTMLResponse:
-    """Delete an item."""
+    """Delete an item with a single DELETE ... RETURNING."""
 
-    result = await db.execute(
-        select(Item).where(Item.id == item_id, Item.owner_id == user.id),
-    )
-    item = result.scalar_one_or_none()
+    # Untag first so the facet counts follow; rolled back if there's no item.
+    await drop_item_tags(db, [item_id])
+    deleted = await db.execute(delete_item_statement(user.id, item_id))
 
-    if not item:
+    if deleted.scalar_one_or_none() is None:
+        await db.rollback()
         raise HTTPException(status_code=404, detail="Item not found")
 
-    await db.delete(item)
+    await db.execute(delete_item_attachments_statement(user.id, item_id))
     await db.commit()
+    item_list_flight.invalidate(user.id)
+    title_index.discard(user.id, item_id)
+    audit_log.record("item.delete", user.id, item_id)
+
+    # Stay on the current view, or its last page if this one is now empty
+    return await render_items(
+        request,
+        db,
+        user,
+        search,
+        page,
+        per_page,
+        include_archived,
+        tag,
+        scroll,
+        clamp_page=True,
+    )
 
-    # Get current page and search from query params to maintain state
-    search = request.query_params.get("search")
-    page = int(request.query_params.get("page", 1))
-    per_page = int(request.query_params.get("per_page", 10))
-
-    # Recalculate the items list and pagination after deletion
-    query = select(Item).where(Item.owner_id == user.id)
-    if search:
-        query = query.where(Item.title.ilike(f"%{search}%"))
-
-    # Get updated total count
-    count_query = select(sqlalchemy.sql.functions.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
-
-    # Calculate updated pagination info
-    total_pages = (total + per_page - 1) // per_page if total > 0 else 1
-
-    # If current page is now beyond the total pages, go to the last page
-    if page > total_pages and total_pages > 0:
-        page = total_pages
-
-    # Apply pagination
-    offset = (page - 1) * per_page
-    query = query.offset(offset).limit(per_page)
-
-    # Execute query for updated items
-    result = await db.execute(query)
-    items = result.scalars().all()
 
-    # Calculate pagination display values
-    has_prev = page > 1
-    has_next = page < total_pages
-    start_item = ((page - 1) * per_page) + 1 if total > 0 else 0
-    end_item = min(page * per_page, total)
-    page_range_start = max(1, page - 2)
-    page_range_end = min(total_pages + 1, page + 3)
+@router.post("/{item_id}/restore", response_class=HTMLResponse, name="restore_item")
+async def restore_item(
+    request: Request,
+    item_id: int,
+    search: Optional[str] = Query(None),
+    page: int = Query(1, ge=1),
+    per_page: int = Query(10, ge=1, le=100),
+    include_archived: bool = Query(False),
+    tag: Optional[str] = Query(None, max_length=50),
+    scroll: bool = Query(False),
+    user: User = Depends(current_active_user),
+    db: AsyncSession = Depends(get_items_db),
+) -> HTMLResponse:
+    """Move an archived item back to the live items, keeping its id."""
 
-    context = {
-        "request": request,
-        "items": items,
-        "search": search or "",
-        "page": page,
-        "per_page": per_page,
-        "total": total,
-        "total_pages": total_pages,
-        "has_prev": has_prev,
-        "has_next": has_next,
-        "start_item": start_item,
-        "end_item": end_item,
-        "page_range_start": page_range_start,
-        "page_range_end": page_range_end,
-        "current_user": user,
-    }
+    row = await restore_archived_item(db, user.id, item_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Archived item not found")
 
-    # Return updated table
-    return templates.TemplateResponse("items/_table.jinja2", context)
+    await db.commit()
+    item_list_flight.invalidate(user.id)
+    title_index.put(user.id, row["id"], row["title"])
+    audit_log.record("item.restore", user.id, row["id"])
+
+    return await render_items(
+        request,
+        db,
+        user,
+        search,
+        page,
+        per_page,
+        include_archived,
+        tag,
+        scroll,
+    )
 
 
 @router.get("/{item_id}/cancel", response_class=HTMLResponse, name="cancel_edit_item")
 async def cancel_edit_item(
     request: Request,
     item_id: int,
-    user: User = Depends(fastapi_users.current_user(active=True)),
-    db: AsyncSession = Depends(get_db),
+    user: User = Depends(current_active_user),
+    db: AsyncSession = Depends(get_items_db),
 ) -> HTMLResponse:
     """Cancel editing an item and return to view mode."""
 
-    result = await db.execute(
-        select(Item).where(Item.id == item_id, Item.owner_id == user.id),
-    )
+    result = await db.execute(owned_item_query(user.id, item_id))
     item = result.scalar_one_or_none()
 
     if not item:
@@ -338,6 +538,7 @@ async def cancel_edit_item(
         {
             "request": request,
             "item": item,
+            "item_tags": await tags_by_item(db, [item.id]),
             "current_user": user,
             "search": search,
             "page": page,
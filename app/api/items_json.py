@@ -0,0 +1,223 @@
+"""JSON API for items.
+
+Mirrors the HTML item routes using the same statements from
+``app.services.items``, but selects plain columns and serializes the Core
+rows directly, so no ORM instances are built.
+"""
+
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import Result
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.responses import FastJSONResponse
+from app.core.sharding import allocate_ids, get_items_db
+from app.core.singleflight import item_list_flight
+from app.core.users import current_active_user
+from app.models.item import Item
+from app.models.user import User
+from app.schemas.item import ItemBatchCreate, ItemCreate, ItemPage, ItemRead, ItemUpdate
+from app.services.archive import restore_archived_item
+from app.services.attachments import delete_item_attachments_statement
+from app.services.audit import audit_log
+from app.services.items import (
+    delete_item_statement,
+    insert_items_statement,
+    item_rows_query,
+    owned_item_row_query,
+    update_item_statement,
+)
+from app.services.suggestions import title_index
+from app.services.tags import drop_item_tags, set_item_tags
+
+router = APIRouter(tags=["items-api"], default_response_class=FastJSONResponse)
+
+
+@router.get("", response_model=ItemPage, name="api_list_items")
+async def api_list_items(
+    search: Optional[str] = Query(None),
+    tag: Optional[str] = Query(None, max_length=50),
+    cursor: Optional[int] = Query(None, description="previous page's next_cursor"),
+    limit: int = Query(50, ge=1, le=500),
+    user: User = Depends(current_active_user),
+    db: AsyncSession = Depends(get_items_db),
+) -> Response:
+    """List items in id order with keyset (cursor) pagination."""
+
+    # Fetch one extra row to learn whether there is a next page without
+    # a separate count query.
+    result = await db.execute(
+        item_rows_query(user.id, search, cursor, limit + 1, tag),
+    )
+    rows = result.mappings().all()
+    next_cursor = rows[limit - 1]["id"] if len(rows) > limit else None
+    return FastJSONResponse({"items": rows[:limit], "next_cursor": next_cursor})
+
+
+@router.get("/{item_id}", response_model=ItemRead, name="api_get_item")
+async def api_get_item(
+    item_id: int,
+    user: User = Depends(current_active_user),
+    db: AsyncSession = Depends(get_items_db),
+) -> Response:
+    """Get a single item."""
+
+    result = await db.execute(owned_item_row_query(user.id, item_id))
+    row = result.mappings().one_or_none()
+
+    if not row:
+        raise HTTPException(status_code=404, detail="Item not found")
+
+    return FastJSONResponse(row)
+
+
+@router.post("", response_model=ItemRead, status_code=201, name="api_create_item")
+async def api_create_item(
+    item_data: ItemCreate,
+    user: User = Depends(current_active_user),
+    db: AsyncSession = Depends(get_items_db),
+) -> Response:
+    """Create an item."""
+
+    values = {**item_data.model_dump(exclude={"tags"}), "owner_id": user.id}
+    if ids := await allocate_ids(Item, 1):
+        values["id"] = ids[0]
+    result = await db.execute(insert_items_statement(), [values])
+    row = result.mappings().one()
+    if item_data.tags:
+        await set_item_tags(db, user.id, row["id"], item_data.tags)
+    await db.commit()
+    item_list_flight.invalidate(user.id)
+    title_index.put(user.id, row["id"], row["title"])
+    audit_log.record("item.create", user.id, row["id"], title=row["title"])
+
+    return FastJSONResponse(row, status_code=201)
+
+
+@router.post(
+    "/batch",
+    response_model=list[ItemRead],
+    status_code=201,
+    name="api_create_items",
+)
+async def api_create_items(
+    batch: ItemBatchCreate,
+    user: User = Depends(current_active_user),
+    db: AsyncSession = Depends(get_items_db),
+) -> Response:
+    """Create up to 1000 items in a single INSERT ... RETURNING."""
+
+    values = [
+        {**item.model_dump(exclude={"tags"}), "owner_id": user.id}
+        for item in batch.items
+    ]
+    if ids := await allocate_ids(Item, len(values)):
+        values = [
+            {**row, "id": item_id} for row, item_id in zip(values, ids, strict=True)
+        ]
+    result = await db.execute(insert_items_statement(), values)
+    rows = result.mappings().all()
+    # RETURNING preserves the order of the inserted rows.
+    for row, item in zip(rows, batch.items, strict=True):
+        if item.tags:
+            await set_item_tags(db, user.id, row["id"], item.tags)
+    await db.commit()
+    item_list_flight.invalidate(user.id)
+    for row in rows:
+        title_index.put(user.id, row["id"], row["title"])
+        audit_log.record("item.create", user.id, row["id"], title=row["title"])
+
+    return FastJSONResponse(rows, status_code=201)
+
+
+@router.patch("/{item_id}", response_model=ItemRead, name="api_update_item")
+async def api_update_item(
+    item_id: int,
+    item_data: ItemUpdate,
+    user: User = Depends(current_active_user),
+    db: AsyncSession = Depends(get_items_db),
+) -> Response:
+    """Update an item's title, description and/or tags.
+
+    Pass the ``version`` you last read to get a 409 instead of overwriting a
+    concurrent change.
+    """
+
+    values = item_data.model_dump(exclude_none=True, exclude={"version", "tags"})
+    # Retagging is a change too: it checks and bumps the version.
+    changed = bool(values) or item_data.tags is not None
+    result: Result[Any]
+    if changed:
+        result = await db.execute(
+            update_item_statement(user.id, item_id, values, item_data.version),
+        )
+    else:
+        result = await db.execute(owned_item_row_query(user.id, item_id))
+    row = result.mappings().one_or_none()
+
+    if not row:
+        if changed and item_data.version is not None:
+            result = await db.execute(owned_item_row_query(user.id, item_id))
+            if result.first():
+                raise HTTPException(
+                    status_code=409,
+                    detail="Item was modified since that version",
+                )
+        raise HTTPException(status_code=404, detail="Item not found")
+
+    if item_data.tags is not None:
+        await set_item_tags(db, user.id, item_id, item_data.tags)
+    await db.commit()
+    item_list_flight.invalidate(user.id)
+    title_index.put(user.id, row["id"], row["title"])
+    audit_log.record(
+        "item.update",
+        user.id,
+        item_id,
+        fields=sorted(item_data.model_dump(exclude_unset=True, exclude={"version"})),
+    )
+    return FastJSONResponse(row)
+
+
+@router.delete("/{item_id}", status_code=204, name="api_delete_item")
+async def api_delete_item(
+    item_id: int,
+    user: User = Depends(current_active_user),
+    db: AsyncSession = Depends(get_items_db),
+) -> Response:
+    """Delete an item."""
+
+    # Untag first so the facet counts follow; rolled back if there's no item.
+    await drop_item_tags(db, [item_id])
+    result = await db.execute(delete_item_statement(user.id, item_id))
+
+    if result.scalar_one_or_none() is None:
+        await db.rollback()
+        raise HTTPException(status_code=404, detail="Item not found")
+
+    await db.execute(delete_item_attachments_statement(user.id, item_id))
+    await db.commit()
+    item_list_flight.invalidate(user.id)
+    title_index.discard(user.id, item_id)
+    audit_log.record("item.delete", user.id, item_id)
+    return Response(status_code=204)
+
+
+@router.post("/{item_id}/restore", response_model=ItemRead, name="api_restore_item")
+async def api_restore_item(
+    item_id: int,
+    user: User = Depends(current_active_user),
+    db: AsyncSession = Depends(get_items_db),
+) -> Response:
+    """Move an archived item back to the live items, keeping its id."""
+
+    row = await restore_archived_item(db, user.id, item_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Archived item not found")
+
+    await db.commit()
+    item_list_flight.invalidate(user.id)
+    title_index.put(user.id, row["id"], row["title"])
+    audit_log.record("item.restore", user.id, row["id"])
+    return FastJSONResponse(row)
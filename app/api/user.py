@@ -6,13 +6,15 @@ from fastapi_users.exceptions import InvalidPasswordException
 from fastapi_users.password import PasswordHelper
 from sqlalchemy import and_, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.core.database import get_db
+from app.core.sharding import get_items_db
 from app.core.templates import templates
-from app.core.users import fastapi_users
+from app.core.users import current_active_user, fastapi_users
 from app.models.user import User, UserManager, get_user_manager
 from app.schemas.user import UserRead, UserUpdate
+from app.services.audit import audit_log
+from app.services.items import count_query, items_query
 
 router = APIRouter()
 
@@ -21,20 +23,18 @@ router = APIRouter()
 @router.get("/profile", response_class=HTMLResponse, name="user_profile")
 async def get_profile_page(
     request: Request,
-    user: User = Depends(fastapi_users.current_user(active=True)),
-    db: AsyncSession = Depends(get_db),
+    user: User = Depends(current_active_user),
+    items_db: AsyncSession = Depends(get_items_db),
 ) -> HTMLResponse:
-    """Get user profile page with full user data including items."""
+    """Get user profile page with item statistics."""
 
-    # Load user with items for statistics
-    result = await db.execute(
-        select(User).options(selectinload(User.items)).where(User.id == user.id),  # type: ignore[arg-type]
-    )
-    user_with_items = result.scalar_one()
+    # Count items in the database instead of loading every item; with
+    # sharding they may not live in the same database as the user.
+    item_count = await items_db.scalar(count_query(items_query(user.id)))
 
     return templates.TemplateResponse(
         "profile.jinja2",
-        {"request": request, "user": user_with_items},
+        {"request": request, "user": user, "item_count": item_count or 0},
     )
 
 
@@ -58,8 +58,16 @@ async def update_email(
             raise HTTPException(status_code=400, detail="Email already registered")
 
         # Update email
+        previous_email = user.email
         user.email = email_data["email"]
         await db.commit()
+        audit_log.record(
+            "user.email",
+            user.id,
+            user.id,
+            previous=previous_email,
+            email=user.email,
+        )
 
         # Return updated email display
         email_html = f"""
@@ -154,6 +162,7 @@ async def update_password(
         hashed_password = password_helper.hash(new_password)
         user.hashed_password = hashed_password
         await db.commit()
+        audit_log.record("user.password", user.id, user.id)
 
         success_html = """
             <div class="bg-green-50 border border-green-200 text-green-700
@@ -1,24 +1,80 @@
+import argparse
+import asyncio
+import os
 import subprocess
 import sys
+import time
+from uuid import UUID
 
 
-def serve_command():
-    """Start the development server."""
-    print("Starting development server...")
-    subprocess.run(
-        [
-            sys.executable,
-            "-m",
-            "uvicorn",
-            "app.main:app",
-            "--reload",
-            "--host",
-            "0.0.0.0",
-            "--port",
-            "8000",
-        ],
-        check=True,
+def serve_command(argv: list[str] | None = None) -> None:
+    """Start the development server, or the production server with --prod."""
+    parser = argparse.ArgumentParser(prog="serve")
+    parser.add_argument(
+        "--prod",
+        action="store_true",
+        help="multi-worker server configured from SERVER_* settings",
+    )
+    parser.add_argument("--workers", type=int, help="override SERVER_WORKERS")
+    parser.add_argument("--uds", help="bind a Unix socket (overrides SERVER_UDS)")
+    parser.add_argument(
+        "--preload",
+        action="store_true",
+        help="import the app once before forking workers (requires gunicorn)",
+    )
+    parser.add_argument(
+        "--cdn-assets",
+        action="store_true",
+        help="start with --prod even if pages would load assets from a CDN",
     )
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    if not args.prod:
+        print("Starting development server...")
+        subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "app.main:app",
+                "--reload",
+                "--host",
+                "0.0.0.0",
+                "--port",
+                "8000",
+            ],
+            check=True,
+        )
+        return
+
+    from app.core.assets import missing_assets
+    from app.core.config import settings
+    from app.core.server import has_module, production_command
+
+    missing = missing_assets()
+    if missing and not args.cdn_assets:
+        print(
+            f"Assets not built: {', '.join(missing)}; pages would load them "
+            "from a CDN. "
+            "Run `build-assets` (it needs the tailwindcss CLI) before serving, "
+            "or pass --cdn-assets.",
+        )
+        sys.exit(1)
+
+    if args.workers is not None:
+        settings.SERVER_WORKERS = args.workers
+    if args.uds:
+        settings.SERVER_UDS = args.uds
+    preload = args.preload or settings.SERVER_PRELOAD
+    if preload and not has_module("gunicorn"):
+        print("--preload requires gunicorn: pip install 'fastapi-htmx-starter[prod]'")
+        sys.exit(1)
+
+    command = production_command(settings, preload=preload)
+    print("Starting production server:", " ".join(command[1:]))
+    # exec so signals from the process manager reach the server directly
+    # and trigger its graceful shutdown.
+    os.execv(command[0], command)
 
 
 def test_command():
@@ -48,11 +104,407 @@ def check_types_command():
     subprocess.run([sys.executable, "-m", "mypy", "app/"], check=True)
 
 
+def seed_command(argv: list[str] | None = None) -> None:
+    """Seed the database with generated users and items."""
+    parser = argparse.ArgumentParser(
+        prog="seed",
+        description="Bulk-insert generated users and items for load testing.",
+    )
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--items-per-user", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=1,
+        help="generate item batches in N processes (0 = one per CPU)",
+    )
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    # Imported lazily so the other commands don't pay for the app import.
+    from app.core.database import engine
+    from app.services.seed import SeedOptions, SeedReport, seed_database
+
+    options = SeedOptions(
+        users=args.users,
+        items_per_user=args.items_per_user,
+        batch_size=args.batch_size,
+        seed=args.seed,
+        processes=args.processes or os.cpu_count() or 1,
+    )
+
+    def on_progress(kind: str, rows: int) -> None:
+        print(f"  {kind}: {rows:,} rows", end="\r", flush=True)
+
+    async def run() -> SeedReport:
+        try:
+            return await seed_database(engine, options, on_progress)
+        finally:
+            await engine.dispose()
+
+    print(
+        f"Seeding {options.users:,} users and "
+        f"{options.users * options.items_per_user:,} items "
+        f"(seed={options.seed}, processes={options.processes})...",
+    )
+    report = asyncio.run(run())
+    print()
+    rate = SeedReport.rate
+    print(
+        f"Users: {report.users:,} rows in {report.users_seconds:.2f}s "
+        f"({rate(report.users, report.users_seconds):,.0f} rows/s)",
+    )
+    print(
+        f"Items: {report.items:,} rows in {report.items_seconds:.2f}s "
+        f"({rate(report.items, report.items_seconds):,.0f} rows/s)",
+    )
+    print(
+        f"Total: {report.rows:,} rows in {report.seconds:.2f}s "
+        f"({rate(report.rows, report.seconds):,.0f} rows/s)",
+    )
+
+
+def import_time_command(argv: list[str] | None = None) -> None:
+    """Report the slowest imports of the app using ``python -X importtime``."""
+    parser = argparse.ArgumentParser(prog="import-time")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {args.module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # Lines look like: "import time:  self [us] |  cumulative | imported package"
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        rows.append(((int(self_us), int(cumulative_us)), name.rstrip()))
+
+    total_us = max((times[1] for times, _ in rows), default=0)
+    print(f"Importing {args.module} took {total_us / 1000:.1f} ms\n")
+    for title, key in (("cumulative", 1), ("self", 0)):
+        print(f"Top {args.top} by {title} time (ms):")
+        ranked = sorted(rows, key=lambda row: row[0][key], reverse=True)
+        for times, name in ranked[: args.top]:
+            print(f"  {times[key] / 1000:8.1f}  {name}")
+        print()
+
+
+def worker_command():
+    """Run the background job workers until interrupted."""
+    from app.core.config import settings
+    from app.core.database import AsyncSessionLocal, engine
+    from app.core.logs import setup_logging, shutdown_logging
+    from app.services import archive, user_hooks  # noqa: F401 - registers job handlers
+    from app.services.jobs import JobWorkerPool
+
+    setup_logging()
+
+    async def run() -> None:
+        pool = JobWorkerPool(AsyncSessionLocal)
+        try:
+            await pool.run_forever()
+        finally:
+            await pool.stop()
+            await engine.dispose()
+
+    print(f"Starting {settings.JOBS_CONCURRENCY} job workers...")
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print("Job workers stopped.")
+    finally:
+        shutdown_logging()
+
+
+def archive_items_command(argv: list[str] | None = None) -> None:
+    """Queue a background run that archives items nobody has touched lately."""
+    from app.core.config import settings
+
+    parser = argparse.ArgumentParser(
+        prog="archive-items",
+        description="Enqueue jobs moving stale items to the archive table; "
+        "run it from cron. The job workers do the work in rate-limited batches.",
+    )
+    parser.add_argument("--days", type=int, default=settings.ARCHIVE_AFTER_DAYS)
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    from app.core.database import AsyncSessionLocal, engine
+    from app.services.archive import schedule_archive
+
+    async def run() -> None:
+        try:
+            async with AsyncSessionLocal() as session:
+                await schedule_archive(session, args.days)
+                await session.commit()
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())
+    print(
+        f"Queued archiving of items untouched for {args.days} days "
+        f"({settings.ARCHIVE_BATCH_SIZE} per batch, "
+        f"every {settings.ARCHIVE_BATCH_INTERVAL}s).",
+    )
+
+
+def purge_attachments_command(argv: list[str] | None = None) -> None:
+    """Delete attachment blobs nothing references any more."""
+    parser = argparse.ArgumentParser(
+        prog="purge-attachments",
+        description="Delete stored blobs no attachment references (after their "
+        "item or last attachment was deleted) and abandoned partial uploads; "
+        "run it from cron.",
+    )
+    parser.add_argument(
+        "--grace-hours",
+        type=float,
+        default=24.0,
+        help="keep files touched this recently (uploads still in flight)",
+    )
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    from app.core.database import engine
+    from app.core.sharding import shard_router
+    from app.services.attachments import purge_orphan_blobs
+
+    engines = [engine]
+    if shard_router is not None:
+        engines.extend(shard_router.engines.values())
+
+    async def run() -> int:
+        try:
+            return await purge_orphan_blobs(engines, args.grace_hours * 3600)
+        finally:
+            await asyncio.gather(*(db.dispose() for db in engines))
+
+    print(f"Deleted {asyncio.run(run())} unreferenced attachment files.")
+
+
+def bench_rows_command(argv: list[str] | None = None) -> None:
+    """Compare ORM instances with lightweight rows on the item read paths."""
+    parser = argparse.ArgumentParser(
+        prog="bench-rows",
+        description="Measure per-row CPU time and memory of ORM Items vs ItemRow.",
+    )
+    parser.add_argument("--per-page", type=int, default=100)
+    parser.add_argument("--export-rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    from app.services.row_bench import run_row_benchmark
+
+    scenarios = {"page": args.per_page, "export": args.export_rows}
+    results = asyncio.run(run_row_benchmark(scenarios, args.repeat))
+
+    print(f"{'scenario':<10}{'path':<6}{'rows':>8}{'us/row':>10}{'bytes/row':>12}")
+    for result in results:
+        print(
+            f"{result.scenario:<10}{result.path:<6}{result.rows:>8,}"
+            f"{result.us_per_row:>10.2f}{result.bytes_per_row:>12,.0f}",
+        )
+
+
+def build_assets_command(argv: list[str] | None = None) -> None:
+    """Vendor, build, fingerprint and precompress the front-end assets."""
+    import shutil
+
+    parser = argparse.ArgumentParser(
+        prog="build-assets",
+        description="Write app/static/dist and its manifest. Run before deploying.",
+    )
+    parser.add_argument(
+        "--tailwind",
+        default=shutil.which("tailwindcss"),
+        help="path to the standalone Tailwind CLI (default: tailwindcss on PATH)",
+    )
+    parser.add_argument(
+        "--refresh-vendor",
+        action="store_true",
+        help="download the pinned htmx scripts again",
+    )
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    from app.core.assets import build_assets, missing_assets
+
+    manifest = build_assets(
+        tailwind=args.tailwind,
+        refresh_vendor=args.refresh_vendor,
+    )
+    for name, path in sorted(manifest.items()):
+        print(f"{name:<14}{path}")
+    missing = missing_assets()
+    if missing:
+        print(f"Not built: {', '.join(missing)}; pages load them from a CDN.")
+
+
+def rebalance_items_command(argv: list[str] | None = None) -> None:
+    """Move items to the shard their owner hashes to."""
+    parser = argparse.ArgumentParser(
+        prog="rebalance-items",
+        description="Move items onto their owner's shard after ITEM_SHARD_URLS "
+        "changes.",
+    )
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--user", type=UUID, help="rebalance a single owner")
+    target.add_argument("--all", action="store_true", help="rebalance every owner")
+    parser.add_argument("--batch-size", type=int, default=1_000)
+    parser.add_argument(
+        "--sleep",
+        type=float,
+        default=0.0,
+        help="seconds to pause between batches to limit load",
+    )
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    from sqlalchemy import select
+
+    from app.core.database import AsyncSessionLocal, engine
+    from app.core.sharding import shard_router
+    from app.models.user import User
+
+    if shard_router is None:
+        print("ITEM_SHARD_URLS is not set; items are not sharded.")
+        sys.exit(1)
+
+    async def run() -> tuple[int, int]:
+        try:
+            await shard_router.create_tables()
+            if args.user:
+                owners = [args.user]
+            else:
+                async with AsyncSessionLocal() as session:
+                    ids = select(User.id)  # type: ignore[call-overload]
+                    owners = list(await session.scalars(ids))
+            moved = 0
+            for owner_id in owners:
+                count = await shard_router.rebalance(
+                    owner_id,
+                    batch_size=args.batch_size,
+                    pause=args.sleep,
+                )
+                if count:
+                    print(f"  {owner_id}: {count:,} items")
+                moved += count
+            return len(owners), moved
+        finally:
+            await shard_router.dispose()
+            await engine.dispose()
+
+    started = time.perf_counter()
+    owners, moved = asyncio.run(run())
+    seconds = time.perf_counter() - started
+    print(
+        f"Checked {owners:,} owners, moved {moved:,} items in {seconds:.2f}s "
+        f"({moved / seconds if seconds else 0:,.0f} rows/s)",
+    )
+
+
+def data_migrations_command(argv: list[str] | None = None) -> None:
+    """Run or inspect resumable, batched data migrations."""
+    parser = argparse.ArgumentParser(
+        prog="data-migrations",
+        description="Backfills run in checkpointed key ranges, separately from "
+        "`alembic upgrade`. An interrupted run resumes where it stopped.",
+    )
+    parser.add_argument(
+        "--shard",
+        type=int,
+        help="index into ITEM_SHARD_URLS to migrate instead of DATABASE_URL",
+    )
+    commands = parser.add_subparsers(dest="action", required=True)
+    commands.add_parser("status", help="list migrations and their progress")
+    run = commands.add_parser("run", help="run or resume a migration")
+    run.add_argument("name")
+    run.add_argument("--batch-size", type=int, default=1_000)
+    run.add_argument(
+        "--sleep",
+        type=float,
+        default=0.0,
+        help="seconds to pause between batches to limit load",
+    )
+    run.add_argument("--max-batches", type=int, help="stop after this many batches")
+    reset = commands.add_parser("reset", help="forget a migration's progress")
+    reset.add_argument("name")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    from app.core.database import AsyncSessionLocal, engine
+    from app.core.sharding import shard_router
+    from app.models.data_migration import DataMigrationCheckpoint
+    from app.services import backfills  # noqa: F401 - registers migrations
+    from app.services.data_migrations import (
+        MIGRATIONS,
+        migration_status,
+        reset_migration,
+        run_migration,
+    )
+
+    session_factory = AsyncSessionLocal
+    if args.shard is not None:
+        if shard_router is None:
+            print("ITEM_SHARD_URLS is not set; items are not sharded.")
+            sys.exit(1)
+        session_factory = shard_router.sessionmakers[shard_router.urls[args.shard]]
+    if getattr(args, "name", None) and args.name not in MIGRATIONS:
+        print(f"Unknown data migration: {args.name}")
+        sys.exit(1)
+
+    def on_batch(checkpoint: DataMigrationCheckpoint) -> None:
+        print(
+            f"  {checkpoint.name}: {checkpoint.batches:,} batches, "
+            f"{checkpoint.rows:,} rows, up to key {checkpoint.last_key}",
+        )
+
+    async def run_action() -> None:
+        try:
+            if shard_router is not None:
+                await shard_router.create_tables()
+            if args.action == "status":
+                async with session_factory() as session:
+                    rows = await migration_status(session)
+                for row in rows:
+                    print(
+                        f"{row['name']:<22}{row['status']:<10}"
+                        f"{row['rows']:>10,} rows  {row['description']}",
+                    )
+            elif args.action == "reset":
+                async with session_factory() as session:
+                    await reset_migration(session, args.name)
+                    await session.commit()
+                print(f"Reset {args.name}.")
+            else:
+                started = time.perf_counter()
+                checkpoint = await run_migration(
+                    session_factory,
+                    args.name,
+                    batch_size=args.batch_size,
+                    pause=args.sleep,
+                    max_batches=args.max_batches,
+                    on_batch=on_batch,
+                )
+                print(
+                    f"{args.name} is {checkpoint.status} after "
+                    f"{time.perf_counter() - started:.2f}s.",
+                )
+        finally:
+            if shard_router is not None:
+                await shard_router.dispose()
+            await engine.dispose()
+
+    asyncio.run(run_action())
+
+
 if __name__ == "__main__":
     if len(sys.argv) > 1:
         command = sys.argv[1]
         if command == "serve":
-            serve_command()
+            serve_command(sys.argv[2:])
         elif command == "test":
             test_command()
         elif command == "lint":
@@ -61,9 +513,29 @@ if __name__ == "__main__":
             format_command()
         elif command == "check-types":
             check_types_command()
+        elif command == "seed":
+            seed_command(sys.argv[2:])
+        elif command == "import-time":
+            import_time_command(sys.argv[2:])
+        elif command == "worker":
+            worker_command()
+        elif command == "archive-items":
+            archive_items_command(sys.argv[2:])
+        elif command == "bench-rows":
+            bench_rows_command(sys.argv[2:])
+        elif command == "rebalance-items":
+            rebalance_items_command(sys.argv[2:])
+        elif command == "build-assets":
+            build_assets_command(sys.argv[2:])
+        elif command == "data-migrations":
+            data_migrations_command(sys.argv[2:])
         else:
             print(f"Unknown command: {command}")
             sys.exit(1)
     else:
-        print("Available commands: serve, test, lint, format, check-types")
+        print(
+            "Available commands: serve, test, lint, format, check-types, seed, "
+            "import-time, worker, archive-items, rebalance-items, bench-rows, "
+            "build-assets, data-migrations",
+        )
         sys.exit(1)
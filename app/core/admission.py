@@ -0,0 +1,164 @@
+"""Admission control: bounded concurrency per route class, with load shedding.
+
+Requests are sorted into classes (``auth``, ``write``, ``read``) and each
+class admits at most ``ADMISSION_LIMITS[class]`` requests at once. Up to
+``ADMISSION_QUEUE_SIZE`` more may wait, each for at most
+``ADMISSION_QUEUE_TIMEOUT`` seconds. Anything beyond that gets an immediate
+``503`` with ``Retry-After``, so when the database slows down the backlog
+stays bounded instead of every request timing out together.
+"""
+
+import asyncio
+import time
+from typing import Any
+
+from starlette.responses import HTMLResponse, JSONResponse, Response
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+# Never queued: static files, readiness probes and the metrics that explain
+# why requests are being shed.
+EXEMPT_PREFIXES = ("/static", "/ready", "/admin/metrics")
+
+
+def route_class(scope: Scope) -> str | None:
+    path = scope["path"]
+    if path.startswith(EXEMPT_PREFIXES):
+        return None
+    if path.startswith("/auth/"):
+        return "auth"
+    return "write" if scope["method"] in WRITE_METHODS else "read"
+
+
+class Gate:
+    """A concurrency limit with a bounded, deadline-limited wait queue."""
+
+    def __init__(self, limit: int, queue_size: int, timeout: float) -> None:
+        self.limit = limit
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(limit)
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed_queue_full = 0
+        self.shed_timeout = 0
+        self.queued = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    async def acquire(self) -> bool:
+        """Wait for a slot; False means the request should be shed."""
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()
+        elif self.waiting >= self.queue_size:
+            self.shed_queue_full += 1
+            return False
+        else:
+            self.waiting += 1
+            started = time.perf_counter()
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.timeout)
+            except TimeoutError:
+                self.shed_timeout += 1
+                return False
+            finally:
+                self.waiting -= 1
+                waited = time.perf_counter() - started
+                self.queued += 1
+                self.total_wait += waited
+                self.max_wait = max(self.max_wait, waited)
+        self.in_flight += 1
+        self.admitted += 1
+        return True
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "avg_wait_ms": (
+                round(self.total_wait / self.queued * 1000, 2) if self.queued else 0
+            ),
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+            "shed_queue_full": self.shed_queue_full,
+            "shed_timeout": self.shed_timeout,
+        }
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        limits: dict[str, int],
+        queue_size: int,
+        timeout: float,
+    ) -> None:
+        self.gates = {
+            name: Gate(limit, queue_size, timeout) for name, limit in limits.items()
+        }
+
+    def snapshot(self) -> dict[str, Any]:
+        return {name: gate.snapshot() for name, gate in self.gates.items()}
+
+
+admission = AdmissionController(
+    settings.ADMISSION_LIMITS,
+    settings.ADMISSION_QUEUE_SIZE,
+    settings.ADMISSION_QUEUE_TIMEOUT,
+)
+
+
+def overloaded_response(scope: Scope) -> Response:
+    headers = {"Retry-After": str(settings.ADMISSION_RETRY_AFTER)}
+    request_headers = dict(scope["headers"])
+    if request_headers.get(b"hx-request") == b"true":
+        # base.jinja2 swaps 503s carrying Retry-After into #global-messages.
+        headers |= {"HX-Retarget": "#global-messages", "HX-Reswap": "innerHTML"}
+        return HTMLResponse(
+            '<p class="text-red-500 bg-white p-2 rounded">'
+            "The server is busy right now. Please try again in a moment.</p>",
+            status_code=503,
+            headers=headers,
+        )
+    return JSONResponse(
+        {"detail": "Server overloaded, retry later"},
+        status_code=503,
+        headers=headers,
+    )
+
+
+class AdmissionControlMiddleware:
+    """Pure ASGI middleware that admits, queues or sheds each request."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        controller: AdmissionController = admission,
+    ) -> None:
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        gate = None
+        if scope["type"] == "http":
+            gate = self.controller.gates.get(route_class(scope) or "")
+        if gate is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await gate.acquire():
+            await overloaded_response(scope)(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.release()
@@ -0,0 +1,286 @@
+"""Self-hosted, fingerprinted and precompressed front-end assets.
+
+``build_assets`` (the ``build-assets`` command) produces everything under
+``app/static/dist``:
+
+- htmx, committed to ``app/static/vendor`` and checked against its pinned
+  sha256 (downloaded again only if it is missing or altered);
+- first-party scripts such as our ``json-enc`` htmx extension;
+- a purged, minified Tailwind bundle built from ``app/static/css/app.css``
+  by the standalone ``tailwindcss`` CLI, scanning the templates and any
+  classes set from Python;
+- a copy of each asset named after its content hash, with ``.gz`` and (if
+  the ``brotli`` package is installed) ``.br`` siblings;
+- ``manifest.json``, mapping logical names such as ``htmx.js`` to those
+  fingerprinted paths.
+
+``asset_url`` resolves a logical name through the manifest. Without a build
+it falls back to the unfingerprinted first-party and vendored files, so a
+fresh checkout still works offline, except for Tailwind, which then comes
+from its CDN (as does htmx if its vendored copy was altered); ``serve
+--prod`` refuses to start then (see ``missing_assets``). A build keeps the
+files of the build before it, so workers still holding the previous
+manifest keep serving it until they restart.
+``PrecompressedStaticFiles`` serves the smallest variant the client accepts
+and marks fingerprinted files immutable.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import subprocess
+from functools import cache
+from mimetypes import guess_type
+from os import stat_result
+from pathlib import Path
+from stat import S_ISREG
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = Path(__file__).resolve().parents[1] / "static"
+DIST = "dist"
+MANIFEST = "manifest.json"
+
+# Pinned third-party scripts: logical name -> (source URL, sha256 of its
+# content). Each is committed as ``vendor/<name>``; a download whose digest
+# differs is refused.
+VENDOR = {
+    "htmx.js": (
+        "https://unpkg.com/htmx.org@2.0.4/dist/htmx.min.js",
+        "e209dda5c8235479f3166defc7750e1dbcd5a5c1808b7792fc2e6733768fb447",
+    ),
+}
+
+# First-party scripts: logical name -> path under the static directory.
+SCRIPTS = {"json-enc.js": "js/json-enc.js"}
+
+# Logical names that only a build produces.
+BUILT = ["app.css"]
+
+# Where Tailwind looks for class names.
+TAILWIND_CONTENT = ["app/templates/**/*.jinja2", "app/**/*.py"]
+
+# Content-Encoding -> file suffix, in order of preference.
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def _verified(path: Path, sha256: str) -> bool:
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest() == sha256
+    except FileNotFoundError:
+        return False
+
+
+def _download(url: str, path: Path, sha256: str) -> None:
+    import urllib.request
+
+    with urllib.request.urlopen(url, timeout=30) as response:  # noqa: S310
+        data = response.read()
+    digest = hashlib.sha256(data).hexdigest()
+    if digest != sha256:
+        raise ValueError(f"sha256 {digest} does not match the pinned {sha256}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+
+
+def _build_tailwind(tailwind: str, static_dir: Path) -> Path:
+    output = static_dir / "css" / "app.build.css"
+    subprocess.run(  # noqa: S603
+        [
+            tailwind,
+            "--input",
+            str(static_dir / "css" / "app.css"),
+            "--output",
+            str(output),
+            "--content",
+            ",".join(TAILWIND_CONTENT),
+            "--minify",
+        ],
+        check=True,
+    )
+    return output
+
+
+def _compress(path: Path) -> None:
+    data = path.read_bytes()
+    path.with_name(path.name + ".gz").write_bytes(
+        gzip.compress(data, compresslevel=9, mtime=0),
+    )
+    try:
+        import brotli
+    except ImportError:
+        return
+    path.with_name(path.name + ".br").write_bytes(
+        brotli.compress(data, quality=11),
+    )
+
+
+def build_assets(
+    static_dir: Path = STATIC_DIR,
+    tailwind: str | None = None,
+    refresh_vendor: bool = False,
+) -> dict[str, str]:
+    """Build ``<static_dir>/dist`` and return the new manifest.
+
+    ``tailwind`` is the path to the Tailwind CLI. Assets that can't be
+    produced (a vendored script that is altered and can't be downloaded, no
+    Tailwind CLI) are left out of the manifest.
+    """
+    sources: dict[str, Path] = {}
+    for name, (url, sha256) in VENDOR.items():
+        path = static_dir / "vendor" / name
+        if refresh_vendor or not _verified(path, sha256):
+            try:
+                _download(url, path, sha256)
+            except (OSError, ValueError) as exc:
+                logger.warning("Could not vendor %s from %s: %s", name, url, exc)
+                continue
+            vendored_path.cache_clear()
+        sources[name] = path
+
+    for name, relative in SCRIPTS.items():
+        path = static_dir / relative
+        if path.exists():
+            sources[name] = path
+        else:
+            logger.warning("Missing %s; it is left out of the build", path)
+
+    if tailwind:
+        sources["app.css"] = _build_tailwind(tailwind, static_dir)
+    else:
+        logger.warning("No tailwindcss CLI; pages keep the Tailwind CDN")
+
+    dist = static_dir / DIST
+    dist.mkdir(parents=True, exist_ok=True)
+    manifest = {}
+    for name, source in sources.items():
+        data = source.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        stem, _, suffix = name.rpartition(".")
+        target = dist / f"{stem}.{digest}.{suffix}"
+        if not target.exists():
+            target.write_bytes(data)
+            _compress(target)
+        manifest[name] = f"{DIST}/{target.name}"
+
+    # Drop files referenced by neither this build nor the previous one (which
+    # workers started before this build still serve), then publish the
+    # manifest last so a running server never sees entries whose files don't
+    # exist yet.
+    load_manifest.cache_clear()
+    previous = load_manifest(static_dir)
+    keep = {Path(path).name for path in [*manifest.values(), *previous.values()]}
+    keep.add(MANIFEST)
+    for path in dist.iterdir():
+        if path.name.removesuffix(".br").removesuffix(".gz") not in keep:
+            path.unlink()
+    tmp = dist / f"{MANIFEST}.tmp"
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    tmp.replace(dist / MANIFEST)
+    load_manifest.cache_clear()
+    return manifest
+
+
+@cache
+def load_manifest(static_dir: Path = STATIC_DIR) -> dict[str, str]:
+    try:
+        manifest: dict[str, str] = json.loads(
+            (static_dir / DIST / MANIFEST).read_text(),
+        )
+    except FileNotFoundError:
+        return {}
+    return manifest
+
+
+@cache
+def vendored_path(name: str, static_dir: Path = STATIC_DIR) -> str | None:
+    """``vendor/<name>`` under the static directory, if it is the pinned file."""
+    if _verified(static_dir / "vendor" / name, VENDOR[name][1]):
+        return f"vendor/{name}"
+    return None
+
+
+def asset_url(name: str) -> str | None:
+    """The URL for a logical asset name; None if it has neither file nor CDN.
+
+    Registered as a template global.
+    """
+    path = load_manifest().get(name) or SCRIPTS.get(name)
+    if path is None and name in VENDOR:
+        path = vendored_path(name)
+        if path is None:
+            return VENDOR[name][0]
+    return f"/static/{path}" if path is not None else None
+
+
+def missing_assets() -> list[str]:
+    """Logical asset names that pages would load from a CDN."""
+    return [
+        name
+        for name in [*VENDOR, *SCRIPTS, *BUILT]
+        if not (asset_url(name) or "").startswith("/static/")
+    ]
+
+
+def _accepted_encodings(scope: Scope) -> set[str]:
+    header = Headers(scope=scope).get("accept-encoding", "")
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") not in ("q=0", "q=0.0"):
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """``StaticFiles`` serving ``.br``/``.gz`` siblings to clients that accept them.
+
+    Files under ``dist/`` are named after their content, so they are cached
+    forever.
+    """
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        response: Response | None = None
+        accepted = _accepted_encodings(scope)
+        for encoding, suffix in ENCODINGS.items():
+            if encoding not in accepted:
+                continue
+            full_path, stat = await anyio.to_thread.run_sync(
+                self.lookup_path,
+                path + suffix,
+            )
+            if stat is not None and S_ISREG(stat.st_mode):
+                response = self._encoded_response(path, full_path, stat, encoding)
+                if self.is_not_modified(response.headers, Headers(scope=scope)):
+                    response = NotModifiedResponse(response.headers)
+                break
+        if response is None:
+            response = await super().get_response(path, scope)
+
+        if response.status_code in (200, 206, 304) and path.startswith(f"{DIST}/"):
+            response.headers["Cache-Control"] = IMMUTABLE
+            response.headers["Vary"] = "Accept-Encoding"
+        return response
+
+    @staticmethod
+    def _encoded_response(
+        path: str,
+        full_path: str,
+        stat: stat_result,
+        encoding: str,
+    ) -> FileResponse:
+        return FileResponse(
+            full_path,
+            stat_result=stat,
+            media_type=guess_type(path)[0] or "application/octet-stream",
+            headers={"Content-Encoding": encoding},
+        )
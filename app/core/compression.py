@@ -0,0 +1,157 @@
+"""Response compression negotiated per request and tuned per content type.
+
+``CompressionMiddleware`` replaces Starlette's ``GZipMiddleware``. It picks
+the best encoding the client accepts out of ``COMPRESSION_ENCODINGS`` (br
+and zstd only when the ``brotli``/``zstandard`` packages are installed,
+gzip always) and compresses at ``COMPRESSION_LEVELS[encoding]``.
+
+Only content types listed in ``COMPRESSION_MIN_SIZES`` are compressed, and
+only bodies at least that large, so small HTMX fragments and empty redirect
+responses go out as-is. Responses that already carry a Content-Encoding,
+partial content, ``Cache-Control: no-transform`` and streamed bodies
+(files, downloads, event streams) are passed through untouched.
+"""
+
+import gzip
+from typing import Callable
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+# Bodies this large are compressed in a worker thread, off the event loop.
+THREAD_MIN_SIZE = 256 * 1024
+
+
+def _gzip(data: bytes, level: int) -> bytes:
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def available_compressors() -> dict[str, Callable[[bytes, int], bytes]]:
+    compressors: dict[str, Callable[[bytes, int], bytes]] = {"gzip": _gzip}
+    try:
+        import brotli
+    except ImportError:
+        pass
+    else:
+        compressors["br"] = lambda data, level: brotli.compress(data, quality=level)
+    try:
+        import zstandard
+    except ImportError:
+        pass
+    else:
+        compressors["zstd"] = lambda data, level: zstandard.ZstdCompressor(
+            level=level,
+        ).compress(data)
+    return compressors
+
+
+def negotiate(accept_encoding: str, offered: list[str]) -> str | None:
+    """The offered encoding with the highest q-value; ties go to ``offered`` order."""
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, *params = (token.strip() for token in part.split(";"))
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        if coding:
+            weights[coding.lower()] = weight
+
+    best, best_weight = None, 0.0
+    for coding in offered:
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def minimum_size(content_type: str, sizes: dict[str, int]) -> int | None:
+    """The size threshold for ``content_type``, or None if it isn't compressed."""
+    media_type = content_type.partition(";")[0].strip().lower()
+    return sizes.get(media_type)
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware compressing whole, compressible response bodies."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        encodings: list[str] = settings.COMPRESSION_ENCODINGS,
+        levels: dict[str, int] = settings.COMPRESSION_LEVELS,
+        min_sizes: dict[str, int] = settings.COMPRESSION_MIN_SIZES,
+    ) -> None:
+        self.app = app
+        self.compressors = available_compressors()
+        self.encodings = [coding for coding in encodings if coding in self.compressors]
+        self.levels = levels
+        self.min_sizes = min_sizes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        encoding = negotiate(accept_encoding, self.encodings)
+        start: Message | None = None
+        threshold = 0
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, threshold, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                size = minimum_size(headers.get("content-type", ""), self.min_sizes)
+                threshold = size or 0
+                passthrough = (
+                    size is None
+                    or message["status"] in (204, 206, 304)
+                    or "content-encoding" in headers
+                    or "content-range" in headers
+                    or "no-transform" in headers.get("cache-control", "")
+                )
+                if passthrough:
+                    await send(message)
+                else:
+                    # Hold the headers until the first body chunk decides.
+                    start = message
+                return
+            if passthrough or start is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            # Whatever happens to this chunk, later ones go straight through.
+            passthrough = True
+            body = message.get("body", b"")
+            # A streamed body (more_body) is never buffered or compressed.
+            if not message.get("more_body", False) and len(body) >= threshold:
+                headers = MutableHeaders(raw=start["headers"])
+                headers.add_vary_header("Accept-Encoding")
+                if encoding is not None:
+                    body = await self._compress(body, encoding)
+                    headers["Content-Encoding"] = encoding
+                    headers["Content-Length"] = str(len(body))
+                    etag = headers.get("etag")
+                    if etag and not etag.startswith("W/"):
+                        # The bytes differ from the identity representation.
+                        headers["ETag"] = f"W/{etag}"
+                    message = {**message, "body": body}
+            await send(start)
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
+
+    async def _compress(self, body: bytes, encoding: str) -> bytes:
+        compress = self.compressors[encoding]
+        level = self.levels[encoding]
+        if len(body) >= THREAD_MIN_SIZE:
+            return await anyio.to_thread.run_sync(compress, body, level)
+        return compress(body, level)
@@ -10,6 +10,44 @@ class Settings(BaseSettings):
     # Default to SQLite for development, override with .env for production
     DATABASE_URL: str = "sqlite+aiosqlite:///./app.db"
     SQLITE_ASYNC_CONN_STR: str | None = None
+    # Alembic owns the schema: on startup only verify the database is at the
+    # head revision. DB_CREATE_ALL restores the old create_all behaviour for
+    # throwaway local databases.
+    DB_CHECK_REVISION: bool = True
+    DB_CREATE_ALL: bool = False
+    # Optional item shards (app/core/sharding.py), e.g. a JSON list of
+    # sqlite+aiosqlite:///./shard0.db URLs. Empty keeps items on DATABASE_URL.
+    ITEM_SHARD_URLS: list[str] = []
+    # Items untouched for ARCHIVE_AFTER_DAYS move to archived_items when
+    # `archive-items` runs, ARCHIVE_BATCH_SIZE rows per job, one job every
+    # ARCHIVE_BATCH_INTERVAL seconds so foreground queries aren't starved.
+    ARCHIVE_AFTER_DAYS: int = 180
+    ARCHIVE_BATCH_SIZE: int = 500
+    ARCHIVE_BATCH_INTERVAL: float = 1.0
+    # Item attachments are stored content-addressed under ATTACHMENTS_DIR
+    # (relative paths are relative to the project root).
+    ATTACHMENTS_DIR: str = "data/attachments"
+    ATTACHMENT_MAX_BYTES: int = 25 * 1024 * 1024
+    # Infinite scrolling (app/services/item_scroll.py): chunk sizes between
+    # SCROLL_MIN_ROWS and SCROLL_MAX_ROWS, adapted so a chunk takes about
+    # SCROLL_TARGET_MS to query and render. The next chunk is prefetched;
+    # at most SCROLL_PREFETCH_MAX are kept, for SCROLL_PREFETCH_TTL seconds.
+    SCROLL_TARGET_MS: float = 50.0
+    SCROLL_MIN_ROWS: int = 10
+    SCROLL_MAX_ROWS: int = 100
+    SCROLL_PREFETCH_TTL: float = 30.0
+    SCROLL_PREFETCH_MAX: int = 512
+    # Search-box suggestions (app/services/suggestions.py): at most
+    # SUGGEST_MAX_ENTRIES index keys are kept in memory per worker, and each
+    # user's index is rebuilt after SUGGEST_INDEX_TTL seconds.
+    SUGGEST_LIMIT: int = 10
+    SUGGEST_MAX_ENTRIES: int = 200_000
+    SUGGEST_INDEX_TTL: float = 60.0
+    # Tag facets (app/services/tags.py): counts for a search are cached per
+    # user and search, at most TAG_FACET_CACHE_SIZE of them per worker, each
+    # for TAG_FACET_CACHE_TTL seconds (writes in other workers show up then).
+    TAG_FACET_CACHE_SIZE: int = 1024
+    TAG_FACET_CACHE_TTL: float = 10.0
 
     # Security
     # IMPORTANT: Use a strong, randomly generated secret in production.
@@ -17,6 +55,98 @@ class Settings(BaseSettings):
     # Store this persistent key in your .env file or environment variables.
     SECRET_KEY: str = secrets.token_hex(32)
 
+    # Logging (app/core/logs.py): written from a background thread, as JSON
+    # lines unless LOG_JSON is off. Access logs record every error and every
+    # request slower than ACCESS_LOG_SLOW_MS; other requests are sampled at
+    # ACCESS_LOG_SAMPLE_RATE while traffic exceeds ACCESS_LOG_SAMPLE_ABOVE_RPS.
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = True
+    ACCESS_LOG: bool = True
+    ACCESS_LOG_SLOW_MS: float = 500.0
+    ACCESS_LOG_SAMPLE_ABOVE_RPS: float = 50.0
+    ACCESS_LOG_SAMPLE_RATE: float = 0.1
+
+    # Response compression (app/core/compression.py). Encodings in preference
+    # order (br needs `brotli`, zstd needs `zstandard`); only the media types
+    # in COMPRESSION_MIN_SIZES are compressed, and only bodies at least that
+    # many bytes long.
+    COMPRESSION_ENCODINGS: list[str] = ["br", "zstd", "gzip"]
+    COMPRESSION_LEVELS: dict[str, int] = {"br": 4, "zstd": 3, "gzip": 6}
+    COMPRESSION_MIN_SIZES: dict[str, int] = {
+        "text/html": 1024,
+        "application/json": 1024,
+        "text/css": 256,
+        "text/javascript": 256,
+        "application/javascript": 256,
+        "text/plain": 1024,
+        "image/svg+xml": 512,
+    }
+    # Strip template indentation at load time (trim_blocks/lstrip_blocks and
+    # a loader collapsing whitespace outside <pre>, <textarea>, <script> and
+    # <style>), so pages are smaller before they are compressed.
+    TEMPLATE_MINIFY: bool = True
+
+    # Anonymous visitors (no auth cookie) get these pages from prerendered,
+    # precompressed buffers (app/core/page_cache.py), at most
+    # PAGE_CACHE_MAX_ENTRIES distinct host/path/query combinations. Only the
+    # query parameters those templates read are part of the key; list any new
+    # one here or every value of it gets the page of the first. The Host
+    # header is normalised before it goes in the key; responses carry
+    # Vary: Cookie.
+    PAGE_CACHE: bool = True
+    PAGE_CACHE_PATHS: list[str] = ["/", "/auth/login", "/auth/register"]
+    PAGE_CACHE_QUERY_PARAMS: list[str] = ["registered"]
+    PAGE_CACHE_MAX_ENTRIES: int = 256
+
+    # Admission control (app/core/admission.py): concurrent requests per route
+    # class in each worker. Up to ADMISSION_QUEUE_SIZE more wait at most
+    # ADMISSION_QUEUE_TIMEOUT seconds; the rest get 503 + Retry-After.
+    ADMISSION_CONTROL: bool = True
+    ADMISSION_LIMITS: dict[str, int] = {"read": 64, "write": 16, "auth": 8}
+    ADMISSION_QUEUE_SIZE: int = 128
+    ADMISSION_QUEUE_TIMEOUT: float = 2.0
+    ADMISSION_RETRY_AFTER: int = 1
+
+    # Warm-up before the worker takes traffic (templates, statements, pool).
+    # WARMUP_POOL_CONNECTIONS defaults to the pool's configured size.
+    WARMUP_ENABLED: bool = False
+    WARMUP_POOL_CONNECTIONS: int | None = None
+
+    # Profiling endpoints under /admin/diagnostics (app/core/diagnostics.py),
+    # for superusers. Off by default: the router isn't even mounted.
+    DIAGNOSTICS: bool = False
+
+    # Background jobs (app/services/jobs.py), run by `python -m app.cli
+    # worker` as a separate process. With JOBS_IN_PROCESS the lifespan also
+    # runs a worker pool in every web worker, which suits development.
+    JOBS_IN_PROCESS: bool = False
+    JOBS_CONCURRENCY: int = 4
+    JOBS_POLL_INTERVAL: float = 1.0
+    JOBS_MAX_ATTEMPTS: int = 5
+    JOBS_RETRY_BACKOFF: float = 2.0
+    JOBS_VISIBILITY_TIMEOUT: int = 300
+
+    # Audit log (app/services/audit.py): events are buffered in memory, at
+    # most AUDIT_BUFFER_SIZE per worker (more are dropped and counted), and
+    # written AUDIT_BATCH_SIZE at a time or every AUDIT_FLUSH_INTERVAL seconds.
+    AUDIT_LOG: bool = True
+    AUDIT_BUFFER_SIZE: int = 10_000
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL: float = 1.0
+
+    # Production server (`serve --prod`)
+    # SERVER_WORKERS=0 derives the worker count from the CPUs available to
+    # this process. SERVER_UDS binds a Unix socket instead of host/port.
+    SERVER_HOST: str = "0.0.0.0"  # noqa: S104
+    SERVER_PORT: int = 8000
+    SERVER_UDS: str | None = None
+    SERVER_WORKERS: int = 0
+    SERVER_KEEPALIVE: int = 5
+    SERVER_BACKLOG: int = 2048
+    SERVER_LIMIT_CONCURRENCY: int | None = None
+    SERVER_GRACEFUL_TIMEOUT: int = 30
+    SERVER_PRELOAD: bool = False
+
     @model_validator(mode="before")
     @classmethod
     def set_sqlite_async_conn_str(cls, values: Dict[str, Any]) -> Dict[str, Any]:
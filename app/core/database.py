@@ -1,10 +1,16 @@
-from typing import AsyncGenerator
+import ast
+from pathlib import Path
+from typing import Any, AsyncGenerator
 
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base
 
 from app.core.config import settings
 
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
 # Create the async engine with database-specific configurations
 engine_kwargs: dict = {
     "echo": False,  # Set to True to log SQL queries during development
@@ -48,3 +54,107 @@ async def init_db() -> None:
     async with engine.begin() as conn:
         # await conn.run_sync(Base.metadata.drop_all) # Use with caution
         await conn.run_sync(Base.metadata.create_all)
+
+
+class SchemaRevisionError(RuntimeError):
+    """The database is not at the Alembic head revision."""
+
+
+def _literal_assignment(tree: ast.Module, name: str) -> Any:
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1:
+            target, value = node.targets[0], node.value
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            target, value = node.target, node.value
+        else:
+            continue
+        if isinstance(target, ast.Name) and target.id == name:
+            return ast.literal_eval(value)
+    return None
+
+
+VERSIONS_DIR = PROJECT_ROOT / "alembic" / "versions"
+
+# Tables created by 0001_baseline, as ``create_all`` made them before the
+# app had migrations.
+BASELINE_TABLES = {"user", "items"}
+
+
+def migration_heads(versions_dir: Path = VERSIONS_DIR) -> set[str]:
+    """Head revisions of the migration scripts in ``versions_dir``.
+
+    The scripts are parsed rather than imported: loading Alembic's script
+    machinery costs more than the rest of the startup check combined.
+    """
+    revisions: set[str] = set()
+    parents: set[str] = set()
+    for path in versions_dir.glob("*.py"):
+        tree = ast.parse(path.read_text(encoding="utf-8"))
+        revision = _literal_assignment(tree, "revision")
+        if not revision:
+            continue
+        revisions.add(revision)
+        down = _literal_assignment(tree, "down_revision")
+        if isinstance(down, str):
+            parents.add(down)
+        elif down:
+            parents.update(down)
+    return revisions - parents
+
+
+async def check_schema_revision(versions_dir: Path = VERSIONS_DIR) -> None:
+    """Refuse to start unless the database is stamped with the Alembic head.
+
+    A single read of ``alembic_version`` replaces ``create_all``, which
+    reflects every table on every worker start.
+    """
+    expected = migration_heads(versions_dir)
+    if not expected:
+        raise SchemaRevisionError(f"No migration scripts found in {versions_dir}.")
+
+    failure: DBAPIError | None = None
+    async with engine.connect() as conn:
+        try:
+            result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+            current = set(result.scalars())
+        except DBAPIError as exc:
+            failure = exc
+    if failure is not None:
+        raise SchemaRevisionError(await _unstamped_hint()) from failure
+
+    if current != expected:
+        raise SchemaRevisionError(
+            f"Database revision {sorted(current) or 'none'} does not match "
+            f"migration head {sorted(expected)}; "
+            "run `alembic upgrade head` before starting the app.",
+        )
+
+
+async def _unstamped_hint() -> str:
+    """Explain how to bring a database without ``alembic_version`` to head."""
+    # A new connection: the failed SELECT aborts the transaction on PostgreSQL.
+    async with engine.connect() as conn:
+        tables = set(await conn.run_sync(lambda sync: inspect(sync).get_table_names()))
+    if not tables:
+        return (
+            "The database has no alembic_version table; "
+            "run `alembic upgrade head` before starting the app."
+        )
+    if tables <= BASELINE_TABLES:
+        return (
+            "The database has no alembic_version table but already has the "
+            "tables of the first migration, created by `create_all` before the "
+            "app used migrations; run `alembic stamp 0001`, then "
+            "`alembic upgrade head`, before starting the app."
+        )
+    return (
+        "The database has no alembic_version table but already has tables, "
+        f"{sorted(tables)}, probably created by DB_CREATE_ALL; if they match "
+        "the current models, run `alembic stamp head`, otherwise stamp the "
+        "last revision they match and run `alembic upgrade head`."
+    )
+
+
+async def dispose_db() -> None:
+    """Close all pooled connections; called on graceful shutdown."""
+    await engine.dispose()
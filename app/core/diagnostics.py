@@ -0,0 +1,311 @@
+"""Profiling a live worker from the inside.
+
+Everything here is opt-in: with ``DIAGNOSTICS`` off neither the router in
+app/api/diagnostics.py nor ``CPUProfilerMiddleware`` is installed, and
+nothing in this module runs.
+
+``MemoryProfiler`` drives ``tracemalloc``. Tracing only starts on request
+(it slows every allocation while on), a snapshot becomes the baseline, and
+later diffs against it show which file/line allocation sites grew.
+``live_object_counts`` walks the garbage collector's objects to count ORM
+instances, item rows and sessions, with the size of the sessions' identity
+maps.
+
+``CPUProfiler`` samples the event loop thread's stack from a helper thread
+(``sys._current_frames``) every few milliseconds for a fixed duration and
+counts the collapsed stacks, the input format of flamegraph.pl and
+speedscope. Each stack is prefixed with what the loop was running: the
+route of the request whose task was current (recorded by
+``CPUProfilerMiddleware``, installed along with the router), a background
+task's name, or ``(idle)`` while the loop waits for I/O: no task is current
+and the thread sits in the selector (asyncio's loop) or, for loops that
+wait in C such as uvloop, in the frame that drives the loop's callbacks.
+"""
+
+import asyncio
+import gc
+import inspect
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from types import FrameType
+from typing import Any, Literal
+
+import anyio
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.database import PROJECT_ROOT
+from app.models.item import ArchivedItem, Item
+from app.models.user import User
+from app.services.items import ItemRow
+
+GroupBy = Literal["lineno", "filename", "traceback"]
+
+# Allocations made by the profiler itself or by the import machinery.
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+# Counted by exact type, which is one dict lookup per live object.
+TRACKED_TYPES: dict[type, str] = {
+    Item: "Item",
+    ArchivedItem: "ArchivedItem",
+    User: "User",
+    ItemRow: "ItemRow",
+    Session: "Session",
+    AsyncSession: "AsyncSession",
+}
+
+
+def _site(stat: tracemalloc.Statistic | tracemalloc.StatisticDiff) -> dict[str, Any]:
+    frame = stat.traceback[0]
+    site = {
+        "file": frame.filename,
+        "line": frame.lineno,
+        "size_kib": round(stat.size / 1024, 1),
+        "count": stat.count,
+    }
+    if isinstance(stat, tracemalloc.StatisticDiff):
+        site["size_diff_kib"] = round(stat.size_diff / 1024, 1)
+        site["count_diff"] = stat.count_diff
+    if len(stat.traceback) > 1:
+        site["traceback"] = [f"{f.filename}:{f.lineno}" for f in stat.traceback]
+    return site
+
+
+class MemoryProfiler:
+    """Start/stop ``tracemalloc`` and diff snapshots against a baseline."""
+
+    def __init__(self) -> None:
+        self.baseline: tracemalloc.Snapshot | None = None
+
+    def status(self) -> dict[str, Any]:
+        tracing = tracemalloc.is_tracing()
+        current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        return {
+            "tracing": tracing,
+            "frames": tracemalloc.get_traceback_limit() if tracing else 0,
+            "traced_kib": round(current / 1024, 1),
+            "peak_kib": round(peak / 1024, 1),
+            "overhead_kib": round(tracemalloc.get_tracemalloc_memory() / 1024, 1),
+            "has_baseline": self.baseline is not None,
+        }
+
+    def start(self, frames: int = 1) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            self.baseline = None
+
+    def stop(self) -> None:
+        tracemalloc.stop()
+        self.baseline = None
+
+    def _take(self) -> tracemalloc.Snapshot:
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not running")
+        return tracemalloc.take_snapshot().filter_traces(_IGNORED)
+
+    def snapshot(self, limit: int, group_by: GroupBy = "lineno") -> dict[str, Any]:
+        """Make a new baseline and return its largest allocation sites."""
+        self.baseline = self._take()
+        stats = self.baseline.statistics(group_by)
+        return {
+            **self.status(),
+            "top": [_site(stat) for stat in stats[:limit]],
+        }
+
+    def diff(
+        self,
+        limit: int,
+        group_by: GroupBy = "lineno",
+        rebase: bool = False,
+    ) -> dict[str, Any]:
+        """The sites that grew most since the baseline (or since tracing began)."""
+        snapshot = self._take()
+        stats = (
+            snapshot.compare_to(self.baseline, group_by)
+            if self.baseline is not None
+            else snapshot.statistics(group_by)
+        )
+        if rebase:
+            self.baseline = snapshot
+        return {
+            **self.status(),
+            "top": [_site(stat) for stat in stats[:limit]],
+        }
+
+
+memory_profiler = MemoryProfiler()
+
+
+def live_object_counts() -> dict[str, Any]:
+    """Counts of tracked live objects and garbage collector statistics.
+
+    Walks every object the collector tracks, so it costs time proportional
+    to the heap; run it in a thread.
+    """
+    counts = dict.fromkeys(TRACKED_TYPES.values(), 0)
+    identity_map_entries = 0
+    objects = gc.get_objects()
+    for obj in objects:
+        name = TRACKED_TYPES.get(type(obj))
+        if name is None:
+            continue
+        counts[name] += 1
+        if name == "Session":
+            identity_map_entries += len(obj.identity_map)
+    return {
+        "objects": counts,
+        "identity_map_entries": identity_map_entries,
+        "gc_tracked": len(objects),
+        "gc_counts": gc.get_count(),
+        "gc_generations": gc.get_stats(),
+    }
+
+
+def _frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    if "site-packages/" in filename:
+        filename = filename.rpartition("site-packages/")[2]
+    elif filename.startswith(str(PROJECT_ROOT)):
+        filename = filename[len(str(PROJECT_ROOT)) + 1 :]
+    # ";" separates frames in the collapsed format.
+    return f"{code.co_qualname} ({filename}:{code.co_firstlineno})".replace(";", ",")
+
+
+def _dispatcher_frame() -> FrameType | None:
+    """The frame running the current task's steps, below its coroutines.
+
+    asyncio's pure-Python loop calls them from a fresh ``Handle._run``
+    frame each time; uvloop runs callbacks in C, so this is the long-lived
+    frame that started the loop and the thread's top frame while it waits.
+    """
+    frame: FrameType | None = sys._getframe(1)
+    while frame is not None and frame.f_code.co_flags & (
+        inspect.CO_COROUTINE | inspect.CO_ASYNC_GENERATOR
+    ):
+        frame = frame.f_back
+    return frame
+
+
+def _is_idle(frame: FrameType, dispatcher: FrameType | None) -> bool:
+    """Whether the loop is blocked waiting for I/O (with no task current)."""
+    if frame is dispatcher:
+        return True
+    return frame.f_code.co_name in ("select", "poll", "control") and (
+        frame.f_code.co_filename.endswith("selectors.py")
+    )
+
+
+class CPUProfiler:
+    """Stack sampling of the event loop thread, one profile at a time."""
+
+    def __init__(self) -> None:
+        self.active = False
+        self._scopes: dict[asyncio.Task, Scope] = {}
+
+    def track(self, task: asyncio.Task, scope: Scope) -> None:
+        self._scopes[task] = scope
+
+    def untrack(self, task: asyncio.Task) -> None:
+        self._scopes.pop(task, None)
+
+    def _label(self, task: asyncio.Task | None) -> str:
+        if task is None:
+            return "(loop)"
+        scope = self._scopes.get(task)
+        if scope is None:
+            return f"task:{task.get_name()}"
+        route = scope.get("route")
+        return f"route:{getattr(route, 'name', None) or scope['path']}"
+
+    def _sample(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        thread_id: int,
+        dispatcher: FrameType | None,
+        seconds: float,
+        interval: float,
+    ) -> Counter[str]:
+        stacks: Counter[str] = Counter()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            frame = sys._current_frames().get(thread_id)
+            if frame is not None:
+                task = asyncio.current_task(loop)
+                if task is None and _is_idle(frame, dispatcher):
+                    stacks["(idle)"] += 1
+                else:
+                    names = []
+                    while frame is not None:
+                        names.append(_frame_name(frame))
+                        frame = frame.f_back
+                    label = self._label(task)
+                    stacks[";".join([label, *reversed(names)])] += 1
+            time.sleep(interval)
+        return stacks
+
+    async def profile(self, seconds: float, interval: float) -> Counter[str]:
+        """Sample the running loop's thread for ``seconds``; collapsed stacks."""
+        if self.active:
+            raise RuntimeError("A CPU profile is already running")
+        self.active = True
+        try:
+            return await anyio.to_thread.run_sync(
+                self._sample,
+                asyncio.get_running_loop(),
+                threading.get_ident(),
+                _dispatcher_frame(),
+                seconds,
+                interval,
+            )
+        finally:
+            self.active = False
+
+
+cpu_profiler = CPUProfiler()
+
+
+def collapsed(stacks: Counter[str]) -> str:
+    """``stack count`` lines, most frequent first."""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+def by_label(stacks: Counter[str]) -> dict[str, int]:
+    """Samples per route, background task or idle."""
+    labels: Counter[str] = Counter()
+    for stack, count in stacks.items():
+        labels[stack.partition(";")[0]] += count
+    return dict(labels.most_common())
+
+
+class CPUProfilerMiddleware:
+    """Pure ASGI middleware attributing request tasks to routes for profiles.
+
+    Costs a dict insert and delete per request, so requests already in
+    flight when a profile starts are attributed too.
+    """
+
+    def __init__(self, app: ASGIApp, profiler: CPUProfiler = cpu_profiler) -> None:
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        task = asyncio.current_task()
+        if task is None or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        # Routing adds "route" to this same scope dict later on.
+        self.profiler.track(task, scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.profiler.untrack(task)
@@ -0,0 +1,31 @@
+"""Gunicorn worker class used by ``serve --prod --preload``.
+
+Only imported inside gunicorn, which is an optional dependency.
+"""
+
+from typing import Any
+
+from uvicorn.workers import UvicornWorker
+
+from app.core.config import settings
+from app.core.server import event_loop, http_protocol
+
+
+class Worker(UvicornWorker):
+    CONFIG_KWARGS: dict[str, Any] = {
+        "loop": event_loop(),
+        "http": http_protocol(),
+        "limit_concurrency": settings.SERVER_LIMIT_CONCURRENCY,
+        "timeout_graceful_shutdown": settings.SERVER_GRACEFUL_TIMEOUT,
+        "server_header": False,
+        "access_log": not settings.ACCESS_LOG,
+    }
+
+    def init_process(self) -> None:
+        # With --preload the engine was created in the master before fork.
+        # Drop the inherited pool without closing the parent's connections
+        # so each worker opens its own.
+        from app.core.database import engine
+
+        engine.sync_engine.dispose(close=False)
+        super().init_process()
@@ -0,0 +1,252 @@
+"""Logging that keeps I/O off the event loop, and structured access logs.
+
+``setup_logging`` points the root logger (and uvicorn's loggers) at a
+``QueueHandler``; a ``QueueListener`` thread does the formatting and the
+writes to stderr, so a slow terminal or log shipper never stalls a request.
+The app's lifespan (or the ``worker`` command) calls it on startup, in the
+process that serves, and ``shutdown_logging`` on the way out. Importing
+the app leaves the host's logging configuration alone.
+
+``AccessLogMiddleware`` emits one record per request with the route name,
+status, duration, time spent in the database, how long the request held a
+pooled connection and the user id. Those last three are collected in a
+per-request dict held by ``REQUEST_CONTEXT``: engine cursor events add to
+``db_ms``, pool checkout/checkin events to ``db_hold_ms``, and
+``UserManager.get`` records the user. ``pool_hold`` aggregates the hold
+times of every checkout for /admin/metrics.
+Under load, fast successful requests are sampled; errors and slow requests
+are always logged.
+"""
+
+import json
+import logging
+import queue
+import random
+import sys
+import time
+from contextvars import ContextVar
+from datetime import UTC, datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+REQUEST_CONTEXT: ContextVar[dict[str, Any] | None] = ContextVar(
+    "request_context",
+    default=None,
+)
+
+access_logger = logging.getLogger("app.access")
+
+_listener: QueueListener | None = None
+# (logger, handlers, propagate, level) to restore on shutdown.
+_replaced: list[tuple[logging.Logger, list[logging.Handler], bool, int]] = []
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; ``extra={"fields": {...}}`` adds keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, UTC).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **getattr(record, "fields", {}),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def _replace_handlers(
+    logger: logging.Logger,
+    handlers: list[logging.Handler],
+    propagate: bool,
+) -> None:
+    _replaced.append((logger, logger.handlers, logger.propagate, logger.level))
+    logger.handlers = handlers
+    logger.propagate = propagate
+
+
+def setup_logging() -> None:
+    """Route all logging through a queue drained by a background thread."""
+    global _listener
+    if _listener is not None:
+        return
+
+    formatter = (
+        JsonFormatter()
+        if settings.LOG_JSON
+        else logging.Formatter("%(levelname)s:%(name)s:%(message)s")
+    )
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(formatter)
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+
+    root = logging.getLogger()
+    _replace_handlers(root, [QueueHandler(log_queue)], root.propagate)
+    root.setLevel(settings.LOG_LEVEL)
+    # uvicorn installs its own synchronous stream handlers before importing
+    # the app; send its records through the queue as well.
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        _replace_handlers(logging.getLogger(name), [], True)
+
+    _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Write out queued records, stop the thread, restore the old handlers."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    _listener = None
+    for logger, handlers, propagate, level in reversed(_replaced):
+        logger.handlers = handlers
+        logger.propagate = propagate
+        logger.setLevel(level)
+    _replaced.clear()
+
+
+def record_user(user_id: UUID) -> None:
+    """Attribute the current request to ``user_id`` in its access log."""
+    context = REQUEST_CONTEXT.get()
+    if context is not None:
+        context["user_id"] = str(user_id)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn: Any, *args: Any) -> None:
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn: Any, *args: Any) -> None:
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    context = REQUEST_CONTEXT.get()
+    if context is not None:
+        context["db_ms"] += elapsed * 1000
+        context["db_queries"] += 1
+
+
+class PoolHoldStats:
+    """How long connections stay checked out of the pool."""
+
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, held_ms: float) -> None:
+        self.checkouts += 1
+        self.total_ms += held_ms
+        self.max_ms = max(self.max_ms, held_ms)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "checkouts": self.checkouts,
+            "avg_hold_ms": (
+                round(self.total_ms / self.checkouts, 2) if self.checkouts else 0.0
+            ),
+            "max_hold_ms": round(self.max_ms, 2),
+        }
+
+
+pool_hold = PoolHoldStats()
+
+
+@event.listens_for(Pool, "checkout")
+def _on_checkout(dbapi_connection: Any, record: Any, proxy: Any) -> None:
+    record.info["checked_out_at"] = time.perf_counter()
+
+
+@event.listens_for(Pool, "checkin")
+def _on_checkin(dbapi_connection: Any, record: Any) -> None:
+    started = record.info.pop("checked_out_at", None)
+    if started is None:
+        return
+    held_ms = (time.perf_counter() - started) * 1000
+    pool_hold.observe(held_ms)
+    context = REQUEST_CONTEXT.get()
+    if context is not None:
+        context["db_hold_ms"] += held_ms
+
+
+class AccessLogMiddleware:
+    """Pure ASGI middleware logging one structured record per request."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._second = 0
+        self._count = 0
+        self._last_rps = 0
+
+    def _sample_rate(self, status: int, duration_ms: float) -> float:
+        """The fraction of requests like this one that get logged."""
+        now = int(time.monotonic())
+        if now != self._second:
+            self._second, self._last_rps, self._count = now, self._count, 0
+        self._count += 1
+        if status >= 400 or duration_ms >= settings.ACCESS_LOG_SLOW_MS:
+            return 1.0
+        if self._last_rps <= settings.ACCESS_LOG_SAMPLE_ABOVE_RPS:
+            return 1.0
+        return settings.ACCESS_LOG_SAMPLE_RATE
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        context: dict[str, Any] = {
+            "db_ms": 0.0,
+            "db_queries": 0,
+            "db_hold_ms": 0.0,
+            "user_id": None,
+        }
+        token = REQUEST_CONTEXT.set(context)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUEST_CONTEXT.reset(token)
+            duration_ms = (time.perf_counter() - started) * 1000
+            rate = self._sample_rate(status, duration_ms)
+            if rate >= 1.0 or random.random() < rate:  # noqa: S311
+                route = scope.get("route")
+                access_logger.info(
+                    "%s %s %d",
+                    scope["method"],
+                    scope["path"],
+                    status,
+                    extra={
+                        "fields": {
+                            "method": scope["method"],
+                            "path": scope["path"],
+                            "route": getattr(route, "name", None),
+                            "status": status,
+                            "duration_ms": round(duration_ms, 2),
+                            "db_ms": round(context["db_ms"], 2),
+                            "db_queries": context["db_queries"],
+                            "db_hold_ms": round(context["db_hold_ms"], 2),
+                            "user_id": context["user_id"],
+                            "sample_rate": rate,
+                        },
+                    },
+                )
@@ -0,0 +1,282 @@
+"""Prerendered pages for anonymous visitors.
+
+The landing, login and register pages render the same bytes for everyone
+who isn't logged in. ``PageCacheMiddleware`` renders each of them once per
+scheme, host, path and value of the query parameters the templates read
+(``PAGE_CACHE_QUERY_PARAMS``; any other parameter is ignored, so appending
+junk to the URL can't force a fresh render). The host is part of the key
+because the pages embed absolute URLs; it is normalised first (case, trailing
+dot, default port), and a Host header that isn't a plain host name or address
+bypasses the cache. The first anonymous hit keeps
+the body together with its precompressed variants, compressed in a worker
+thread, and an ETag; later anonymous requests are served straight from
+memory: no routing, no user lookup, no template rendering, no compression.
+
+Any request carrying the auth cookie bypasses the cache, as does any
+response that isn't a plain 200 HTML page or that sets a cookie. Every
+response for these paths, cached or not, says ``Vary: Cookie`` so that shared
+caches downstream don't hand a logged-in page to anyone else.
+"""
+
+import hashlib
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders, QueryParams
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.compression import available_compressors, negotiate
+from app.core.config import settings
+from app.core.users import cookie_transport
+
+# Compressed once per page, off the event loop, so use the slowest, smallest
+# settings.
+PRECOMPRESS_LEVELS = {"br": 11, "zstd": 19, "gzip": 9}
+
+# Dropped from the stored response; they are set per variant when serving.
+_VARIANT_HEADERS = (b"content-length", b"content-encoding", b"etag", b"vary")
+
+_HOST = re.compile(r"(?P<name>[a-z0-9.-]+|\[[0-9a-f:.]+\])(?::(?P<port>[0-9]{1,5}))?")
+_DEFAULT_PORTS = {"http": "80", "https": "443"}
+
+
+def normalise_host(host: str, scheme: str) -> str | None:
+    """Return ``host`` in the form used in cache keys, or None if malformed.
+
+    ``Example.COM.:80`` and ``example.com`` name the same site over http.
+    """
+    match = _HOST.fullmatch(host.strip().lower())
+    if match is None:
+        return None
+    name = match["name"].rstrip(".")
+    if not name:
+        return None
+    port = match["port"]
+    if port is None or port == _DEFAULT_PORTS.get(scheme):
+        return name
+    return f"{name}:{port}"
+
+
+def _vary_on_cookie(send: Send) -> Send:
+    async def send_with_vary(message: Message) -> None:
+        if message["type"] == "http.response.start":
+            MutableHeaders(scope=message).add_vary_header("Cookie")
+        await send(message)
+
+    return send_with_vary
+
+
+@dataclass(slots=True)
+class CachedPage:
+    status: int
+    headers: list[tuple[bytes, bytes]]
+    etag: str
+    bodies: dict[str, bytes]
+
+
+class PageCache:
+    """A bounded LRU of prerendered pages, with hit/miss counters."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._pages: OrderedDict[tuple, CachedPage] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.not_modified = 0
+
+    def get(self, key: tuple) -> CachedPage | None:
+        page = self._pages.get(key)
+        if page is not None:
+            self._pages.move_to_end(key)
+        return page
+
+    def put(self, key: tuple, page: CachedPage) -> None:
+        self._pages[key] = page
+        self._pages.move_to_end(key)
+        while len(self._pages) > self.max_entries:
+            self._pages.popitem(last=False)
+
+    def clear(self) -> None:
+        self._pages.clear()
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "pages": len(self._pages),
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "bypassed": self.bypassed,
+        }
+
+
+page_cache = PageCache(settings.PAGE_CACHE_MAX_ENTRIES)
+
+
+def prerender(status: int, raw_headers: list, body: bytes) -> CachedPage:
+    """Build a ``CachedPage`` with every available precompressed variant."""
+    bodies = {"identity": body}
+    for encoding, compress in available_compressors().items():
+        bodies[encoding] = compress(body, PRECOMPRESS_LEVELS[encoding])
+    return CachedPage(
+        status=status,
+        headers=[
+            (name, value)
+            for name, value in raw_headers
+            if name.lower() not in _VARIANT_HEADERS
+        ],
+        etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+        bodies=bodies,
+    )
+
+
+class PageCacheMiddleware:
+    """Pure ASGI middleware serving anonymous GETs of ``paths`` from memory."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        paths: list[str] = settings.PAGE_CACHE_PATHS,
+        query_params: list[str] = settings.PAGE_CACHE_QUERY_PARAMS,
+        cache: PageCache = page_cache,
+    ) -> None:
+        self.app = app
+        self.paths = set(paths)
+        self.query_params = set(query_params)
+        self.cache = cache
+        self.cookie_name = cookie_transport.cookie_name
+
+    def _is_anonymous(self, headers: Headers) -> bool:
+        for cookie in headers.getlist("cookie"):
+            for part in cookie.split(";"):
+                if part.strip().partition("=")[0] == self.cookie_name:
+                    return False
+        return True
+
+    def _query_key(self, scope: Scope) -> tuple[tuple[str, str], ...]:
+        query = QueryParams(scope["query_string"])
+        return tuple(
+            sorted((k, v) for k, v in query.multi_items() if k in self.query_params),
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in ("GET", "HEAD")
+            or scope["path"] not in self.paths
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        host = normalise_host(headers.get("host", ""), scope["scheme"])
+        if host is None or not self._is_anonymous(headers):
+            self.cache.bypassed += 1
+            await self.app(scope, receive, _vary_on_cookie(send))
+            return
+
+        key = (
+            scope["scheme"],
+            host,
+            scope["path"],
+            self._query_key(scope),
+            headers.get("hx-request") == "true",
+        )
+        page = self.cache.get(key)
+        if page is None:
+            self.cache.misses += 1
+            await self._render_and_store(key, scope, receive, send)
+            return
+
+        self.cache.hits += 1
+        await self._serve(page, scope, headers, send)
+
+    async def _render_and_store(
+        self,
+        key: tuple,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+    ) -> None:
+        start: Message = {}
+        chunks: list[bytes] = []
+
+        async def capture(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                # Copied: outer middleware edit the header list in place.
+                start = {**message, "headers": list(message["headers"])}
+                MutableHeaders(scope=message).add_vary_header("Cookie")
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        await self.app(scope, receive, capture)
+
+        response_headers = Headers(raw=start.get("headers", []))
+        if (
+            scope["method"] == "GET"
+            and start.get("status") == 200
+            and "set-cookie" not in response_headers
+            and "content-encoding" not in response_headers
+            and response_headers.get("content-type", "").startswith("text/html")
+        ):
+            page = await anyio.to_thread.run_sync(
+                prerender,
+                start["status"],
+                start["headers"],
+                b"".join(chunks),
+            )
+            self.cache.put(key, page)
+
+    async def _serve(
+        self,
+        page: CachedPage,
+        scope: Scope,
+        request_headers: Headers,
+        send: Send,
+    ) -> None:
+        response_headers = MutableHeaders(raw=list(page.headers))
+        response_headers["ETag"] = page.etag
+        response_headers.add_vary_header("Accept-Encoding")
+        response_headers.add_vary_header("Cookie")
+
+        if_none_match = request_headers.get("if-none-match", "")
+        if page.etag in (tag.strip() for tag in if_none_match.split(",")):
+            self.cache.not_modified += 1
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 304,
+                    "headers": response_headers.raw,
+                },
+            )
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        offered = [
+            encoding
+            for encoding in settings.COMPRESSION_ENCODINGS
+            if encoding in page.bodies
+        ]
+        encoding = negotiate(request_headers.get("accept-encoding", ""), offered)
+        body = page.bodies[encoding or "identity"]
+        if encoding is not None:
+            response_headers["Content-Encoding"] = encoding
+        response_headers["Content-Length"] = str(len(body))
+        await send(
+            {
+                "type": "http.response.start",
+                "status": page.status,
+                "headers": response_headers.raw,
+            },
+        )
+        await send(
+            {
+                "type": "http.response.body",
+                "body": b"" if scope["method"] == "HEAD" else body,
+            },
+        )
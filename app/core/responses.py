@@ -0,0 +1,23 @@
+from collections.abc import Mapping
+from typing import Any
+
+import pydantic_core
+from fastapi.responses import JSONResponse
+
+
+def _fallback(value: Any) -> Any:
+    # Core result rows (``result.mappings()``) serialize as plain dicts.
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded by pydantic-core's Rust serializer.
+
+    Handles UUIDs, datetimes and result rows natively, so handlers can return
+    database rows without building Pydantic models first.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return pydantic_core.to_json(content, fallback=_fallback)
@@ -0,0 +1,112 @@
+"""Production server configuration.
+
+Builds the uvicorn (or gunicorn, when preloading) command line from
+``Settings`` so ``serve --prod`` and the container entrypoint agree.
+"""
+
+import importlib.util
+import os
+import sys
+
+from app.core.config import Settings
+
+APP_PATH = "app.main:app"
+GUNICORN_WORKER = "app.core.gunicorn_worker.Worker"
+
+
+def has_module(name: str) -> bool:
+    return importlib.util.find_spec(name) is not None
+
+
+def cpu_count() -> int:
+    """CPUs this process may run on (respects affinity/cgroup pinning)."""
+    if hasattr(os, "process_cpu_count"):  # Python 3.13+
+        return os.process_cpu_count() or 1
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+
+def worker_count(settings: Settings) -> int:
+    # Workers are async, so one per CPU saturates the machine; the classic
+    # 2n+1 rule is for blocking sync workers.
+    return settings.SERVER_WORKERS or cpu_count()
+
+
+def event_loop() -> str:
+    return "uvloop" if has_module("uvloop") else "asyncio"
+
+
+def http_protocol() -> str:
+    return "httptools" if has_module("httptools") else "h11"
+
+
+def uvicorn_command(settings: Settings, workers: int) -> list[str]:
+    command = [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        APP_PATH,
+        "--workers",
+        str(workers),
+        "--loop",
+        event_loop(),
+        "--http",
+        http_protocol(),
+        "--timeout-keep-alive",
+        str(settings.SERVER_KEEPALIVE),
+        "--backlog",
+        str(settings.SERVER_BACKLOG),
+        "--timeout-graceful-shutdown",
+        str(settings.SERVER_GRACEFUL_TIMEOUT),
+        "--no-server-header",
+    ]
+    if settings.SERVER_LIMIT_CONCURRENCY:
+        command += ["--limit-concurrency", str(settings.SERVER_LIMIT_CONCURRENCY)]
+    if settings.ACCESS_LOG:
+        # AccessLogMiddleware writes richer access logs.
+        command.append("--no-access-log")
+    if settings.SERVER_UDS:
+        command += ["--uds", settings.SERVER_UDS]
+    else:
+        command += ["--host", settings.SERVER_HOST, "--port", str(settings.SERVER_PORT)]
+    return command
+
+
+def gunicorn_command(settings: Settings, workers: int) -> list[str]:
+    """Gunicorn with ``--preload``: the app is imported once in the master.
+
+    Templates, models and routers are then shared copy-on-write by every
+    forked worker instead of being imported ``workers`` times.
+    """
+    bind = (
+        f"unix:{settings.SERVER_UDS}"
+        if settings.SERVER_UDS
+        else f"{settings.SERVER_HOST}:{settings.SERVER_PORT}"
+    )
+    return [
+        sys.executable,
+        "-m",
+        "gunicorn",
+        APP_PATH,
+        "--preload",
+        "--worker-class",
+        GUNICORN_WORKER,
+        "--workers",
+        str(workers),
+        "--bind",
+        bind,
+        "--keep-alive",
+        str(settings.SERVER_KEEPALIVE),
+        "--backlog",
+        str(settings.SERVER_BACKLOG),
+        "--graceful-timeout",
+        str(settings.SERVER_GRACEFUL_TIMEOUT),
+    ]
+
+
+def production_command(settings: Settings, preload: bool = False) -> list[str]:
+    workers = worker_count(settings)
+    if preload or settings.SERVER_PRELOAD:
+        return gunicorn_command(settings, workers)
+    return uvicorn_command(settings, workers)
@@ -0,0 +1,333 @@
+"""Optional horizontal sharding of items by owner.
+
+When ``ITEM_SHARD_URLS`` lists one or more database URLs, each user's items
+live on exactly one of them, chosen by consistent hashing of the owner id.
+Users, jobs and everything else stay on ``DATABASE_URL``. Adding a shard
+only moves the owners whose ring position now maps to it; ``rebalance``
+moves their rows. It also reads the primary database, so items written
+before sharding was turned on move onto the shards. Until it has run, those
+items are not listed: reads only go to the owner's shard, so run
+``rebalance-items --all`` right after setting or changing ITEM_SHARD_URLS.
+
+Items and attachments keep their ids when they move, so the ids that appear
+in URLs, API responses, cursors and audit events stay valid. With sharding
+on, new ids come from ``IdAllocator`` rather than from each shard's own
+autoincrement, which would hand out the same ids on every shard.
+
+Shard databases only hold the item tables (and data migration checkpoints),
+created without their foreign keys to ``user``, which lives on the primary.
+"""
+
+import asyncio
+import bisect
+import hashlib
+import itertools
+from typing import Any, AsyncGenerator
+from uuid import UUID
+
+from fastapi import Depends
+from sqlalchemy import MetaData, Table, delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from app.core.config import settings
+from app.core.database import Base, engine, get_db
+from app.core.users import current_active_user
+from app.models.attachment import Attachment
+from app.models.data_migration import DataMigrationCheckpoint
+from app.models.id_sequence import IdSequence
+from app.models.item import ArchivedItem, Item
+from app.models.tag import ItemTag, Tag
+from app.models.user import User
+from app.services.tags import drop_item_tags, set_item_tags, tags_by_item
+
+# Tables created on the shards: the item tables, which live there rather
+# than on the primary database, and the checkpoints of data migrations run
+# against each shard.
+SHARDED_TABLES = [
+    Item.__table__,
+    ArchivedItem.__table__,
+    Attachment.__table__,
+    Tag.__table__,
+    ItemTag.__table__,
+    DataMigrationCheckpoint.__table__,
+]
+
+
+def _shard_metadata() -> MetaData:
+    """Copies of SHARDED_TABLES without their foreign keys to ``user``."""
+    metadata = MetaData()
+    for table in SHARDED_TABLES:
+        copy = table.to_metadata(metadata)
+        for constraint in list(copy.foreign_key_constraints):
+            if constraint.elements[0].target_fullname.startswith("user."):
+                copy.constraints.remove(constraint)
+                for key in constraint.elements:
+                    key.parent.foreign_keys.discard(key)
+                    copy.foreign_keys.discard(key)
+    return metadata
+
+
+SHARD_METADATA = _shard_metadata()
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest())
+
+
+class HashRing:
+    """Consistent hash ring with virtual nodes for an even spread."""
+
+    def __init__(self, nodes: list[str], vnodes: int = 128) -> None:
+        points = sorted(
+            (_hash(f"{node}#{replica}"), node)
+            for node in nodes
+            for replica in range(vnodes)
+        )
+        self._keys = [key for key, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def node_for(self, key: str) -> str:
+        index = bisect.bisect(self._keys, _hash(key)) % len(self._keys)
+        return self._nodes[index]
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    connect_args = {"check_same_thread": False} if "sqlite" in url else {}
+    return create_async_engine(url, connect_args=connect_args)
+
+
+class IdAllocator:
+    """Ids unique across the primary database and all shards.
+
+    Blocks of ``block_size`` ids are reserved from a row of ``id_sequences``
+    on the primary database and handed out from memory. The row is created
+    on first use, above the highest id already in ``tables`` anywhere.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        tables: list[Table],
+        primary: AsyncEngine,
+        sources: list[AsyncEngine],
+        block_size: int = 100,
+    ) -> None:
+        self.name = name
+        self.tables = tables
+        self.primary = primary
+        self.sources = sources
+        self.block_size = block_size
+        self._next = self._end = 0
+
+    async def allocate(self, count: int) -> list[int]:
+        ids: list[int] = []
+        while len(ids) < count:
+            if self._next == self._end:
+                # Tasks that reserve concurrently each install their block;
+                # the ids a replaced block did not hand out are skipped.
+                self._next, self._end = await self._reserve(
+                    max(self.block_size, count - len(ids)),
+                )
+            take = min(count - len(ids), self._end - self._next)
+            ids.extend(range(self._next, self._next + take))
+            self._next += take
+        return ids
+
+    async def _reserve(self, size: int) -> tuple[int, int]:
+        while True:
+            async with self.primary.begin() as conn:
+                result = await conn.execute(
+                    update(IdSequence)
+                    .where(IdSequence.name == self.name)
+                    .values(next_value=IdSequence.next_value + size)
+                    .returning(IdSequence.next_value),
+                )
+                end = result.scalar_one_or_none()
+            if end is not None:
+                return end - size, end
+            await self._create_sequence()
+
+    async def _create_sequence(self) -> None:
+        start = 1
+        for source in self.sources:
+            async with source.connect() as conn:
+                for table in self.tables:
+                    highest = await conn.scalar(select(func.max(table.c.id)))
+                    start = max(start, (highest or 0) + 1)
+        try:
+            async with self.primary.begin() as conn:
+                await conn.execute(
+                    insert(IdSequence).values(name=self.name, next_value=start),
+                )
+        except IntegrityError:
+            pass  # Created by another worker in the meantime.
+
+
+class ShardRouter:
+    def __init__(self, urls: list[str], primary: AsyncEngine) -> None:
+        self.urls = list(urls)
+        # Items on the primary database predate sharding; rebalance reads
+        # them off it, and it holds the id sequences. Not disposed here: the
+        # app owns it.
+        self.primary = primary
+        self.ring = HashRing(self.urls)
+        self.engines = {url: _create_engine(url) for url in self.urls}
+        self.sessionmakers = {
+            url: async_sessionmaker(
+                bind=shard,
+                class_=AsyncSession,
+                autoflush=False,
+                expire_on_commit=False,
+            )
+            for url, shard in self.engines.items()
+        }
+        self.allocators = {
+            name: IdAllocator(name, tables, primary, self._sources())
+            for name, tables in (
+                (Item.__tablename__, [Item.__table__, ArchivedItem.__table__]),
+                (Attachment.__tablename__, [Attachment.__table__]),
+            )
+        }
+
+    def shard_for(self, owner_id: UUID) -> str:
+        # The ring is keyed by URL, so keep shard URLs stable over time.
+        return self.ring.node_for(str(owner_id))
+
+    def session_for(self, owner_id: UUID) -> AsyncSession:
+        return self.sessionmakers[self.shard_for(owner_id)]()
+
+    async def create_tables(self) -> None:
+        for shard in self.engines.values():
+            async with shard.begin() as conn:
+                await conn.run_sync(SHARD_METADATA.create_all)
+
+    async def dispose(self) -> None:
+        await asyncio.gather(*(shard.dispose() for shard in self.engines.values()))
+
+    def _sources(self) -> list[AsyncEngine]:
+        sources = list(self.engines.values())
+        if not any(shard.url == self.primary.url for shard in sources):
+            sources.append(self.primary)
+        return sources
+
+    async def rebalance(
+        self,
+        owner_id: UUID,
+        batch_size: int = 1000,
+        pause: float = 0.0,
+    ) -> int:
+        """Move ``owner_id``'s items, live and archived, to its ring shard.
+
+        Items are read from the other shards and from the primary database.
+
+        Each batch is inserted on the target and committed before it is
+        deleted from the source, so a crash can leave at most one batch on
+        both; the next run skips the rows already on the target. Items and
+        their attachments keep their ids; tags move with them. Returns the
+        number of items moved.
+        """
+        target = self.engines[self.shard_for(owner_id)]
+        items, attachments = Item.__table__, Attachment.__table__
+        moved = 0
+        for source, table in itertools.product(
+            self._sources(),
+            (items, ArchivedItem.__table__),
+        ):
+            if source is target:
+                continue
+            while True:
+                files: list[dict[str, Any]] = []
+                tags: dict[int, list[str]] = {}
+                async with source.connect() as src:
+                    result = await src.execute(
+                        select(table)
+                        .where(table.c.owner_id == owner_id)
+                        .order_by(table.c.id)
+                        .limit(batch_size),
+                    )
+                    rows = [dict(row) for row in result.mappings()]
+                    ids = [row["id"] for row in rows]
+                    if ids:
+                        result = await src.execute(
+                            select(attachments).where(
+                                attachments.c.owner_id == owner_id,
+                                attachments.c.item_id.in_(ids),
+                            ),
+                        )
+                        files = [dict(row) for row in result.mappings()]
+                    if table is items and ids:
+                        tags = await tags_by_item(src, ids)
+                if not rows:
+                    break
+                async with target.begin() as dst:
+                    for copy_table, copies in ((table, rows), (attachments, files)):
+                        if not copies:
+                            continue
+                        result = await dst.execute(
+                            select(copy_table.c.id).where(
+                                copy_table.c.id.in_([row["id"] for row in copies]),
+                                copy_table.c.owner_id == owner_id,
+                            ),
+                        )
+                        present = set(result.scalars())
+                        copies = [row for row in copies if row["id"] not in present]
+                        if copies:
+                            await dst.execute(insert(copy_table), copies)
+                    for item_id, names in tags.items():
+                        await set_item_tags(dst, owner_id, item_id, names)
+                async with source.begin() as src:
+                    if files:
+                        await src.execute(
+                            delete(attachments).where(
+                                attachments.c.owner_id == owner_id,
+                                attachments.c.item_id.in_(ids),
+                            ),
+                        )
+                    if tags:
+                        await drop_item_tags(src, ids)
+                    await src.execute(delete(table).where(table.c.id.in_(ids)))
+                moved += len(rows)
+                if pause:
+                    await asyncio.sleep(pause)
+        return moved
+
+
+shard_router = (
+    ShardRouter(settings.ITEM_SHARD_URLS, primary=engine)
+    if settings.ITEM_SHARD_URLS
+    else None
+)
+
+
+async def allocate_ids(model: type[Base], count: int) -> list[int] | None:
+    """Ids for ``count`` new rows of a sharded model.
+
+    None without sharding, where the database's autoincrement is enough.
+    """
+    if shard_router is None:
+        return None
+    return await shard_router.allocators[model.__tablename__].allocate(count)
+
+
+async def get_items_db(
+    user: User = Depends(current_active_user),
+    db: AsyncSession = Depends(get_db),
+) -> AsyncGenerator[AsyncSession, None]:
+    """Session for the current user's items: their shard, or the main DB."""
+    if shard_router is None:
+        yield db
+        return
+
+    async with shard_router.session_for(user.id) as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
@@ -0,0 +1,101 @@
+"""Coalesce identical concurrent reads into a single execution.
+
+HTMX search inputs and several open tabs often issue the same list request
+at the same moment. ``SingleFlight.do`` lets the first caller (the leader)
+run the query while identical callers that arrive before it finishes await
+the leader's result instead of querying again.
+
+Keys are scoped: a write calls ``invalidate(scope)``, which bumps the
+scope's generation so later readers start a fresh execution rather than
+joining one that may predate the write. Results are shared between
+requests and must be treated as read-only.
+
+Generations also key caches elsewhere, so a scope's generation must never
+go back to an earlier value. Only the ``max_scopes`` most recently
+invalidated scopes are remembered; every other scope reports the highest
+generation evicted so far. Generations come from one counter, so that is
+at least the evicted scope's last value and below any later invalidation.
+"""
+
+import asyncio
+import itertools
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    def __init__(self, max_scopes: int = 10_000) -> None:
+        self._inflight: dict[tuple[Hashable, int, Hashable], asyncio.Future] = {}
+        # Least recently invalidated first.
+        self._generations: OrderedDict[Hashable, int] = OrderedDict()
+        self._counter = itertools.count(1)
+        self._floor = 0
+        self.max_scopes = max_scopes
+        self.executions = 0
+        self.coalesced = 0
+
+    def generation(self, scope: Hashable) -> int:
+        return self._generations.get(scope, self._floor)
+
+    def invalidate(self, scope: Hashable) -> None:
+        """Stop later callers in ``scope`` from joining in-flight reads."""
+        self._generations[scope] = next(self._counter)
+        self._generations.move_to_end(scope)
+        while len(self._generations) > self.max_scopes:
+            _, evicted = self._generations.popitem(last=False)
+            self._floor = max(self._floor, evicted)
+
+    async def do(
+        self,
+        scope: Hashable,
+        key: Hashable,
+        fn: Callable[[], Awaitable[T]],
+    ) -> T:
+        """Return ``fn()``, sharing one execution among identical callers."""
+        flight_key = (scope, self.generation(scope), key)
+        future = self._inflight.get(flight_key)
+        if future is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The leader's request went away; run the query ourselves.
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[flight_key] = future
+        self.executions += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark it retrieved so a leader-only failure isn't logged twice.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._inflight.get(flight_key) is future:
+                del self._inflight[flight_key]
+
+    def snapshot(self) -> dict[str, Any]:
+        total = self.executions + self.coalesced
+        return {
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+            "scopes": len(self._generations),
+            "saved_ratio": round(self.coalesced / total, 3) if total else 0,
+        }
+
+
+# Item list reads (count + page), scoped by owner id.
+item_list_flight = SingleFlight()
@@ -1,3 +1,134 @@
+import re
+import time
+from typing import Any, Callable, Mapping
+
 from fastapi.templating import Jinja2Templates
+from jinja2 import BaseLoader, Environment, FileSystemLoader, Template
+from starlette.background import BackgroundTask
+from starlette.responses import HTMLResponse
+from starlette.types import Receive, Scope, Send
+
+from app.core.assets import asset_url
+from app.core.config import settings
+
+TEMPLATES_DIR = "app/templates"
+
+# Elements whose whitespace is significant, or whose content isn't HTML.
+_VERBATIM = re.compile(
+    r"(<(pre|textarea|script|style)\b.*?</\2\s*>)",
+    re.IGNORECASE | re.DOTALL,
+)
+_INDENTED_NEWLINE = re.compile(r"[ \t]*\n\s*")
+
+
+def minify_html(source: str) -> str:
+    """Collapse indentation and blank lines outside verbatim elements.
+
+    Line breaks are kept (as a single newline), so inline elements stay
+    separated and inline JavaScript in attributes keeps its line structure.
+    """
+    parts = _VERBATIM.split(source)
+    # split() yields [text, element, tag name, text, element, tag name, ...].
+    for index in range(0, len(parts), 3):
+        parts[index] = _INDENTED_NEWLINE.sub("\n", parts[index])
+    return "".join(part for index, part in enumerate(parts) if index % 3 != 2)
+
+
+class MinifyingLoader(FileSystemLoader):
+    """Minifies template source once, when a template is loaded."""
+
+    def get_source(
+        self,
+        environment: Environment,
+        template: str,
+    ) -> tuple[str, str, Callable[[], bool]]:
+        source, filename, uptodate = super().get_source(environment, template)
+        return minify_html(source), filename, uptodate
+
+
+loader: BaseLoader = (
+    MinifyingLoader(TEMPLATES_DIR)
+    if settings.TEMPLATE_MINIFY
+    else FileSystemLoader(TEMPLATES_DIR)
+)
+
+
+class DeferredTemplateResponse(HTMLResponse):
+    """A template response rendered when it is sent, not when it is built.
+
+    FastAPI closes a route's ``get_db`` session, returning its connection to
+    the pool, after the route returns but before the response is sent (up to
+    0.117; 0.118 moved that exit after sending, hence the pin in
+    pyproject.toml). So a route returning this response holds no connection
+    while Jinja renders.
+    Everything in the context must already be loaded: lazy loads can't run
+    once the session has closed.
+    """
+
+    def __init__(
+        self,
+        template: Template,
+        context: dict[str, Any],
+        status_code: int = 200,
+        headers: Mapping[str, str] | None = None,
+        media_type: str | None = None,
+        background: BackgroundTask | None = None,
+        on_render: Callable[[float], None] | None = None,
+    ) -> None:
+        self.template = template
+        self.context = context
+        self.on_render = on_render
+        super().__init__(None, status_code, headers, media_type, background)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        started = time.perf_counter()
+        self.body = self.render(self.template.render(self.context))
+        if self.on_render is not None:
+            self.on_render((time.perf_counter() - started) * 1000)
+        if "content-length" in self.headers:
+            self.headers["content-length"] = str(len(self.body))
+
+        extensions = self.context["request"].get("extensions", {})
+        if "http.response.debug" in extensions:
+            await send(
+                {
+                    "type": "http.response.debug",
+                    "info": {"template": self.template, "context": self.context},
+                },
+            )
+        await super().__call__(scope, receive, send)
+
+
+class DeferredJinja2Templates(Jinja2Templates):
+    """``Jinja2Templates`` whose responses render as they are sent."""
+
+    def TemplateResponse(  # type: ignore[override]  # noqa: N802
+        self,
+        name: str,
+        context: dict[str, Any],
+        status_code: int = 200,
+        headers: Mapping[str, str] | None = None,
+        media_type: str | None = None,
+        background: BackgroundTask | None = None,
+        on_render: Callable[[float], None] | None = None,
+    ) -> DeferredTemplateResponse:
+        for context_processor in self.context_processors:
+            context.update(context_processor(context["request"]))
+        return DeferredTemplateResponse(
+            self.get_template(name),
+            context,
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type,
+            background=background,
+            on_render=on_render,
+        )
+
 
-templates = Jinja2Templates(directory="app/templates")
+templates = DeferredJinja2Templates(
+    directory=TEMPLATES_DIR,
+    loader=loader,
+    trim_blocks=settings.TEMPLATE_MINIFY,
+    lstrip_blocks=settings.TEMPLATE_MINIFY,
+)
+templates.env.globals["asset_url"] = asset_url
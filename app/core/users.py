@@ -24,3 +24,7 @@ auth_backend = AuthenticationBackend(
 
 # FastAPI Users instance
 fastapi_users = FastAPIUsers[User, UUID](get_user_manager, [auth_backend])
+
+# Shared dependency instance so FastAPI resolves the user once per request
+# even when several dependencies need it.
+current_active_user = fastapi_users.current_user(active=True)
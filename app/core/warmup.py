@@ -0,0 +1,103 @@
+"""Optional warm-up run by the lifespan before a worker takes traffic.
+
+A cold worker pays for Jinja compilation, SQLAlchemy statement compilation
+and connection setup on its first requests. Each step here front-loads one
+of those costs and reports how long it took.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.core.templates import templates
+from app.models.user import User
+from app.services.items import (
+    count_query,
+    item_rows_query,
+    items_query,
+    merged_items_query,
+    owned_item_query,
+    page_query,
+)
+
+logger = logging.getLogger(__name__)
+
+# Matches no rows; the statements only need to run once to be cached.
+WARMUP_OWNER_ID = UUID(int=0)
+
+
+async def compile_templates() -> None:
+    env = templates.env
+    for name in env.list_templates(extensions=["jinja2"]):
+        env.get_template(name)
+
+
+async def compile_statements() -> None:
+    """Execute the hot statements so their compiled forms are cached.
+
+    SQLAlchemy caches compiled SQL per engine keyed on statement structure,
+    not bound values, so running them once with a dummy owner is enough.
+    """
+    statements = [
+        # fastapi-users' lookups for the auth cookie and for login.
+        select(User).where(User.id == WARMUP_OWNER_ID),  # type: ignore[arg-type]
+        select(User).where(func.lower(User.email) == func.lower("warmup@invalid")),
+        owned_item_query(WARMUP_OWNER_ID, 0),
+    ]
+    for search in (None, "warmup"):
+        for query in (
+            items_query(WARMUP_OWNER_ID, search),
+            merged_items_query(WARMUP_OWNER_ID, search),
+        ):
+            statements += [count_query(query), page_query(query, 1, 10)]
+        for cursor in (None, 0):
+            statements.append(item_rows_query(WARMUP_OWNER_ID, search, cursor, 51))
+
+    async with AsyncSessionLocal() as session:
+        for statement in statements:
+            await session.execute(statement)
+
+
+async def fill_pool() -> None:
+    """Open pooled connections up front so early requests don't pay for it."""
+    pool_size = getattr(engine.pool, "size", None)
+    if pool_size is None:
+        # NullPool/StaticPool have nothing to pre-fill.
+        return
+    target = min(settings.WARMUP_POOL_CONNECTIONS or pool_size(), pool_size())
+
+    checked_out: list[AsyncConnection] = []
+    try:
+        # Hold every connection at once, otherwise the pool hands the same
+        # one back each time.
+        for _ in range(target):
+            conn = await engine.connect()
+            checked_out.append(conn)
+            await conn.exec_driver_sql("SELECT 1")
+    finally:
+        await asyncio.gather(*(conn.close() for conn in checked_out))
+
+
+STEPS: dict[str, Callable[[], Awaitable[None]]] = {
+    "templates": compile_templates,
+    "statements": compile_statements,
+    "pool": fill_pool,
+}
+
+
+async def warm_up() -> dict[str, float]:
+    """Run every warm-up step, returning each step's duration in ms."""
+    durations: dict[str, float] = {}
+    for name, step in STEPS.items():
+        started = time.perf_counter()
+        await step()
+        durations[name] = round((time.perf_counter() - started) * 1000, 2)
+        logger.info("Warm-up step %s took %.1f ms", name, durations[name])
+    return durations
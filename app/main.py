@@ -1,31 +1,53 @@
 import logging
+import time
 from pathlib import Path
 from typing import AsyncGenerator
 
 from fastapi import Depends, FastAPI, HTTPException, Request, Response
 from fastapi.concurrency import asynccontextmanager
-from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import HTMLResponse, RedirectResponse
+
+from app import IMPORT_STARTED
 
 # Import routers
+from app.api import admin as admin_api_router
+from app.api import attachments as attachments_api_router
 from app.api import auth as auth_api_router
+from app.api import diagnostics as diagnostics_api_router
 from app.api import items as items_api_router
+from app.api import items_json as items_json_api_router
 from app.api import user as user_api_router
 from app.api.dependencies import is_htmx
+from app.core.admission import AdmissionControlMiddleware
+from app.core.assets import PrecompressedStaticFiles
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
-from app.core.database import init_db
+from app.core.database import (
+    AsyncSessionLocal,
+    check_schema_revision,
+    dispose_db,
+    init_db,
+)
+from app.core.diagnostics import CPUProfilerMiddleware
+from app.core.logs import AccessLogMiddleware, setup_logging, shutdown_logging
+from app.core.page_cache import PageCacheMiddleware
+from app.core.responses import FastJSONResponse
+from app.core.sharding import shard_router
 from app.core.templates import templates
 from app.core.users import auth_backend, fastapi_users
+from app.core.warmup import warm_up
 from app.models.user import User
+from app.services import archive, user_hooks  # noqa: F401 - registers job handlers
+from app.services.audit import audit_log
+from app.services.jobs import JobWorkerPool
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
-async def lifespan(_: FastAPI) -> AsyncGenerator[None, None]:
+async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
+    # In the serving process, so each worker starts its own log thread.
+    setup_logging()
     # Log startup information (server logs only, not web pages)
     key_start = settings.SECRET_KEY[: min(len(settings.SECRET_KEY), 8)]
     logger.info("Starting FastAPI HTMX Starter application")
@@ -35,18 +57,72 @@ async def lifespan(_: FastAPI) -> AsyncGenerator[None, None]:
         "for sessions to work across restarts.",
     )
 
-    await init_db()
+    started = time.perf_counter()
+    if settings.DB_CREATE_ALL:
+        await init_db()
+    elif settings.DB_CHECK_REVISION:
+        await check_schema_revision()
+    if shard_router:
+        # Shards only hold item tables, which are created on demand.
+        await shard_router.create_tables()
+    schema_ready = time.perf_counter()
+    app.state.warmup = await warm_up() if settings.WARMUP_ENABLED else {}
+    ready = time.perf_counter()
+    logger.info(
+        "Startup timing: app import %.0f ms, schema %.0f ms, warm-up %.0f ms, "
+        "total %.0f ms",
+        (started - IMPORT_STARTED) * 1000,
+        (schema_ready - started) * 1000,
+        (ready - schema_ready) * 1000,
+        (ready - IMPORT_STARTED) * 1000,
+    )
+
+    app.state.job_pool = None
+    if settings.JOBS_IN_PROCESS:
+        app.state.job_pool = JobWorkerPool(AsyncSessionLocal)
+        app.state.job_pool.start()
+    if settings.AUDIT_LOG:
+        audit_log.start()
+
+    app.state.ready = True
     yield
+    app.state.ready = False
+    if app.state.job_pool:
+        await app.state.job_pool.stop()
+    if settings.AUDIT_LOG:
+        # After the last request, before the engine goes away.
+        await audit_log.stop()
+    if shard_router:
+        await shard_router.dispose()
+    await dispose_db()
+    shutdown_logging()
 
 
 app = FastAPI(title="FastAPI HTMX Starter", lifespan=lifespan)
-app.add_middleware(GZipMiddleware)
+app.state.ready = False
+if settings.PAGE_CACHE:
+    # Inside compression: cached pages carry their own precompressed bodies.
+    app.add_middleware(PageCacheMiddleware)
+app.add_middleware(CompressionMiddleware)
+if settings.ADMISSION_CONTROL:
+    # Shed excess requests before routing, auth or any database work.
+    app.add_middleware(AdmissionControlMiddleware)
+if settings.DIAGNOSTICS:
+    # Lets CPU profiles attribute loop samples to the route being served.
+    app.add_middleware(CPUProfilerMiddleware)
+if settings.ACCESS_LOG:
+    # Outermost, so durations include compression and error handling.
+    app.add_middleware(AccessLogMiddleware)
 
 # Determine the base directory relative to this file
 BASE_DIR = Path(__file__).resolve().parent
 
 # Mount static files
-app.mount("/static", StaticFiles(directory=str(BASE_DIR / "static")), name="static")
+app.mount(
+    "/static",
+    PrecompressedStaticFiles(directory=str(BASE_DIR / "static")),
+    name="static",
+)
 
 # Auth routes (login, logout) - using the chosen backend (cookie in this case)
 app.include_router(
@@ -67,6 +143,21 @@ app.include_router(
     prefix="/items",
 )
 
+# Item attachments (upload, download, delete)
+app.include_router(attachments_api_router.router, prefix="/items")
+
+# Admin-only operational endpoints
+app.include_router(admin_api_router.router, prefix="/admin")
+if settings.DIAGNOSTICS:
+    # Profiling endpoints; not even routable unless enabled.
+    app.include_router(diagnostics_api_router.router, prefix="/admin/diagnostics")
+
+# Items JSON API for integrations
+app.include_router(
+    items_json_api_router.router,
+    prefix="/api/items",
+)
+
 
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException) -> Response:
@@ -74,11 +165,12 @@ async def http_exception_handler(request: Request, exc: HTTPException) -> Respon
     Custom exception handler to manage HTTPExceptions.
     - For 401 Unauthorized:
         - HTMX requests: Returns HX-Redirect header to the login page.
+        - JSON API requests (/api/...): Returns the JSON error response.
         - Non-HTMX requests: Returns a standard 302 redirect to the login page.
     - For other HTTPExceptions: Returns the default JSON response.
     """
 
-    if exc.status_code == 401:
+    if exc.status_code == 401 and not request.url.path.startswith("/api/"):
         login_url = request.url_for("auth_login_page")
         if is_htmx(request):
             # For HTMX requests resulting in 401, trigger a client-side redirect
@@ -94,7 +186,7 @@ async def http_exception_handler(request: Request, exc: HTTPException) -> Respon
             return RedirectResponse(url=str(login_url), status_code=302)
 
     # For all other HTTPExceptions (not 401), return the default JSON response
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=exc.status_code,
         content={"detail": exc.detail},
         headers=getattr(
@@ -114,3 +206,13 @@ async def index(
         "index.jinja2",
         {"request": request, "user": user},
     )
+
+
+@app.get("/ready", name="readiness")
+async def readiness(request: Request) -> FastJSONResponse:
+    """Readiness probe: 503 until startup (and warm-up) has finished."""
+    if not request.app.state.ready:
+        return FastJSONResponse(status_code=503, content={"status": "starting"})
+    return FastJSONResponse(
+        content={"status": "ready", "warmup_ms": request.app.state.warmup},
+    )
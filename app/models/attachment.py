@@ -0,0 +1,36 @@
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import DateTime, ForeignKey, Index, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class Attachment(Base):
+    """A file attached to an item.
+
+    The bytes live once per distinct content on disk, named by their
+    SHA-256 (see app.services.attachments); rows only reference them.
+    """
+
+    __tablename__ = "attachments"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    # An ``items`` id, or an ``archived_items`` one while the item is
+    # archived; so no foreign key, and deleting an item deletes its
+    # attachments explicitly.
+    item_id: Mapped[int] = mapped_column(nullable=False)
+    owner_id: Mapped[UUID] = mapped_column(ForeignKey("user.id"), nullable=False)
+    filename: Mapped[str] = mapped_column(String(255), nullable=False)
+    content_type: Mapped[str] = mapped_column(String(255), nullable=False)
+    size: Mapped[int] = mapped_column(nullable=False)
+    sha256: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        nullable=False,
+        default=datetime.utcnow,
+    )
+
+    # Listing an item's attachments, always scoped to the owner.
+    __table_args__ = (Index("ix_attachments_owner_item", "owner_id", "item_id"),)
@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class DataMigrationCheckpoint(Base):
+    """Progress of one data migration in the database it migrates."""
+
+    __tablename__ = "data_migration_checkpoints"
+
+    name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    # Highest key already migrated; the next batch starts after it.
+    last_key: Mapped[int] = mapped_column(nullable=False, default=0)
+    rows: Mapped[int] = mapped_column(nullable=False, default=0)
+    batches: Mapped[int] = mapped_column(nullable=False, default=0)
+    # running -> done
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="running")
+    started_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        nullable=False,
+        default=datetime.utcnow,
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        nullable=False,
+        default=datetime.utcnow,
+    )
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
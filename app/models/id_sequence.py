@@ -0,0 +1,16 @@
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class IdSequence(Base):
+    """Next free id of a table whose rows are spread over several databases.
+
+    Lives on the primary database; see app.core.sharding.IdAllocator.
+    """
+
+    __tablename__ = "id_sequences"
+
+    name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    next_value: Mapped[int] = mapped_column(nullable=False)
@@ -1,7 +1,8 @@
+from datetime import datetime
 from typing import TYPE_CHECKING
 from uuid import UUID
 
-from sqlalchemy import ForeignKey, String, Text
+from sqlalchemy import DateTime, ForeignKey, Index, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.database import Base
@@ -17,6 +18,44 @@ class Item(Base):
     title: Mapped[str] = mapped_column(String(100), nullable=False)
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
     owner_id: Mapped[UUID] = mapped_column(ForeignKey("user.id"), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
+    # Optimistic concurrency: bumped by every update; an update may require
+    # the version it was based on (see update_item_statement).
+    version: Mapped[int] = mapped_column(nullable=False, default=1, server_default="1")
 
     # Relationships
     owner: Mapped["User"] = relationship("User", back_populates="items")
+
+    # The archive job scans for items untouched since a cutoff.
+    __table_args__ = (Index("ix_items_updated_at", "updated_at"),)
+
+
+class ArchivedItem(Base):
+    """An item moved out of ``items`` by the archive job; read-only.
+
+    It keeps its id, version and attachments, and can be moved back (see
+    app.services.archive.restore_archived_item).
+    """
+
+    __tablename__ = "archived_items"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    title: Mapped[str] = mapped_column(String(100), nullable=False)
+    description: Mapped[str | None] = mapped_column(Text, nullable=True)
+    owner_id: Mapped[UUID] = mapped_column(
+        ForeignKey("user.id"),
+        nullable=False,
+        index=True,
+    )
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    version: Mapped[int] = mapped_column(nullable=False, default=1, server_default="1")
+    archived_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        nullable=False,
+        default=datetime.utcnow,
+    )
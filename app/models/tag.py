@@ -0,0 +1,42 @@
+from uuid import UUID
+
+from sqlalchemy import ForeignKey, Index, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class Tag(Base):
+    """A user's tag. ``item_count`` is kept up to date by app.services.tags."""
+
+    __tablename__ = "tags"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    owner_id: Mapped[UUID] = mapped_column(ForeignKey("user.id"), nullable=False)
+    name: Mapped[str] = mapped_column(String(50), nullable=False)
+    item_count: Mapped[int] = mapped_column(
+        nullable=False,
+        default=0,
+        server_default="0",
+    )
+
+    # Also the index for looking a user's tags up by name.
+    __table_args__ = (UniqueConstraint("owner_id", "name", name="uq_tags_owner_name"),)
+
+
+class ItemTag(Base):
+    """Links an item to a tag; both directions are covered by an index."""
+
+    __tablename__ = "item_tags"
+
+    item_id: Mapped[int] = mapped_column(
+        ForeignKey("items.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    tag_id: Mapped[int] = mapped_column(
+        ForeignKey("tags.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+    # The primary key serves item -> tags; this serves tag -> items filters.
+    __table_args__ = (Index("ix_item_tags_tag_item", "tag_id", "item_id"),)
@@ -1,10 +1,9 @@
-import logging
 from datetime import datetime
 from typing import TYPE_CHECKING, AsyncGenerator, List
 from uuid import UUID
 
 from fastapi import Depends, Request
-from fastapi_users import BaseUserManager, UUIDIDMixin
+from fastapi_users import BaseUserManager, UUIDIDMixin, exceptions
 from fastapi_users.db import SQLAlchemyBaseUserTableUUID, SQLAlchemyUserDatabase
 from sqlalchemy import DateTime
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -12,12 +11,12 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.config import settings
 from app.core.database import Base, get_db
+from app.core.logs import record_user
+from app.services.jobs import enqueue
 
 if TYPE_CHECKING:
     from app.models.item import Item
 
-logger = logging.getLogger(__name__)
-
 
 class User(SQLAlchemyBaseUserTableUUID, Base):
     # fastapi-users provides: id, email, hashed_password, is_active,
@@ -45,12 +44,34 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, UUID]):
     reset_password_token_secret = settings.SECRET_KEY
     verification_token_secret = settings.SECRET_KEY
 
+    async def get(self, id: UUID) -> User:
+        user = await super().get(id)
+        # Every authenticated request loads its user here; tag its access log.
+        record_user(user.id)
+        return user
+
+    # Hooks only enqueue; the work runs in app.services.user_hooks on the
+    # job workers so it doesn't add latency to the request. Tokens are not
+    # enqueued: jobs.payload is stored in plaintext and failed rows stay, so
+    # the handlers mint a fresh token with ``user_token`` instead. The job is
+    # committed in a session of its own, leaving fastapi-users' session (and
+    # whatever it has pending) alone.
+    async def _enqueue(self, kind: str, user: User) -> None:
+        bind = self.user_db.session.bind  # type: ignore[attr-defined]
+        async with AsyncSession(bind, expire_on_commit=False) as session:
+            await enqueue(
+                session,
+                kind,
+                {"user_id": str(user.id), "email": user.email},
+            )
+            await session.commit()
+
     async def on_after_register(
         self,
         user: User,
         request: Request | None = None,
     ) -> None:
-        logger.info("User %s (%s) has registered successfully.", user.id, user.email)
+        await self._enqueue("user.registered", user)
 
     async def on_after_forgot_password(
         self,
@@ -58,7 +79,7 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, UUID]):
         token: str,
         request: Request | None = None,
     ) -> None:
-        logger.info("User %s (%s) requested password reset.", user.id, user.email)
+        await self._enqueue("user.forgot_password", user)
 
     async def on_after_request_verify(
         self,
@@ -66,7 +87,45 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, UUID]):
         token: str,
         request: Request | None = None,
     ) -> None:
-        logger.info("Verification requested for user %s (%s).", user.id, user.email)
+        await self._enqueue("user.request_verify", user)
+
+
+class _TokenMinter(UserManager):
+    """Runs fastapi-users' token flows, keeping the token instead of enqueuing."""
+
+    token: str | None = None
+
+    async def on_after_forgot_password(
+        self,
+        user: User,
+        token: str,
+        request: Request | None = None,
+    ) -> None:
+        self.token = token
+
+    async def on_after_request_verify(
+        self,
+        user: User,
+        token: str,
+        request: Request | None = None,
+    ) -> None:
+        self.token = token
+
+
+async def user_token(session: AsyncSession, user: User, kind: str) -> str | None:
+    """A new password-reset (``"reset"``) or verification (``"verify"``) token.
+
+    None when the user no longer qualifies: inactive, or already verified.
+    """
+    minter = _TokenMinter(SQLAlchemyUserDatabase(session, User))
+    try:
+        if kind == "reset":
+            await minter.forgot_password(user)
+        else:
+            await minter.request_verify(user)
+    except (exceptions.UserInactive, exceptions.UserAlreadyVerified):
+        return None
+    return minter.token
 
 
 async def get_user_manager(
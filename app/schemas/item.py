@@ -1,6 +1,31 @@
+from typing import Any
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
+
+MAX_TAGS = 20
+MAX_TAG_LENGTH = 50
+
+
+def normalize_tags(value: Any) -> Any:
+    """Accept a list or a comma-separated string; lowercase and deduplicate.
+
+    The form sends a string; the JSON API may send either.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.split(",")
+    if not isinstance(value, list):
+        return value
+    tags: list[str] = []
+    for tag in value:
+        tag = str(tag).strip().lower()
+        if len(tag) > MAX_TAG_LENGTH:
+            raise ValueError(f"Tags are limited to {MAX_TAG_LENGTH} characters")
+        if tag and tag not in tags:
+            tags.append(tag)
+    return tags
 
 
 class ItemBase(BaseModel):
@@ -9,17 +34,35 @@ class ItemBase(BaseModel):
 
 
 class ItemCreate(ItemBase):
-    pass
+    tags: list[str] = Field(default=[], max_length=MAX_TAGS)
+
+    _normalize_tags = field_validator("tags", mode="before")(normalize_tags)
 
 
 class ItemUpdate(BaseModel):
     title: str | None = None
     description: str | None = None
+    # None leaves the tags alone; a list (or "a, b" string) replaces them.
+    tags: list[str] | None = Field(default=None, max_length=MAX_TAGS)
+    # The version being edited; if given, a stale version is rejected.
+    version: int | None = None
+
+    _normalize_tags = field_validator("tags", mode="before")(normalize_tags)
 
 
 class ItemRead(ItemBase):
     id: int
     owner_id: UUID
+    version: int
 
     class Config:
         from_attributes = True
+
+
+class ItemPage(BaseModel):
+    items: list[ItemRead]
+    next_cursor: int | None = None
+
+
+class ItemBatchCreate(BaseModel):
+    items: list[ItemCreate] = Field(min_length=1, max_length=1000)
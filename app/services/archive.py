@@ -0,0 +1,178 @@
+"""Cold storage for items nobody has touched in a while.
+
+Archiving moves rows from ``items`` to ``archived_items`` so the hot table,
+and every list query over it, stays small. It runs as a chain of
+``items.archive`` jobs: each moves one batch in a single transaction and, if
+the batch was full, enqueues the next one ``ARCHIVE_BATCH_INTERVAL`` seconds
+later. The delay caps the write rate the archiver adds to the database.
+
+Archived items keep their id, version and attachments, so their URLs and
+audit events still point at them, and ``restore_archived_item`` moves one
+back. The job drops them from this worker's title index and list caches;
+other workers pick the change up when those entries expire.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import RowMapping, delete, insert, literal, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.sharding import shard_router
+from app.core.singleflight import item_list_flight
+from app.models.item import ArchivedItem, Item
+from app.services.items import ITEM_COLUMNS
+from app.services.jobs import enqueue, job_handler
+from app.services.suggestions import title_index
+from app.services.tags import drop_item_tags
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_JOB = "items.archive"
+
+
+async def archive_batch(
+    session: AsyncSession,
+    cutoff: datetime,
+    batch_size: int,
+) -> list[tuple[int, UUID]]:
+    """Move up to ``batch_size`` items last updated before ``cutoff``.
+
+    The caller commits; copy and delete share one transaction. Archived
+    items lose their tags. Returns the ``(id, owner_id)`` of the moved items.
+    """
+    result = await session.execute(
+        select(Item.id, Item.owner_id)
+        .where(Item.updated_at < cutoff)
+        .order_by(Item.id)
+        .limit(batch_size),
+    )
+    moved = [(item_id, owner_id) for item_id, owner_id in result]
+    if not moved:
+        return []
+    ids = [item_id for item_id, _ in moved]
+
+    await session.execute(
+        insert(ArchivedItem).from_select(
+            [
+                "id",
+                "title",
+                "description",
+                "owner_id",
+                "updated_at",
+                "version",
+                "archived_at",
+            ],
+            select(
+                Item.id,
+                Item.title,
+                Item.description,
+                Item.owner_id,
+                Item.updated_at,
+                Item.version,
+                literal(datetime.utcnow()),
+            ).where(Item.id.in_(ids)),
+        ),
+    )
+    await drop_item_tags(session, ids)
+    await session.execute(
+        delete(Item)
+        .where(Item.id.in_(ids))
+        .execution_options(synchronize_session=False),
+    )
+    return moved
+
+
+def forget_archived(moved: list[tuple[int, UUID]]) -> None:
+    """Drop committed archived items from this worker's caches."""
+    for item_id, owner_id in moved:
+        title_index.discard(owner_id, item_id)
+    for owner_id in {owner_id for _, owner_id in moved}:
+        item_list_flight.invalidate(owner_id)
+
+
+async def restore_archived_item(
+    session: AsyncSession,
+    owner_id: UUID,
+    item_id: int,
+) -> RowMapping | None:
+    """Move an archived item back to ``items`` under its id.
+
+    The restored item counts as updated now, and its version is bumped so
+    edits based on the archived copy are rejected. The caller commits.
+    Returns the restored row, or None if there is no such archived item.
+    """
+    result = await session.execute(
+        insert(Item)
+        .from_select(
+            ["id", "title", "description", "owner_id", "updated_at", "version"],
+            select(
+                ArchivedItem.id,
+                ArchivedItem.title,
+                ArchivedItem.description,
+                ArchivedItem.owner_id,
+                literal(datetime.utcnow()),
+                ArchivedItem.version + 1,
+            ).where(ArchivedItem.id == item_id, ArchivedItem.owner_id == owner_id),
+        )
+        .returning(*ITEM_COLUMNS),
+    )
+    row = result.mappings().one_or_none()
+    if row is not None:
+        await session.execute(
+            delete(ArchivedItem)
+            .where(ArchivedItem.id == item_id)
+            .execution_options(synchronize_session=False),
+        )
+    return row
+
+
+async def schedule_archive(
+    session: AsyncSession,
+    days: int = settings.ARCHIVE_AFTER_DAYS,
+) -> None:
+    """Enqueue an archive run for the items database or every item shard."""
+    cutoff = (datetime.utcnow() - timedelta(days=days)).isoformat()
+    shards: list[str | None] = list(shard_router.urls) if shard_router else [None]
+    for shard in shards:
+        await enqueue(session, ARCHIVE_JOB, {"cutoff": cutoff, "shard": shard})
+
+
+@job_handler(ARCHIVE_JOB)
+async def archive_items(payload: dict[str, Any], session: AsyncSession) -> None:
+    cutoff = datetime.fromisoformat(payload["cutoff"])
+    batch_size = settings.ARCHIVE_BATCH_SIZE
+    shard = payload.get("shard")
+
+    if shard is None:
+        moved = await archive_batch(session, cutoff, batch_size)
+        # Before the caches are cleared, so they can't refill with old rows.
+        await session.commit()
+    else:
+        if shard_router is None:
+            raise RuntimeError("Archive job for a shard, but sharding is off")
+        if shard not in shard_router.sessionmakers:
+            raise RuntimeError("Archive job for a shard no longer in ITEM_SHARD_URLS")
+        async with shard_router.sessionmakers[shard]() as db:
+            moved = await archive_batch(db, cutoff, batch_size)
+            await db.commit()
+        shard = make_url(shard).render_as_string(hide_password=True)
+    forget_archived(moved)
+
+    logger.info(
+        "Archived %d items older than %s (shard %s)",
+        len(moved),
+        cutoff,
+        shard,
+    )
+    if len(moved) == batch_size:
+        await enqueue(
+            session,
+            ARCHIVE_JOB,
+            payload,
+            delay=settings.ARCHIVE_BATCH_INTERVAL,
+        )
@@ -0,0 +1,229 @@
+"""Streaming, content-addressed storage for item attachments.
+
+Uploads are parsed straight from the request body with python-multipart's
+``MultipartParser`` rather than ``Request.form()``, so a file is never held
+in memory or spooled to a temporary file first: each received chunk is
+hashed and appended to a file in ``<ATTACHMENTS_DIR>/tmp``. Once complete
+it is renamed to ``<ATTACHMENTS_DIR>/<sha[:2]>/<sha>``; if that blob
+already exists the upload is a duplicate and the temporary file is dropped.
+
+Blobs are shared and never deleted along with an attachment or item.
+``purge_orphan_blobs`` (the ``purge-attachments`` command, run from cron)
+removes the ones no attachment on any database references, and partial
+uploads left behind, once they are older than a grace period that covers
+uploads still in flight.
+"""
+
+import hashlib
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, Iterable
+from uuid import UUID
+
+import anyio
+from python_multipart.multipart import MultipartParser, parse_options_header
+from sqlalchemy import Delete, Select, delete, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.database import PROJECT_ROOT
+from app.models.attachment import Attachment
+
+FILE_FIELD = b"file"
+
+
+class UploadError(ValueError):
+    """The request isn't a usable multipart upload."""
+
+
+class UploadTooLarge(UploadError):
+    pass
+
+
+@dataclass(frozen=True)
+class StoredFile:
+    sha256: str
+    size: int
+    filename: str
+    content_type: str
+
+
+def storage_dir() -> Path:
+    return PROJECT_ROOT / settings.ATTACHMENTS_DIR
+
+
+def blob_path(sha256: str) -> Path:
+    return storage_dir() / sha256[:2] / sha256
+
+
+def _store(tmp_path: Path, sha256: str) -> None:
+    path = blob_path(sha256)
+    if path.exists():
+        tmp_path.unlink()
+        # Restart the grace period of a blob that may be unreferenced.
+        os.utime(path)
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path.replace(path)
+
+
+async def receive_upload(
+    chunks: AsyncIterator[bytes],
+    content_type: str,
+    max_bytes: int = settings.ATTACHMENT_MAX_BYTES,
+) -> StoredFile:
+    """Stream the ``file`` part of a multipart body into blob storage."""
+    mime, options = parse_options_header(content_type)
+    boundary = options.get(b"boundary")
+    if mime != b"multipart/form-data" or not boundary:
+        raise UploadError("Expected a multipart/form-data upload")
+
+    headers: dict[bytes, bytes] = {}
+    header_field = bytearray()
+    header_value = bytearray()
+    part: dict[str, str] = {}
+    pending = bytearray()
+    state = {"in_file": False, "done": False}
+
+    def on_part_begin() -> None:
+        headers.clear()
+
+    def on_header_field(data: bytes, start: int, end: int) -> None:
+        header_field.extend(data[start:end])
+
+    def on_header_value(data: bytes, start: int, end: int) -> None:
+        header_value.extend(data[start:end])
+
+    def on_header_end() -> None:
+        headers[bytes(header_field).lower()] = bytes(header_value)
+        header_field.clear()
+        header_value.clear()
+
+    def on_headers_finished() -> None:
+        _, disposition = parse_options_header(headers.get(b"content-disposition"))
+        if (
+            not state["done"]
+            and disposition.get(b"name") == FILE_FIELD
+            and b"filename" in disposition
+        ):
+            state["in_file"] = True
+            part["filename"] = disposition[b"filename"].decode("utf-8", "replace")
+            part["content_type"] = headers.get(
+                b"content-type",
+                b"application/octet-stream",
+            ).decode("latin-1")
+
+    def on_part_data(data: bytes, start: int, end: int) -> None:
+        if state["in_file"]:
+            pending.extend(data[start:end])
+
+    def on_part_end() -> None:
+        if state["in_file"]:
+            state["in_file"], state["done"] = False, True
+
+    parser = MultipartParser(
+        boundary,
+        {
+            "on_part_begin": on_part_begin,
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_headers_finished": on_headers_finished,
+            "on_part_data": on_part_data,
+            "on_part_end": on_part_end,
+        },
+    )
+
+    tmp_dir = storage_dir() / "tmp"
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    tmp = tempfile.NamedTemporaryFile(dir=tmp_dir, delete=False)  # noqa: SIM115
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async for chunk in chunks:
+            parser.write(chunk)
+            if not pending:
+                continue
+            size += len(pending)
+            if size > max_bytes:
+                raise UploadTooLarge(f"Attachments are limited to {max_bytes} bytes")
+            data = bytes(pending)
+            pending.clear()
+            digest.update(data)
+            # Disk writes happen in a worker thread, off the event loop.
+            await anyio.to_thread.run_sync(tmp.write, data)
+        parser.finalize()
+        await anyio.to_thread.run_sync(tmp.close)
+        if not state["done"]:
+            raise UploadError("No file was uploaded")
+        sha256 = digest.hexdigest()
+        await anyio.to_thread.run_sync(_store, Path(tmp.name), sha256)
+    except BaseException:
+        tmp.close()
+        Path(tmp.name).unlink(missing_ok=True)
+        raise
+
+    return StoredFile(
+        sha256=sha256,
+        size=size,
+        filename=Path(part["filename"]).name or "attachment",
+        content_type=part["content_type"],
+    )
+
+
+def item_attachments_query(owner_id: UUID, item_id: int) -> Select:
+    return (
+        select(Attachment)
+        .where(Attachment.owner_id == owner_id, Attachment.item_id == item_id)
+        .order_by(Attachment.id)
+    )
+
+
+def owned_attachment_query(owner_id: UUID, item_id: int, attachment_id: int) -> Select:
+    return select(Attachment).where(
+        Attachment.id == attachment_id,
+        Attachment.item_id == item_id,
+        Attachment.owner_id == owner_id,
+    )
+
+
+def delete_item_attachments_statement(owner_id: UUID, item_id: int) -> Delete:
+    # Attachments have no foreign key to their item to cascade from.
+    return delete(Attachment).where(
+        Attachment.owner_id == owner_id,
+        Attachment.item_id == item_id,
+    )
+
+
+def _remove_unreferenced(referenced: set[str], older_than: float) -> int:
+    removed = 0
+    root = storage_dir()
+    if not root.exists():
+        return 0
+    for path in root.glob("*/*"):
+        is_partial = path.parent.name == "tmp"
+        if (is_partial or path.name not in referenced) and (
+            path.stat().st_mtime < older_than
+        ):
+            path.unlink(missing_ok=True)
+            removed += 1
+    return removed
+
+
+async def purge_orphan_blobs(engines: Iterable[AsyncEngine], grace: float) -> int:
+    """Delete blobs that no attachment in ``engines`` references.
+
+    Also deletes partial uploads. Only files untouched for ``grace`` seconds
+    go, so a blob stored by an upload that hasn't committed its attachment
+    yet survives. Returns the number of files deleted.
+    """
+    older_than = time.time() - grace
+    referenced: set[str] = set()
+    for engine in engines:
+        async with engine.connect() as conn:
+            result = await conn.execute(select(Attachment.sha256).distinct())
+            referenced.update(result.scalars())
+    return await anyio.to_thread.run_sync(_remove_unreferenced, referenced, older_than)
@@ -0,0 +1,191 @@
+"""Append-only audit trail of item and profile changes.
+
+Request handlers call ``audit_log.record``, which only appends to an
+in-memory buffer; nothing is written on the request path. A background task
+started in the lifespan writes the buffer to ``audit_events`` with one
+multi-row INSERT as soon as ``AUDIT_BATCH_SIZE`` events are waiting, and at
+least every ``AUDIT_FLUSH_INTERVAL`` seconds otherwise. Shutdown flushes
+whatever is left.
+
+The buffer holds at most ``AUDIT_BUFFER_SIZE`` events. If the database
+falls that far behind, further events are dropped and counted instead of
+growing memory; ``snapshot`` reports the drops together with how long the
+oldest buffered event has been waiting.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import Select, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.audit import AuditEvent
+
+logger = logging.getLogger(__name__)
+
+
+class AuditLog:
+    """A bounded buffer of audit events, written in batches."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        max_events: int = settings.AUDIT_BUFFER_SIZE,
+        batch_size: int = settings.AUDIT_BATCH_SIZE,
+        flush_interval: float = settings.AUDIT_FLUSH_INTERVAL,
+        enabled: bool = settings.AUDIT_LOG,
+    ) -> None:
+        self.session_factory = session_factory
+        self.max_events = max_events
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enabled = enabled
+        self._buffer: list[dict[str, Any]] = []
+        # Created by ``start``, on the loop that runs the flusher, rather
+        # than at import time.
+        self._wake: asyncio.Event | None = None
+        self._stopping: asyncio.Event | None = None
+        self._flushing: asyncio.Lock | None = None
+        self._task: asyncio.Task | None = None
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed_flushes = 0
+        self.max_lag_ms = 0.0
+
+    def record(
+        self,
+        action: str,
+        actor_id: UUID | None = None,
+        target_id: Any = None,
+        **details: Any,
+    ) -> None:
+        """Buffer one event; never blocks and never raises."""
+        if not self.enabled:
+            return
+        if len(self._buffer) >= self.max_events:
+            self.dropped += 1
+            return
+        self._buffer.append(
+            {
+                "at": datetime.utcnow(),
+                "actor_id": actor_id,
+                "action": action,
+                "target_id": None if target_id is None else str(target_id),
+                "details": details,
+            },
+        )
+        self.recorded += 1
+        if self._wake is not None and len(self._buffer) >= self.batch_size:
+            self._wake.set()
+
+    async def flush(self) -> int:
+        """Write every buffered event; returns how many were written.
+
+        A failed batch goes back to the front of the buffer, as far as the
+        bound allows, and is retried on the next flush.
+        """
+        written = 0
+        if self._flushing is None:
+            self._flushing = asyncio.Lock()
+        async with self._flushing:
+            while self._buffer:
+                batch = self._buffer[: self.batch_size]
+                del self._buffer[: len(batch)]
+                try:
+                    async with self.session_factory() as session:
+                        await session.execute(insert(AuditEvent), batch)
+                        await session.commit()
+                except Exception:
+                    logger.exception("Could not write %d audit events", len(batch))
+                    self.failed_flushes += 1
+                    keep = max(0, self.max_events - len(self._buffer))
+                    self.dropped += max(0, len(batch) - keep)
+                    self._buffer[:0] = batch[:keep]
+                    break
+                lag = datetime.utcnow() - batch[0]["at"]
+                self.max_lag_ms = max(self.max_lag_ms, lag.total_seconds() * 1000)
+                self.written += len(batch)
+                written += len(batch)
+        return written
+
+    async def _run(self, wake: asyncio.Event, stopping: asyncio.Event) -> None:
+        while not stopping.is_set():
+            # Wait for a full batch, the interval, or shutdown.
+            try:
+                await asyncio.wait_for(wake.wait(), timeout=self.flush_interval)
+            except TimeoutError:
+                pass
+            wake.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        """Start the flusher on the running loop; called by the lifespan."""
+        self._wake = asyncio.Event()
+        self._stopping = asyncio.Event()
+        self._flushing = asyncio.Lock()
+        self._task = asyncio.create_task(
+            self._run(self._wake, self._stopping),
+            name="audit-log-flusher",
+        )
+
+    async def stop(self) -> None:
+        """Stop the flusher and write whatever is still buffered."""
+        if self._stopping is not None and self._wake is not None:
+            self._stopping.set()
+            self._wake.set()
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        started = time.perf_counter()
+        written = await self.flush()
+        logger.info(
+            "Flushed %d audit events on shutdown in %.0f ms",
+            written,
+            (time.perf_counter() - started) * 1000,
+        )
+
+    def snapshot(self) -> dict[str, Any]:
+        lag_ms = 0.0
+        if self._buffer:
+            lag = datetime.utcnow() - self._buffer[0]["at"]
+            lag_ms = lag.total_seconds() * 1000
+        return {
+            "buffered": len(self._buffer),
+            "recorded": self.recorded,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed_flushes": self.failed_flushes,
+            "lag_ms": round(lag_ms, 1),
+            "max_lag_ms": round(self.max_lag_ms, 1),
+        }
+
+
+audit_log = AuditLog(AsyncSessionLocal)
+
+
+def audit_page_query(
+    before: int | None = None,
+    limit: int = 50,
+    actor_id: UUID | None = None,
+    action: str | None = None,
+) -> Select:
+    """Newest events first, keyset-paged on id.
+
+    With ``actor_id`` or ``action`` the scan follows the matching
+    ``(column, id)`` index instead of filtering the whole table.
+    """
+    query = select(AuditEvent)
+    if actor_id is not None:
+        query = query.where(AuditEvent.actor_id == actor_id)
+    if action is not None:
+        query = query.where(AuditEvent.action == action)
+    if before is not None:
+        query = query.where(AuditEvent.id < before)
+    return query.order_by(AuditEvent.id.desc()).limit(limit)
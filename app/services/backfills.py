@@ -0,0 +1,32 @@
+"""Data migrations for the item tables (see app/services/data_migrations.py).
+
+Run them with ``data-migrations run <name>`` after the schema revision that
+needs them.
+"""
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.tag import ItemTag, Tag
+from app.services.data_migrations import data_migration
+
+
+@data_migration(
+    "tags.item_counts",
+    Tag.__table__,
+    description="recount Tag.item_count from item_tags",
+)
+async def recount_tag_items(session: AsyncSession, low: int, high: int) -> int:
+    count = (
+        select(func.count())
+        .where(ItemTag.tag_id == Tag.id)
+        .correlate(Tag)
+        .scalar_subquery()
+    )
+    result = await session.execute(
+        update(Tag)
+        .where(Tag.id > low, Tag.id <= high, Tag.item_count != count)
+        .values(item_count=count)
+        .execution_options(synchronize_session=False),
+    )
+    return result.rowcount
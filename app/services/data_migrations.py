@@ -0,0 +1,161 @@
+"""Resumable, batched data migrations, run separately from schema upgrades.
+
+An Alembic revision changes the schema; filling a new column, rebuilding a
+counter or populating an index is a data migration registered here with
+``@data_migration`` and run with the ``data-migrations`` command. Doing it
+inside the revision would be one transaction over the whole table, holding
+SQLite's write lock (or PostgreSQL row locks) for as long as it takes.
+
+``run_migration`` walks the table's integer key in ranges of ``batch_size``
+rows instead. Each range is migrated and its checkpoint advanced in the same
+short transaction, with an optional pause between batches to leave room for
+foreground writes. An interrupted run resumes after the last committed
+range, and a migration that has finished is not run again. Migrations must
+still be correct for rows written while they run, so they usually only
+touch rows that need it (``WHERE column IS NULL``).
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import Table, delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.data_migration import DataMigrationCheckpoint
+
+logger = logging.getLogger(__name__)
+
+# Migrates the rows with ``low < key <= high``; returns how many it changed.
+BatchFn = Callable[[AsyncSession, int, int], Awaitable[int]]
+
+
+@dataclass(slots=True, frozen=True)
+class DataMigration:
+    name: str
+    table: Table
+    key: str
+    description: str
+    apply: BatchFn
+
+
+MIGRATIONS: dict[str, DataMigration] = {}
+
+
+def data_migration(
+    name: str,
+    table: Table,
+    key: str = "id",
+    description: str = "",
+) -> Callable[[BatchFn], BatchFn]:
+    """Register a batch function migrating ``table`` in ranges of ``key``."""
+
+    def register(apply: BatchFn) -> BatchFn:
+        MIGRATIONS[name] = DataMigration(name, table, key, description, apply)
+        return apply
+
+    return register
+
+
+async def next_batch_end(
+    session: AsyncSession,
+    migration: DataMigration,
+    after: int,
+    batch_size: int,
+) -> int | None:
+    """The key ending the next ``batch_size`` rows after ``after``, if any."""
+    key = migration.table.c[migration.key]
+    batch = select(key).where(key > after).order_by(key).limit(batch_size).subquery()
+    end: int | None = await session.scalar(select(func.max(batch.c[migration.key])))
+    return end
+
+
+async def run_migration(
+    session_factory: async_sessionmaker[AsyncSession],
+    name: str,
+    batch_size: int = 1000,
+    pause: float = 0.0,
+    max_batches: int | None = None,
+    on_batch: Callable[[DataMigrationCheckpoint], None] | None = None,
+) -> DataMigrationCheckpoint:
+    """Run (or resume) ``name`` until it is done or ``max_batches`` ran."""
+    migration = MIGRATIONS[name]
+    ran = 0
+    while True:
+        async with session_factory() as session:
+            checkpoint = await session.get(DataMigrationCheckpoint, name)
+            if checkpoint is None:
+                checkpoint = DataMigrationCheckpoint(
+                    name=name,
+                    last_key=0,
+                    rows=0,
+                    batches=0,
+                    status="running",
+                )
+                session.add(checkpoint)
+            if checkpoint.status == "done":
+                return checkpoint
+
+            now = datetime.utcnow()
+            high = await next_batch_end(
+                session,
+                migration,
+                checkpoint.last_key,
+                batch_size,
+            )
+            if high is None:
+                checkpoint.status = "done"
+                checkpoint.finished_at = now
+            else:
+                changed = await migration.apply(session, checkpoint.last_key, high)
+                checkpoint.last_key = high
+                checkpoint.rows += changed
+                checkpoint.batches += 1
+            checkpoint.updated_at = now
+            await session.commit()
+
+        if on_batch is not None:
+            on_batch(checkpoint)
+        if checkpoint.status == "done":
+            logger.info(
+                "Data migration %s done: %d rows in %d batches",
+                name,
+                checkpoint.rows,
+                checkpoint.batches,
+            )
+            return checkpoint
+        ran += 1
+        if max_batches is not None and ran >= max_batches:
+            return checkpoint
+        if pause:
+            await asyncio.sleep(pause)
+
+
+async def migration_status(session: AsyncSession) -> list[dict[str, Any]]:
+    """Every registered migration with its checkpoint, if it has one."""
+    result = await session.scalars(select(DataMigrationCheckpoint))
+    checkpoints = {checkpoint.name: checkpoint for checkpoint in result}
+    status = []
+    for name, migration in sorted(MIGRATIONS.items()):
+        checkpoint = checkpoints.get(name)
+        status.append(
+            {
+                "name": name,
+                "description": migration.description,
+                "status": checkpoint.status if checkpoint else "pending",
+                "last_key": checkpoint.last_key if checkpoint else None,
+                "rows": checkpoint.rows if checkpoint else 0,
+                "batches": checkpoint.batches if checkpoint else 0,
+                "updated_at": checkpoint.updated_at if checkpoint else None,
+            },
+        )
+    return status
+
+
+async def reset_migration(session: AsyncSession, name: str) -> None:
+    """Forget ``name``'s progress so the next run starts from the beginning."""
+    await session.execute(
+        delete(DataMigrationCheckpoint).where(DataMigrationCheckpoint.name == name),
+    )
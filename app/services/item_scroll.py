@@ -0,0 +1,189 @@
+"""Infinite scrolling through a user's items.
+
+Each chunk is one keyset query (``scroll_query``) fetching a row more than
+it shows, to learn whether another chunk exists; nothing is ever counted.
+
+While a chunk renders, ``ScrollPrefetcher`` already loads the next one in
+its own session, keyed by the user's ``item_list_flight`` generation so a
+write makes earlier prefetches unreachable. When the sentinel row scrolls
+into view the request usually finds its rows waiting.
+
+``AdaptivePageSize`` keeps an exponentially weighted average of the time a
+row costs to query and render, and sizes chunks so one takes about
+``SCROLL_TARGET_MS``.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Coroutine, Hashable
+from dataclasses import dataclass
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.services.items import ItemRow, item_rows, scroll_query
+from app.services.tags import live_ids, tags_by_item
+
+
+@dataclass(slots=True, frozen=True)
+class ScrollChunk:
+    rows: list[ItemRow]
+    next_cursor: str | None
+    query_ms: float
+    tags: dict[int, list[str]]
+
+
+def parse_cursor(cursor: str) -> tuple[bool, int]:
+    """``"<archived 0|1>:<id>"`` -> ``(archived, id)``."""
+    archived, _, item_id = cursor.partition(":")
+    return archived == "1", int(item_id)
+
+
+def format_cursor(row: ItemRow) -> str:
+    return f"{int(row.archived)}:{row.id}"
+
+
+async def fetch_chunk(
+    session: AsyncSession,
+    owner_id: UUID,
+    search: str | None,
+    include_archived: bool,
+    cursor: str | None,
+    limit: int,
+    tag: str | None = None,
+) -> ScrollChunk:
+    started = time.perf_counter()
+    after = parse_cursor(cursor) if cursor else None
+    result = await session.execute(
+        scroll_query(owner_id, search, include_archived, after, limit + 1, tag),
+    )
+    rows = item_rows(result)
+    next_cursor = format_cursor(rows[limit - 1]) if len(rows) > limit else None
+    rows = rows[:limit]
+    tags = await tags_by_item(session, live_ids(rows))
+    query_ms = (time.perf_counter() - started) * 1000
+    return ScrollChunk(rows, next_cursor, query_ms, tags)
+
+
+class AdaptivePageSize:
+    """Chunk sizes aiming at ``target_ms`` per chunk, from an EWMA of row cost."""
+
+    def __init__(
+        self,
+        target_ms: float,
+        minimum: int,
+        maximum: int,
+        alpha: float = 0.2,
+    ) -> None:
+        self.target_ms = target_ms
+        self.minimum = minimum
+        self.maximum = maximum
+        self.alpha = alpha
+        self.ms_per_row: float | None = None
+
+    def size(self) -> int:
+        if not self.ms_per_row:
+            return self.minimum
+        size = int(self.target_ms / self.ms_per_row)
+        return max(self.minimum, min(self.maximum, size))
+
+    def observe(self, elapsed_ms: float, rows: int) -> None:
+        if rows == 0:
+            return
+        sample = elapsed_ms / rows
+        if self.ms_per_row is None:
+            self.ms_per_row = sample
+        else:
+            self.ms_per_row += self.alpha * (sample - self.ms_per_row)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "target_ms": self.target_ms,
+            "ms_per_row": round(self.ms_per_row or 0, 4),
+            "size": self.size(),
+        }
+
+
+class ScrollPrefetcher:
+    """Background loads of next chunks, bounded in number and age."""
+
+    def __init__(self, ttl: float, max_entries: int) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._tasks: OrderedDict[Hashable, tuple[float, asyncio.Task[ScrollChunk]]] = (
+            OrderedDict()
+        )
+        self.started = 0
+        self.hits = 0
+        self.misses = 0
+        self.wasted = 0
+        self.failed = 0
+
+    def _drop(self, key: Hashable) -> None:
+        _, task = self._tasks.pop(key)
+        task.cancel()
+        self.wasted += 1
+
+    def start(
+        self,
+        key: Hashable,
+        fn: Callable[[], Coroutine[Any, Any, ScrollChunk]],
+    ) -> None:
+        """Begin loading ``key`` unless it is already loading."""
+        if key in self._tasks:
+            return
+        now = time.monotonic()
+        while self._tasks:
+            oldest, (expires, _) = next(iter(self._tasks.items()))
+            if expires > now and len(self._tasks) < self.max_entries:
+                break
+            self._drop(oldest)
+        task = asyncio.create_task(fn())
+        # Retrieve errors of prefetches nobody takes, so they aren't logged.
+        task.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self._tasks[key] = (now + self.ttl, task)
+        self.started += 1
+
+    async def take(self, key: Hashable) -> ScrollChunk | None:
+        """The prefetched chunk for ``key``, waiting for it if still loading."""
+        entry = self._tasks.pop(key, None)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires, task = entry
+        if expires <= time.monotonic():
+            task.cancel()
+            self.wasted += 1
+            self.misses += 1
+            return None
+        try:
+            chunk = await task
+        except Exception:
+            self.failed += 1
+            return None
+        self.hits += 1
+        return chunk
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "pending": len(self._tasks),
+            "started": self.started,
+            "hits": self.hits,
+            "misses": self.misses,
+            "wasted": self.wasted,
+            "failed": self.failed,
+        }
+
+
+scroll_page_size = AdaptivePageSize(
+    settings.SCROLL_TARGET_MS,
+    settings.SCROLL_MIN_ROWS,
+    settings.SCROLL_MAX_ROWS,
+)
+scroll_prefetch = ScrollPrefetcher(
+    settings.SCROLL_PREFETCH_TTL,
+    settings.SCROLL_PREFETCH_MAX,
+)
@@ -0,0 +1,230 @@
+"""Item queries shared by the item routes and startup warm-up.
+
+Building every statement in one place keeps their SQLAlchemy cache keys
+identical, so statements compiled during warm-up are reused by requests.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Iterable, Sequence
+from uuid import UUID
+
+from sqlalchemy import (
+    ColumnElement,
+    Insert,
+    Select,
+    Subquery,
+    Update,
+    and_,
+    delete,
+    false,
+    func,
+    insert,
+    or_,
+    select,
+    true,
+    union_all,
+    update,
+)
+from sqlalchemy.sql.dml import ReturningDelete
+
+from app.models.item import ArchivedItem, Item
+from app.models.tag import ItemTag, Tag
+
+# Columns returned by the JSON API; selected directly so rows never become
+# ORM instances. ``version`` is what a PATCH passes back as its precondition.
+ITEM_COLUMNS = (Item.id, Item.title, Item.description, Item.owner_id, Item.version)
+
+# Columns the HTML item list renders.
+ITEM_ROW_COLUMNS = (Item.id, Item.title, Item.description)
+
+
+@dataclass(slots=True, frozen=True)
+class ItemRow:
+    """A read-only item for rendering; far cheaper to build than an ORM Item."""
+
+    id: int
+    title: str
+    description: str | None
+    archived: bool = False
+
+
+def item_rows(rows: Iterable[Sequence[Any]]) -> list[ItemRow]:
+    """Build ``ItemRow``s from rows of ``ITEM_ROW_COLUMNS`` [+ archived]."""
+    return [ItemRow(*row) for row in rows]
+
+
+def item_filters(
+    owner_id: UUID,
+    search: str | None = None,
+    tag: str | None = None,
+) -> list[ColumnElement]:
+    criteria: list[ColumnElement] = [Item.owner_id == owner_id]
+    if search:
+        criteria.append(Item.title.ilike(f"%{search}%"))
+    if tag:
+        # Resolved through uq_tags_owner_name, then ix_item_tags_tag_item.
+        criteria.append(
+            select(ItemTag.item_id)
+            .join(Tag, Tag.id == ItemTag.tag_id)
+            .where(
+                Tag.owner_id == owner_id,
+                Tag.name == tag,
+                ItemTag.item_id == Item.id,
+            )
+            .exists(),
+        )
+    return criteria
+
+
+def items_query(
+    owner_id: UUID,
+    search: str | None = None,
+    tag: str | None = None,
+) -> Select:
+    """Rows of items owned by ``owner_id``, optionally filtered by title/tag."""
+    return select(*ITEM_ROW_COLUMNS).where(*item_filters(owner_id, search, tag))
+
+
+def merged_items(
+    owner_id: UUID,
+    search: str | None = None,
+    tag: str | None = None,
+) -> Subquery:
+    """Hot and archived items as one subquery with an ``archived`` flag.
+
+    Archived items have no tags, so a tag filter leaves only hot items.
+    """
+    hot = select(*ITEM_ROW_COLUMNS, false().label("archived")).where(
+        *item_filters(owner_id, search, tag),
+    )
+    cold = select(
+        ArchivedItem.id,
+        ArchivedItem.title,
+        ArchivedItem.description,
+        true().label("archived"),
+    ).where(ArchivedItem.owner_id == owner_id)
+    if search:
+        cold = cold.where(ArchivedItem.title.ilike(f"%{search}%"))
+    if tag:
+        cold = cold.where(false())
+    return union_all(hot, cold).subquery()
+
+
+def merged_items_query(
+    owner_id: UUID,
+    search: str | None = None,
+    tag: str | None = None,
+) -> Select:
+    """Hot and archived items as rows with an ``archived`` flag, hot first."""
+    merged = merged_items(owner_id, search, tag)
+    return select(merged).order_by(merged.c.archived, merged.c.id)
+
+
+def scroll_query(
+    owner_id: UUID,
+    search: str | None = None,
+    include_archived: bool = False,
+    after: tuple[bool, int] | None = None,
+    limit: int | None = None,
+    tag: str | None = None,
+) -> Select:
+    """Item rows in ``(archived, id)`` order after the keyset cursor ``after``."""
+    if include_archived:
+        merged = merged_items(owner_id, search, tag)
+        query = select(merged).order_by(merged.c.archived, merged.c.id)
+        if after is not None:
+            archived, after_id = after
+            is_archived = merged.c.archived == true()
+            # Hot rows sort first: past a hot cursor every archived row follows.
+            query = query.where(
+                (
+                    and_(is_archived, merged.c.id > after_id)
+                    if archived
+                    else or_(is_archived, merged.c.id > after_id)
+                ),
+            )
+    else:
+        query = items_query(owner_id, search, tag).order_by(Item.id)
+        if after is not None:
+            query = query.where(Item.id > after[1])
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+def count_query(query: Select) -> Select:
+    return select(func.count()).select_from(query.subquery())
+
+
+def page_query(query: Select, page: int, per_page: int) -> Select:
+    return query.offset((page - 1) * per_page).limit(per_page)
+
+
+def owned_item_query(owner_id: UUID, item_id: int) -> Select:
+    return select(Item).where(Item.id == item_id, Item.owner_id == owner_id)
+
+
+def item_rows_query(
+    owner_id: UUID,
+    search: str | None = None,
+    after_id: int | None = None,
+    limit: int | None = None,
+    tag: str | None = None,
+) -> Select:
+    """Core rows of ``ITEM_COLUMNS`` in id order, for keyset pagination."""
+    query = select(*ITEM_COLUMNS).where(*item_filters(owner_id, search, tag))
+    if after_id is not None:
+        query = query.where(Item.id > after_id)
+    query = query.order_by(Item.id)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+def item_titles_query(owner_id: UUID) -> Select:
+    """``(id, title)`` rows used to build the suggestion index."""
+    return select(Item.id, Item.title).where(Item.owner_id == owner_id)
+
+
+def owned_item_row_query(owner_id: UUID, item_id: int) -> Select:
+    return select(*ITEM_COLUMNS).where(Item.id == item_id, Item.owner_id == owner_id)
+
+
+def insert_items_statement() -> Insert:
+    """INSERT ... RETURNING for one or many rows, in parameter order."""
+    return insert(Item).returning(*ITEM_COLUMNS, sort_by_parameter_order=True)
+
+
+def update_item_statement(
+    owner_id: UUID,
+    item_id: int,
+    values: dict[str, Any],
+    version: int | None = None,
+) -> Update:
+    """UPDATE ... RETURNING that bumps ``version``.
+
+    With ``version`` set, no row matches (and nothing is returned) if the
+    item was changed since that version was read.
+    """
+    criteria = [Item.id == item_id, Item.owner_id == owner_id]
+    if version is not None:
+        criteria.append(Item.version == version)
+    return (
+        update(Item)
+        .where(*criteria)
+        .values(**values, version=Item.version + 1)
+        .returning(*ITEM_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def delete_item_statement(
+    owner_id: UUID,
+    item_id: int,
+) -> ReturningDelete[tuple[int]]:
+    return (
+        delete(Item)
+        .where(Item.id == item_id, Item.owner_id == owner_id)
+        .returning(Item.id)
+        .execution_options(synchronize_session=False)
+    )
@@ -0,0 +1,239 @@
+"""Durable database-backed job queue.
+
+Jobs are rows in the ``jobs`` table. Workers claim them with a single
+``UPDATE ... RETURNING`` whose candidate subquery uses ``FOR UPDATE SKIP
+LOCKED`` on PostgreSQL, so concurrent workers (in any number of processes)
+never block on or double-claim a job. SQLite serializes writers, which makes
+the same UPDATE atomic there as well.
+
+Completed jobs are deleted to keep the table small; jobs that exhaust their
+attempts stay behind with ``status = 'failed'`` and the last error.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.models.job import Job
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[dict[str, Any], AsyncSession], Awaitable[None]]
+
+HANDLERS: dict[str, JobHandler] = {}
+
+
+def job_handler(kind: str) -> Callable[[JobHandler], JobHandler]:
+    """Register the coroutine that runs jobs of ``kind``."""
+
+    def register(handler: JobHandler) -> JobHandler:
+        HANDLERS[kind] = handler
+        return handler
+
+    return register
+
+
+async def enqueue(
+    session: AsyncSession,
+    kind: str,
+    payload: dict[str, Any],
+    delay: float = 0,
+) -> None:
+    """Add a job to ``session``; it is durable once the caller commits."""
+    session.add(
+        Job(
+            kind=kind,
+            payload=payload,
+            run_at=datetime.utcnow() + timedelta(seconds=delay),
+        ),
+    )
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter: base, 2*base, 4*base, ..."""
+    delay: float = settings.JOBS_RETRY_BACKOFF * 2 ** (attempts - 1)
+    return delay * random.uniform(0.8, 1.2)  # noqa: S311
+
+
+@dataclass
+class JobMetrics:
+    started: float = field(default_factory=time.monotonic)
+    claimed: int = 0
+    succeeded: int = 0
+    retried: int = 0
+    failed: int = 0
+    # Lag is how late a job started relative to its run_at.
+    last_lag: float = 0.0
+    max_lag: float = 0.0
+    total_lag: float = 0.0
+
+    def record_claim(self, lag: float) -> None:
+        self.claimed += 1
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        self.total_lag += lag
+
+    def snapshot(self) -> dict[str, float]:
+        uptime = time.monotonic() - self.started
+        return {
+            "claimed": self.claimed,
+            "succeeded": self.succeeded,
+            "retried": self.retried,
+            "failed": self.failed,
+            "throughput_per_second": round(self.succeeded / uptime, 3) if uptime else 0,
+            "last_lag_seconds": round(self.last_lag, 3),
+            "avg_lag_seconds": (
+                round(self.total_lag / self.claimed, 3) if self.claimed else 0
+            ),
+            "max_lag_seconds": round(self.max_lag, 3),
+        }
+
+
+async def queue_stats(session: AsyncSession) -> dict[str, Any]:
+    """Queue depth per status and age of the oldest runnable job."""
+    result = await session.execute(
+        select(Job.status, func.count()).group_by(Job.status),
+    )
+    depth = dict(result.tuples().all())
+    oldest = await session.scalar(
+        select(func.min(Job.run_at)).where(
+            Job.status == "queued",
+            Job.run_at <= datetime.utcnow(),
+        ),
+    )
+    return {
+        "depth": depth,
+        "oldest_runnable_seconds": (
+            (datetime.utcnow() - oldest).total_seconds() if oldest else 0
+        ),
+    }
+
+
+class JobWorkerPool:
+    """A pool of asyncio workers that claim and run queued jobs."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        concurrency: int = settings.JOBS_CONCURRENCY,
+        poll_interval: float = settings.JOBS_POLL_INTERVAL,
+    ) -> None:
+        self.session_factory = session_factory
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.metrics = JobMetrics()
+        self._stopping = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+    def claim_statement(self, dialect: str) -> Any:
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=settings.JOBS_VISIBILITY_TIMEOUT)
+        runnable = or_(
+            and_(Job.status == "queued", Job.run_at <= now),
+            # A worker died mid-job; make it visible again.
+            and_(Job.status == "running", Job.locked_at < stale),
+        )
+        candidate = select(Job.id).where(runnable).order_by(Job.run_at, Job.id).limit(1)
+        if dialect == "postgresql":
+            candidate = candidate.with_for_update(skip_locked=True)
+        return (
+            update(Job)
+            .where(Job.id == candidate.scalar_subquery(), runnable)
+            .values(status="running", locked_at=now, attempts=Job.attempts + 1)
+            .returning(Job.id, Job.kind, Job.payload, Job.attempts, Job.run_at)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def run_one(self) -> bool:
+        """Claim and run a single job. Returns False if none was runnable."""
+        async with self.session_factory() as session:
+            dialect = session.bind.dialect.name if session.bind else ""
+            result = await session.execute(self.claim_statement(dialect))
+            job = result.one_or_none()
+            await session.commit()
+        if job is None:
+            return False
+
+        self.metrics.record_claim((datetime.utcnow() - job.run_at).total_seconds())
+        error: str | None = None
+        try:
+            handler = HANDLERS[job.kind]
+            async with self.session_factory() as session:
+                await handler(job.payload, session)
+                await session.commit()
+        except Exception as exc:  # noqa: BLE001 - any failure is retried
+            error = f"{type(exc).__name__}: {exc}"
+            logger.warning("Job %s (%s) failed: %s", job.id, job.kind, error)
+
+        async with self.session_factory() as session:
+            if error is None:
+                self.metrics.succeeded += 1
+                await session.execute(delete(Job).where(Job.id == job.id))
+            elif job.attempts >= settings.JOBS_MAX_ATTEMPTS:
+                self.metrics.failed += 1
+                await session.execute(
+                    update(Job)
+                    .where(Job.id == job.id)
+                    .values(status="failed", locked_at=None, last_error=error),
+                )
+            else:
+                self.metrics.retried += 1
+                run_at = datetime.utcnow() + timedelta(
+                    seconds=retry_delay(job.attempts),
+                )
+                await session.execute(
+                    update(Job)
+                    .where(Job.id == job.id)
+                    .values(
+                        status="queued",
+                        locked_at=None,
+                        run_at=run_at,
+                        last_error=error,
+                    ),
+                )
+            await session.commit()
+        return True
+
+    async def _worker(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                ran = await self.run_one()
+            except Exception:
+                logger.exception("Job worker error")
+                ran = False
+            if not ran:
+                # Idle: wait for the next poll, waking early on shutdown.
+                try:
+                    await asyncio.wait_for(
+                        self._stopping.wait(),
+                        timeout=self.poll_interval,
+                    )
+                except TimeoutError:
+                    pass
+
+    def start(self) -> None:
+        self._stopping.clear()
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"job-worker-{n}")
+            for n in range(self.concurrency)
+        ]
+        logger.info("Started %d job workers", self.concurrency)
+
+    async def stop(self) -> None:
+        """Stop after the jobs currently running have finished."""
+        self._stopping.set()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Stopped job workers: %s", self.metrics.snapshot())
+
+    async def run_forever(self) -> None:
+        self.start()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
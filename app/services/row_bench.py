@@ -0,0 +1,110 @@
+"""Benchmark ORM ``Item`` instances against ``ItemRow`` for read paths.
+
+Both paths run the same SELECT over an in-memory SQLite database, so the
+difference is what it costs to materialize each row: identity map and
+attribute instrumentation for the ORM, a slotted dataclass for ``ItemRow``.
+Memory is what the materialized objects keep alive, measured with
+``tracemalloc``.
+"""
+
+import time
+import tracemalloc
+import uuid
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models.item import Item
+from app.models.user import User
+from app.services.items import item_rows, items_query
+
+
+@dataclass
+class BenchResult:
+    scenario: str
+    path: str
+    rows: int
+    us_per_row: float
+    bytes_per_row: float
+
+
+async def _orm_load(session: AsyncSession, owner_id: uuid.UUID, limit: int) -> Any:
+    result = await session.execute(
+        select(Item).where(Item.owner_id == owner_id).limit(limit),
+    )
+    return result.scalars().all()
+
+
+async def _row_load(session: AsyncSession, owner_id: uuid.UUID, limit: int) -> Any:
+    result = await session.execute(items_query(owner_id).limit(limit))
+    return item_rows(result)
+
+
+LOADERS: dict[str, Callable[[AsyncSession, uuid.UUID, int], Awaitable[Any]]] = {
+    "orm": _orm_load,
+    "row": _row_load,
+}
+
+
+async def run_row_benchmark(
+    scenarios: dict[str, int],
+    repeat: int = 20,
+) -> list[BenchResult]:
+    """Time and size each loader for each ``{scenario: row count}``."""
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    owner_id = uuid.uuid4()
+    most = max(scenarios.values())
+    async with engine.begin() as conn:
+        await conn.run_sync(
+            Base.metadata.create_all,
+            tables=[User.__table__, Item.__table__],
+        )
+        await conn.execute(
+            insert(Item),
+            [
+                {
+                    "title": f"Item {n}",
+                    "description": f"Description of item {n} " * 4,
+                    "owner_id": owner_id,
+                }
+                for n in range(most)
+            ],
+        )
+
+    results = []
+    try:
+        for scenario, rows in scenarios.items():
+            for path, load in LOADERS.items():
+                # Time with a fresh session per run so the ORM identity map
+                # never serves a cached instance.
+                elapsed = 0.0
+                for _ in range(repeat):
+                    async with AsyncSession(engine) as session:
+                        started = time.perf_counter()
+                        await load(session, owner_id, rows)
+                        elapsed += time.perf_counter() - started
+
+                async with AsyncSession(engine) as session:
+                    tracemalloc.start()
+                    before = tracemalloc.get_traced_memory()[0]
+                    loaded = await load(session, owner_id, rows)
+                    retained = tracemalloc.get_traced_memory()[0] - before
+                    tracemalloc.stop()
+                    del loaded
+
+                results.append(
+                    BenchResult(
+                        scenario=scenario,
+                        path=path,
+                        rows=rows,
+                        us_per_row=elapsed / repeat / rows * 1_000_000,
+                        bytes_per_row=retained / rows,
+                    ),
+                )
+    finally:
+        await engine.dispose()
+    return results
@@ -0,0 +1,263 @@
+"""Bulk dataset generation for reproducing production-sized workloads.
+
+Rows are generated as plain dicts and written with Core ``insert()`` in large
+``executemany`` batches, bypassing the ORM unit of work entirely. Generation is
+deterministic for a given seed, so two runs with the same arguments produce the
+same users, item counts and texts.
+"""
+
+import random
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator
+from uuid import UUID
+
+from fastapi_users.password import PasswordHelper
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.models.item import Item
+from app.models.user import User
+
+# Small vocabulary; the goal is realistic lengths, not realistic prose.
+WORDS = (
+    "alpha bravo charlie delta echo foxtrot golf hotel india juliet kilo lima "
+    "mike november oscar papa quebec romeo sierra tango uniform victor whiskey "
+    "xray yankee zulu report invoice meeting draft review release backlog task "
+    "customer order shipment payment refund ticket incident migration cache "
+    "index query latency budget roadmap sprint design spec feedback bug fix"
+).split()
+
+TITLE_MAX_LENGTH = 100
+
+
+@dataclass(frozen=True)
+class SeedOptions:
+    users: int = 1_000
+    items_per_user: int = 100
+    batch_size: int = 10_000
+    seed: int = 42
+    processes: int = 1
+    password: str = "password"  # noqa: S105 - seeded accounts are for local use
+    email_domain: str = "example.com"
+
+
+@dataclass
+class SeedReport:
+    users: int = 0
+    items: int = 0
+    users_seconds: float = 0.0
+    items_seconds: float = 0.0
+
+    @property
+    def rows(self) -> int:
+        return self.users + self.items
+
+    @property
+    def seconds(self) -> float:
+        return self.users_seconds + self.items_seconds
+
+    @staticmethod
+    def rate(rows: int, seconds: float) -> float:
+        return rows / seconds if seconds > 0 else 0.0
+
+
+def _user_id(rng: random.Random) -> UUID:
+    return UUID(int=rng.getrandbits(128), version=4)
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _title(rng: random.Random) -> str:
+    # Titles are short with a long tail: median ~3 words, rarely above 10.
+    words = max(1, min(int(rng.lognormvariate(1.1, 0.5)), 15))
+    return _sentence(rng, words).capitalize()[:TITLE_MAX_LENGTH]
+
+
+def _description(rng: random.Random) -> str | None:
+    # About a quarter of items have no description; the rest are a
+    # sentence or two with the occasional long note.
+    if rng.random() < 0.25:
+        return None
+    words = max(1, min(int(rng.lognormvariate(3.0, 0.9)), 400))
+    return _sentence(rng, words).capitalize() + "."
+
+
+def item_counts(options: SeedOptions) -> list[int]:
+    """Split ``users * items_per_user`` items across users with a heavy tail.
+
+    A Pareto draw per user means a handful of users own a large share of all
+    items, which is what makes the largest tenants slow in production.
+    """
+    rng = random.Random(f"{options.seed}:counts")  # noqa: S311
+    weights = [rng.paretovariate(1.2) for _ in range(options.users)]
+    total_weight = sum(weights) or 1.0
+    total_items = options.users * options.items_per_user
+    counts = [int(total_items * weight / total_weight) for weight in weights]
+    # Hand the rounding remainder to the first users so totals are exact.
+    for index in range(total_items - sum(counts)):
+        counts[index % options.users] += 1
+    return counts
+
+
+def generate_users(options: SeedOptions, hashed_password: str) -> list[dict[str, Any]]:
+    rng = random.Random(f"{options.seed}:users")  # noqa: S311
+    return [
+        {
+            "id": _user_id(rng),
+            "email": f"seed{options.seed}-user{n:07d}@{options.email_domain}",
+            "hashed_password": hashed_password,
+            "is_active": True,
+            "is_superuser": False,
+            "is_verified": True,
+        }
+        for n in range(options.users)
+    ]
+
+
+def generate_item_chunk(
+    seed: int,
+    chunk_index: int,
+    owners: list[tuple[UUID, int]],
+) -> list[dict[str, Any]]:
+    """Generate the items for one chunk of ``(owner_id, count)`` pairs.
+
+    Each chunk has its own RNG derived from the seed and chunk index, so
+    the output is identical whether chunks run serially or in a pool.
+    """
+    rng = random.Random(f"{seed}:items:{chunk_index}")  # noqa: S311
+    return [
+        {
+            "title": _title(rng),
+            "description": _description(rng),
+            "owner_id": owner_id,
+        }
+        for owner_id, count in owners
+        for _ in range(count)
+    ]
+
+
+def item_chunks(
+    users: list[dict[str, Any]],
+    counts: list[int],
+    batch_size: int,
+) -> Iterator[list[tuple[UUID, int]]]:
+    """Group ``(owner_id, count)`` pairs into chunks of ``batch_size`` items.
+
+    A heavy user's items are split across as many chunks as they need, so
+    every chunk but the last holds exactly ``batch_size`` items.
+    """
+    chunk: list[tuple[UUID, int]] = []
+    size = 0
+    for user, count in zip(users, counts, strict=True):
+        while count > 0:
+            take = min(count, batch_size - size)
+            chunk.append((user["id"], take))
+            size += take
+            count -= take
+            if size == batch_size:
+                yield chunk
+                chunk, size = [], 0
+    if chunk:
+        yield chunk
+
+
+def _pooled_chunks(
+    pool: ProcessPoolExecutor,
+    options: SeedOptions,
+    chunks: list[list[tuple[UUID, int]]],
+) -> Iterator[list[dict[str, Any]]]:
+    """Yield generated chunks in order, keeping only a few in flight.
+
+    ``Executor.map`` would submit every chunk up front and hold all generated
+    rows in memory while the (slower) inserts catch up.
+    """
+    window = options.processes * 2
+    pending: deque[Future[list[dict[str, Any]]]] = deque()
+    for index, chunk in enumerate(chunks):
+        pending.append(pool.submit(generate_item_chunk, options.seed, index, chunk))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+async def _insert_batches(
+    engine: AsyncEngine,
+    table: Any,
+    batches: Iterator[list[dict[str, Any]]],
+    on_batch: Callable[[int], None],
+) -> int:
+    total = 0
+    async with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            # Durability is irrelevant for a throwaway dataset.
+            await conn.execute(text("PRAGMA synchronous = OFF"))
+            await conn.commit()
+        # One transaction per batch, so an interrupted run keeps what it
+        # inserted and no transaction grows with the dataset.
+        for batch in batches:
+            if not batch:
+                continue
+            await conn.execute(insert(table), batch)
+            await conn.commit()
+            total += len(batch)
+            on_batch(total)
+    return total
+
+
+async def seed_database(
+    engine: AsyncEngine,
+    options: SeedOptions,
+    on_progress: Callable[[str, int], None] | None = None,
+) -> SeedReport:
+    """Insert ``options.users`` users and their items, returning timings."""
+    report = SeedReport()
+
+    def progress(kind: str) -> Callable[[int], None]:
+        return lambda rows: on_progress(kind, rows) if on_progress else None
+
+    # Hashing is deliberately slow, so do it once and share it.
+    hashed_password = PasswordHelper().hash(options.password)
+    users = generate_users(options, hashed_password)
+
+    started = time.perf_counter()
+    user_batches = (
+        users[start : start + options.batch_size]
+        for start in range(0, len(users), options.batch_size)
+    )
+    report.users = await _insert_batches(
+        engine,
+        User.__table__,
+        user_batches,
+        progress("users"),
+    )
+    report.users_seconds = time.perf_counter() - started
+
+    chunks = list(item_chunks(users, item_counts(options), options.batch_size))
+    started = time.perf_counter()
+    if options.processes > 1:
+        with ProcessPoolExecutor(max_workers=options.processes) as pool:
+            report.items = await _insert_batches(
+                engine,
+                Item.__table__,
+                _pooled_chunks(pool, options, chunks),
+                progress("items"),
+            )
+    else:
+        item_batches = (
+            generate_item_chunk(options.seed, index, chunk)
+            for index, chunk in enumerate(chunks)
+        )
+        report.items = await _insert_batches(
+            engine,
+            Item.__table__,
+            item_batches,
+            progress("items"),
+        )
+    report.items_seconds = time.perf_counter() - started
+    return report
@@ -0,0 +1,180 @@
+"""In-memory prefix index over item titles for search-box suggestions.
+
+Each owner's index is a sorted list of ``(key, item_id)`` pairs with one key
+per word start of the case-folded title, so a lookup is a ``bisect`` plus a
+short forward scan. Indexes are built lazily on a user's first lookup, kept
+up to date by item writes in this process, rebuilt after
+``SUGGEST_INDEX_TTL`` seconds (to pick up writes handled by other workers),
+and evicted least-recently-used once the total number of keys exceeds
+``SUGGEST_MAX_ENTRIES``.
+"""
+
+import bisect
+import re
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.singleflight import SingleFlight
+
+# Long keys only cost memory; nobody types 64 characters into a search box.
+MAX_KEY_LENGTH = 64
+
+_WORD = re.compile(r"\S+")
+
+
+def _keys(title: str, item_id: int) -> list[tuple[str, int]]:
+    folded = title.casefold()
+    return [
+        (folded[match.start() : match.start() + MAX_KEY_LENGTH], item_id)
+        for match in _WORD.finditer(folded)
+    ]
+
+
+class TitleIndex:
+    """Prefix index for one owner's item titles."""
+
+    __slots__ = ("built_at", "keys", "titles")
+
+    def __init__(self, rows: Iterable[tuple[int, str]]) -> None:
+        self.built_at = time.monotonic()
+        self.titles: dict[int, str] = {}
+        self.keys: list[tuple[str, int]] = []
+        for item_id, title in rows:
+            self.titles[item_id] = title
+            self.keys.extend(_keys(title, item_id))
+        self.keys.sort()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def put(self, item_id: int, title: str) -> None:
+        self.discard(item_id)
+        self.titles[item_id] = title
+        for key in _keys(title, item_id):
+            bisect.insort(self.keys, key)
+
+    def discard(self, item_id: int) -> None:
+        title = self.titles.pop(item_id, None)
+        if title is None:
+            return
+        for key in _keys(title, item_id):
+            index = bisect.bisect_left(self.keys, key)
+            if index < len(self.keys) and self.keys[index] == key:
+                del self.keys[index]
+
+    def complete(self, prefix: str, limit: int) -> list[str]:
+        """Up to ``limit`` distinct titles with a word starting with ``prefix``."""
+        prefix = prefix.casefold()[:MAX_KEY_LENGTH]
+        matches: dict[str, None] = {}
+        index = bisect.bisect_left(self.keys, (prefix,))
+        while len(matches) < limit and index < len(self.keys):
+            key, item_id = self.keys[index]
+            if not key.startswith(prefix):
+                break
+            matches[self.titles[item_id]] = None
+            index += 1
+        return list(matches)
+
+
+class TitleIndexCache:
+    """Per-owner ``TitleIndex`` instances with a bound on total keys."""
+
+    def __init__(
+        self,
+        max_entries: int = settings.SUGGEST_MAX_ENTRIES,
+        ttl: float = settings.SUGGEST_INDEX_TTL,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._indexes: OrderedDict[UUID, TitleIndex] = OrderedDict()
+        # Concurrent first lookups share one build; writes bump the owner's
+        # generation so a build that raced with a write isn't kept.
+        self._builds = SingleFlight()
+        self.entries = 0
+        self.hits = 0
+        self.builds = 0
+        self.evictions = 0
+
+    async def complete(
+        self,
+        owner_id: UUID,
+        prefix: str,
+        load: Callable[[], Awaitable[Iterable[tuple[int, str]]]],
+        limit: int = settings.SUGGEST_LIMIT,
+    ) -> list[str]:
+        index = self._indexes.get(owner_id)
+        if index is not None and time.monotonic() - index.built_at < self.ttl:
+            self.hits += 1
+            self._indexes.move_to_end(owner_id)
+        else:
+            index = await self._builds.do(
+                owner_id,
+                "build",
+                lambda: self._build(owner_id, load),
+            )
+        return index.complete(prefix, limit)
+
+    async def _build(
+        self,
+        owner_id: UUID,
+        load: Callable[[], Awaitable[Iterable[tuple[int, str]]]],
+    ) -> TitleIndex:
+        generation = self._builds.generation(owner_id)
+        index = TitleIndex(await load())
+        self.builds += 1
+        if generation == self._builds.generation(owner_id):
+            self._store(owner_id, index)
+        return index
+
+    def _store(self, owner_id: UUID, index: TitleIndex) -> None:
+        self._drop(owner_id)
+        if len(index) > self.max_entries:
+            return
+        self._indexes[owner_id] = index
+        self.entries += len(index)
+        self._evict()
+
+    def _drop(self, owner_id: UUID) -> None:
+        old = self._indexes.pop(owner_id, None)
+        if old is not None:
+            self.entries -= len(old)
+
+    def _evict(self) -> None:
+        while self.entries > self.max_entries and self._indexes:
+            _, index = self._indexes.popitem(last=False)
+            self.entries -= len(index)
+            self.evictions += 1
+
+    def _update(self, owner_id: UUID, change: Callable[[TitleIndex], None]) -> None:
+        self._builds.invalidate(owner_id)
+        index = self._indexes.get(owner_id)
+        if index is None:
+            return
+        before = len(index)
+        change(index)
+        self.entries += len(index) - before
+        self._evict()
+
+    def put(self, owner_id: UUID, item_id: int, title: str) -> None:
+        """Record a created or renamed item."""
+        self._update(owner_id, lambda index: index.put(item_id, title))
+
+    def discard(self, owner_id: UUID, item_id: int) -> None:
+        """Record a deleted item."""
+        self._update(owner_id, lambda index: index.discard(item_id))
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "users": len(self._indexes),
+            "entries": self.entries,
+            "hits": self.hits,
+            "builds": self.builds,
+            "evictions": self.evictions,
+        }
+
+
+title_index = TitleIndexCache()
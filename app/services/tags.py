@@ -0,0 +1,242 @@
+"""Item tags and the facet counts shown next to the item list.
+
+Every change to an item's tags adjusts ``Tag.item_count`` in the same
+transaction, so the unfiltered facet list is a plain read of the user's
+tags rather than a ``GROUP BY`` over their items. Facets for a search need
+that aggregate, but only over the matching items; ``FacetCache`` keeps the
+result per user, ``item_list_flight`` generation and search. The generation
+only follows writes handled by this worker, so entries also expire after
+``TAG_FACET_CACHE_TTL`` seconds to pick up writes from other workers, archive
+jobs and shard rebalancing.
+
+Two requests may create the same new tag at once; the one losing the race
+on ``uq_tags_owner_name`` reuses the winner's tag.
+"""
+
+import time
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.core.config import settings
+from app.core.singleflight import item_list_flight
+from app.models.item import Item
+from app.models.tag import ItemTag, Tag
+from app.services.items import ItemRow, item_filters
+
+# Request sessions and the rebalancer's Core connections both work here.
+Executor = AsyncSession | AsyncConnection
+
+
+def live_ids(rows: Iterable[ItemRow]) -> list[int]:
+    """Ids of the live items among ``rows``.
+
+    Archived items have no tags, and their ids may collide with live ones.
+    """
+    return [row.id for row in rows if not row.archived]
+
+
+async def tags_by_item(db: Executor, item_ids: Iterable[int]) -> dict[int, list[str]]:
+    """Tag names of each item in ``item_ids`` that has any, sorted."""
+    ids = list(item_ids)
+    if not ids:
+        return {}
+    result = await db.execute(
+        select(ItemTag.item_id, Tag.name)
+        .join(Tag, Tag.id == ItemTag.tag_id)
+        .where(ItemTag.item_id.in_(ids))
+        .order_by(Tag.name),
+    )
+    tags: dict[int, list[str]] = {}
+    for item_id, name in result:
+        tags.setdefault(item_id, []).append(name)
+    return tags
+
+
+async def _adjust_counts(db: Executor, tag_ids: Iterable[int], delta: int) -> None:
+    ids = list(tag_ids)
+    if ids:
+        await db.execute(
+            update(Tag)
+            .where(Tag.id.in_(ids))
+            .values(item_count=Tag.item_count + delta)
+            .execution_options(synchronize_session=False),
+        )
+
+
+async def _create_tags(
+    db: Executor,
+    owner_id: UUID,
+    names: list[str],
+) -> dict[str, int]:
+    """Insert tags ``names``; ids of ones created concurrently are looked up."""
+    try:
+        async with db.begin_nested():
+            created = await db.execute(
+                insert(Tag).returning(Tag.name, Tag.id, sort_by_parameter_order=True),
+                [{"owner_id": owner_id, "name": name} for name in names],
+            )
+            return dict(created.tuples().all())
+    except IntegrityError:
+        pass
+    # Another transaction created some of them: one at a time then.
+    tag_ids: dict[str, int] = {}
+    for name in names:
+        try:
+            async with db.begin_nested():
+                result = await db.execute(
+                    insert(Tag).values(owner_id=owner_id, name=name).returning(Tag.id),
+                )
+        except IntegrityError:
+            result = await db.execute(
+                select(Tag.id).where(Tag.owner_id == owner_id, Tag.name == name),
+            )
+        tag_ids[name] = result.scalar_one()
+    return tag_ids
+
+
+async def set_item_tags(
+    db: Executor,
+    owner_id: UUID,
+    item_id: int,
+    names: list[str],
+) -> None:
+    """Make ``names`` the tags of ``item_id``, creating missing tags.
+
+    The caller commits.
+    """
+    result = await db.execute(
+        select(ItemTag.tag_id, Tag.name)
+        .join(Tag, Tag.id == ItemTag.tag_id)
+        .where(ItemTag.item_id == item_id),
+    )
+    current = {name: tag_id for tag_id, name in result}
+    added = [name for name in names if name not in current]
+    removed = [tag_id for name, tag_id in current.items() if name not in names]
+
+    if removed:
+        await db.execute(
+            delete(ItemTag)
+            .where(ItemTag.item_id == item_id, ItemTag.tag_id.in_(removed))
+            .execution_options(synchronize_session=False),
+        )
+        await _adjust_counts(db, removed, -1)
+
+    if added:
+        existing = await db.execute(
+            select(Tag.name, Tag.id).where(
+                Tag.owner_id == owner_id,
+                Tag.name.in_(added),
+            ),
+        )
+        tag_ids = dict(existing.tuples().all())
+        missing = [name for name in added if name not in tag_ids]
+        if missing:
+            tag_ids.update(await _create_tags(db, owner_id, missing))
+        await db.execute(
+            insert(ItemTag),
+            [{"item_id": item_id, "tag_id": tag_ids[name]} for name in added],
+        )
+        await _adjust_counts(db, tag_ids.values(), 1)
+
+
+async def drop_item_tags(db: Executor, item_ids: Iterable[int]) -> None:
+    """Untag ``item_ids`` before they are deleted or archived.
+
+    Must run before the items are deleted: where the database cascades the
+    delete, the links would otherwise vanish without adjusting the counts.
+    """
+    ids = list(item_ids)
+    if not ids:
+        return
+    result = await db.execute(
+        select(ItemTag.tag_id, func.count())
+        .where(ItemTag.item_id.in_(ids))
+        .group_by(ItemTag.tag_id),
+    )
+    for tag_id, count in result.tuples().all():
+        await db.execute(
+            update(Tag)
+            .where(Tag.id == tag_id)
+            .values(item_count=Tag.item_count - count)
+            .execution_options(synchronize_session=False),
+        )
+    await db.execute(
+        delete(ItemTag)
+        .where(ItemTag.item_id.in_(ids))
+        .execution_options(synchronize_session=False),
+    )
+
+
+class FacetCache:
+    """Per-search facet counts, keyed by the user's item generation."""
+
+    def __init__(self, max_entries: int, ttl: float) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, list[tuple[str, int]]]] = (
+            OrderedDict()
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> list[tuple[str, int]] | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: Hashable, facets: list[tuple[str, int]]) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, facets)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+facet_cache = FacetCache(settings.TAG_FACET_CACHE_SIZE, settings.TAG_FACET_CACHE_TTL)
+
+
+async def facet_counts(
+    db: AsyncSession,
+    owner_id: UUID,
+    search: str | None = None,
+) -> list[tuple[str, int]]:
+    """``(tag, item count)`` over the user's items matching ``search``."""
+    if not search:
+        result = await db.execute(
+            select(Tag.name, Tag.item_count)
+            .where(Tag.owner_id == owner_id, Tag.item_count > 0)
+            .order_by(Tag.name),
+        )
+        return list(result.tuples())
+
+    key = (owner_id, item_list_flight.generation(owner_id), search)
+    facets = facet_cache.get(key)
+    if facets is None:
+        result = await db.execute(
+            select(Tag.name, func.count())
+            .join(ItemTag, ItemTag.tag_id == Tag.id)
+            .join(Item, Item.id == ItemTag.item_id)
+            .where(*item_filters(owner_id, search))
+            .group_by(Tag.name)
+            .order_by(Tag.name),
+        )
+        facets = list(result.tuples())
+        facet_cache.put(key, facets)
+    return facets
@@ -0,0 +1,65 @@
+"""Background work for user lifecycle events.
+
+``UserManager`` hooks only enqueue these jobs, so anything slow added here
+(sending email, provisioning) stays out of the request. Password reset and
+verification tokens go out through ``deliver_token``.
+"""
+
+import logging
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import User, user_token
+from app.services.jobs import job_handler
+
+logger = logging.getLogger(__name__)
+
+
+async def deliver_token(email: str, kind: str, token: str) -> None:
+    """Get a ``"reset"`` or ``"verify"`` token to the user.
+
+    There is no mail sender yet: the token is logged at DEBUG level so the
+    flow can be completed by hand. Replace this to send the email.
+    """
+    logger.debug("%s token for %s: %s", kind.capitalize(), email, token)
+
+
+@job_handler("user.registered")
+async def user_registered(payload: dict[str, Any], _: AsyncSession) -> None:
+    logger.info(
+        "User %s (%s) has registered successfully.",
+        payload["user_id"],
+        payload["email"],
+    )
+
+
+@job_handler("user.forgot_password")
+async def user_forgot_password(payload: dict[str, Any], session: AsyncSession) -> None:
+    user = await session.get(User, UUID(payload["user_id"]))
+    # Minted now so it is never stored.
+    token = user and await user_token(session, user, "reset")
+    if not token:
+        return
+    logger.info(
+        "User %s (%s) requested password reset.",
+        payload["user_id"],
+        payload["email"],
+    )
+    await deliver_token(payload["email"], "reset", token)
+
+
+@job_handler("user.request_verify")
+async def user_request_verify(payload: dict[str, Any], session: AsyncSession) -> None:
+    user = await session.get(User, UUID(payload["user_id"]))
+    # Minted now so it is never stored.
+    token = user and await user_token(session, user, "verify")
+    if not token:
+        return
+    logger.info(
+        "Verification requested for user %s (%s).",
+        payload["user_id"],
+        payload["email"],
+    )
+    await deliver_token(payload["email"], "verify", token)
@@ -0,0 +1,13 @@
+// Send htmx requests as JSON instead of form data: hx-ext="json-enc".
+htmx.defineExtension("json-enc", {
+  onEvent: function (name, evt) {
+    if (name === "htmx:configRequest") {
+      evt.detail.headers["Content-Type"] = "application/json";
+    }
+  },
+
+  encodeParameters: function (xhr, parameters, elt) {
+    xhr.overrideMimeType("text/json");
+    return JSON.stringify(parameters);
+  },
+});
@@ -5,9 +5,14 @@ import pytest
 from httpx import ASGITransport, AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
+from app.core.config import settings
 from app.core.database import Base, get_db
 from app.main import app
 
+# The app's own database is a throwaway one in tests: let the lifespan create
+# its tables instead of requiring `alembic upgrade head` first.
+settings.DB_CREATE_ALL = True
+
 # Test database setup
 TEST_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
 
@@ -0,0 +1,46 @@
+import asyncio
+
+from httpx import ASGITransport, AsyncClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.core.admission import AdmissionController, AdmissionControlMiddleware
+
+
+async def test_requests_beyond_limit_and_queue_are_shed():
+    """Test admit, queue-timeout and queue-full shedding for one route class."""
+    release = asyncio.Event()
+
+    async def slow(request):
+        await release.wait()
+        return PlainTextResponse("ok")
+
+    controller = AdmissionController({"read": 1}, queue_size=1, timeout=0.05)
+    app = AdmissionControlMiddleware(
+        Starlette(routes=[Route("/slow", slow)]),
+        controller,
+    )
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test",
+    ) as client:
+        admitted = asyncio.create_task(client.get("/slow"))
+        await asyncio.sleep(0.01)
+        queued = asyncio.create_task(client.get("/slow"))
+        await asyncio.sleep(0.01)
+
+        shed = await client.get("/slow", headers={"HX-Request": "true"})
+        assert shed.status_code == 503
+        assert shed.headers["Retry-After"] == "1"
+        assert shed.headers["HX-Retarget"] == "#global-messages"
+
+        assert (await queued).status_code == 503
+        release.set()
+        assert (await admitted).status_code == 200
+
+    stats = controller.snapshot()["read"]
+    assert stats["admitted"] == 1
+    assert stats["shed_queue_full"] == 1
+    assert stats["shed_timeout"] == 1
+    assert stats["in_flight"] == stats["queue_depth"] == 0
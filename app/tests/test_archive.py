@@ -0,0 +1,105 @@
+import html
+import re
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.models.item import ArchivedItem, Item
+from app.services.archive import archive_batch, forget_archived
+from app.tests.conftest import TestingSessionLocal
+from app.tests.test_items_api import login
+
+
+async def archive_stale(title: str) -> list:
+    async with TestingSessionLocal() as session:
+        await session.execute(
+            update(Item)
+            .where(Item.title == title)
+            .values(updated_at=datetime.utcnow() - timedelta(days=365)),
+        )
+        cutoff = datetime.utcnow() - timedelta(days=30)
+        moved = await archive_batch(session, cutoff, batch_size=10)
+        await session.commit()
+    forget_archived(moved)
+    return moved
+
+
+async def test_archived_items_are_listed_and_restored(client: AsyncClient) -> None:
+    """Test that stale items move to the archive and show up on request."""
+    await login(client, "archive@example.com")
+    ids = {}
+    for title in ("Stale", "Fresh"):
+        response = await client.post("/api/items", json={"title": title})
+        ids[title] = response.json()["id"]
+
+    assert [item_id for item_id, _ in await archive_stale("Stale")] == [ids["Stale"]]
+    async with TestingSessionLocal() as session:
+        assert list(await session.scalars(select(Item.title))) == ["Fresh"]
+        assert list(
+            await session.execute(select(ArchivedItem.id, ArchivedItem.title)),
+        ) == [
+            (ids["Stale"], "Stale"),
+        ]
+
+    response = await client.get("/items")
+    assert "Fresh" in response.text
+    assert "Stale" not in response.text
+
+    response = await client.get("/items", params={"include_archived": "true"})
+    assert "Stale" in response.text
+    assert response.text.count("archived-item-") == 1
+
+    restore = re.search(r'hx-post="([^"]+/restore\?[^"]+)"', response.text)
+    assert restore is not None
+    response = await client.post(
+        html.unescape(restore[1]),
+        headers={"HX-Request": "true"},
+    )
+    assert response.status_code == 200
+    assert f'id="item-{ids["Stale"]}"' in response.text
+    assert "archived-item-" not in response.text
+    response = await client.post(html.unescape(restore[1]))
+    assert response.status_code == 404
+
+
+async def test_archive_keeps_attachments_and_versions(
+    client: AsyncClient,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that archiving keeps files, drops suggestions and restores cleanly."""
+    monkeypatch.setattr(settings, "ATTACHMENTS_DIR", str(tmp_path))
+    await login(client, "archive-files@example.com")
+    item = (await client.post("/api/items", json={"title": "Dusty report"})).json()
+    response = await client.post(
+        f"/items/{item['id']}/attachments",
+        files={"file": ("report.txt", b"contents", "text/plain")},
+    )
+    assert response.status_code == 200
+    download = re.search(r'href="([^"]+/attachments/\d+)"', response.text)
+    assert download is not None
+    response = await client.get("/items/suggest", params={"search": "dus"})
+    assert "Dusty report" in response.text
+
+    await archive_stale("Dusty report")
+
+    response = await client.get("/items/suggest", params={"search": "dus"})
+    assert "Dusty report" not in response.text
+    response = await client.get(download[1])
+    assert response.content == b"contents"
+
+    response = await client.post(f"/api/items/{item['id']}/restore")
+    assert response.json() == {**item, "version": item["version"] + 1}
+    response = await client.get(f"/items/{item['id']}/attachments")
+    assert "report.txt" in response.text
+    response = await client.patch(
+        f"/api/items/{item['id']}",
+        json={"title": "Stale edit", "version": item["version"]},
+    )
+    assert response.status_code == 409
+    response = await client.post(f"/api/items/{item['id']}/restore")
+    assert response.status_code == 404
@@ -0,0 +1,102 @@
+import gzip
+import hashlib
+import json
+
+from httpx import ASGITransport, AsyncClient
+from starlette.applications import Starlette
+from starlette.routing import Mount
+
+from app.core import assets
+from app.core.assets import (
+    SCRIPTS,
+    VENDOR,
+    PrecompressedStaticFiles,
+    asset_url,
+    build_assets,
+    missing_assets,
+)
+
+
+def write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+
+
+async def test_built_assets_are_fingerprinted_and_precompressed(
+    tmp_path,
+    monkeypatch,
+):
+    """Test the manifest, the .gz variant and immutable caching."""
+    script = b"window.htmx = {};" * 100
+    digest = hashlib.sha256(script).hexdigest()
+    monkeypatch.setattr(
+        assets,
+        "VENDOR",
+        {name: (url, digest) for name, (url, _) in VENDOR.items()},
+    )
+    for name in VENDOR:
+        write(tmp_path / "vendor" / name, script)
+    for relative in SCRIPTS.values():
+        write(tmp_path / relative, script)
+
+    manifest = build_assets(static_dir=tmp_path)
+    assert set(manifest) == set(VENDOR) | set(SCRIPTS)
+    assert manifest == json.loads((tmp_path / "dist" / "manifest.json").read_text())
+    url = f"/static/{manifest['htmx.js']}"
+
+    app = Starlette(
+        routes=[Mount("/static", PrecompressedStaticFiles(directory=tmp_path))],
+    )
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get(url, headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["content-type"].startswith("text/javascript")
+        assert "immutable" in response.headers["cache-control"]
+        assert response.content == script
+
+        response = await client.get(url, headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+        assert response.content == script
+
+    # A rebuild keeps the previous build's files for workers still serving
+    # its manifest, and drops the ones before that.
+    (tmp_path / SCRIPTS["json-enc.js"]).write_bytes(b"changed")
+    new_manifest = build_assets(static_dir=tmp_path)
+    assert new_manifest["json-enc.js"] != manifest["json-enc.js"]
+    assert (tmp_path / manifest["json-enc.js"]).exists()
+    assert (
+        gzip.decompress(
+            (tmp_path / f"{new_manifest['json-enc.js']}.gz").read_bytes(),
+        )
+        == b"changed"
+    )
+    (tmp_path / SCRIPTS["json-enc.js"]).write_bytes(b"changed again")
+    build_assets(static_dir=tmp_path)
+    assert (tmp_path / new_manifest["json-enc.js"]).exists()
+    assert not (tmp_path / manifest["json-enc.js"]).exists()
+
+
+def test_vendored_scripts_must_match_their_digest(tmp_path, monkeypatch, caplog):
+    """Test that a tampered or unexpected vendor file is never published."""
+    downloads = []
+
+    def download(url, path, sha256):
+        downloads.append(url)
+        raise ValueError("sha256 mismatch")
+
+    monkeypatch.setattr(assets, "_download", download)
+    write(tmp_path / "vendor" / "htmx.js", b"window.evil = true;")
+
+    manifest = build_assets(static_dir=tmp_path)
+    assert "htmx.js" not in manifest
+    assert downloads == [VENDOR["htmx.js"][0]]
+    assert "Could not vendor htmx.js" in caplog.text
+    assets.load_manifest.cache_clear()
+
+    # Without a build, pages load the committed scripts directly; only the
+    # Tailwind bundle would come from a CDN.
+    assert asset_url("htmx.js") == "/static/vendor/htmx.js"
+    assert asset_url("json-enc.js") == f"/static/{SCRIPTS['json-enc.js']}"
+    assert missing_assets() == ["app.css"]
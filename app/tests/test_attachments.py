@@ -0,0 +1,95 @@
+import hashlib
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models.attachment import Attachment
+from app.services.attachments import purge_orphan_blobs
+from app.tests.conftest import TestingSessionLocal, engine
+from app.tests.test_items_api import login
+
+
+async def test_attachments_are_deduplicated_and_ranged(
+    client: AsyncClient,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test upload dedup by content hash, Range downloads and ownership."""
+    monkeypatch.setattr(settings, "ATTACHMENTS_DIR", str(tmp_path))
+    await login(client, "attachments@example.com")
+    response = await client.post("/api/items", json={"title": "With files"})
+    item_id = response.json()["id"]
+
+    content = b"attachment body " * 1000
+    for filename in ("first.txt", "second.txt"):
+        response = await client.post(
+            f"/items/{item_id}/attachments",
+            files={"file": (filename, content, "text/plain")},
+        )
+        assert response.status_code == 200
+        assert filename in response.text
+
+    sha = hashlib.sha256(content).hexdigest()
+    blobs = [path for path in tmp_path.rglob("*") if path.is_file()]
+    assert blobs == [tmp_path / sha[:2] / sha]
+
+    response = await client.post(
+        f"/items/{item_id}/attachments",
+        files={"other": ("x.txt", b"x", "text/plain")},
+    )
+    assert response.status_code == 400
+
+    url = f"/items/{item_id}/attachments/1"
+    response = await client.get(url, headers={"Range": "bytes=0-9"})
+    assert response.status_code == 206
+    assert response.content == content[:10]
+    assert response.headers["etag"] == f'"{sha}"'
+    assert "immutable" in response.headers["cache-control"]
+    assert response.headers["x-content-type-options"] == "nosniff"
+
+    # Small files aren't compressed either, and carry no Content-Encoding.
+    response = await client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.content == content
+
+    client.cookies.clear()
+    await login(client, "attachments-other@example.com")
+    response = await client.get(url)
+    assert response.status_code == 404
+
+
+async def test_unreferenced_blobs_are_purged(
+    client: AsyncClient,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that blobs outlive their attachments only until the next purge."""
+    monkeypatch.setattr(settings, "ATTACHMENTS_DIR", str(tmp_path))
+    await login(client, "purge@example.com")
+    item_id = (await client.post("/api/items", json={"title": "Purged"})).json()["id"]
+    for content in (b"kept", b"dropped"):
+        response = await client.post(
+            f"/items/{item_id}/attachments",
+            files={"file": ("f.txt", content, "text/plain")},
+        )
+        assert response.status_code == 200
+    (tmp_path / "tmp" / "abandoned").write_bytes(b"partial")
+
+    async with TestingSessionLocal() as session:
+        dropped = await session.scalar(
+            select(Attachment.id).where(
+                Attachment.sha256 == hashlib.sha256(b"dropped").hexdigest(),
+            ),
+        )
+    response = await client.delete(f"/items/{item_id}/attachments/{dropped}")
+    assert response.status_code == 200
+    assert await purge_orphan_blobs([engine], grace=3600) == 0
+
+    files = {path.name for path in tmp_path.rglob("*") if path.is_file()}
+    assert await purge_orphan_blobs([engine], grace=-1) == 2
+    kept = hashlib.sha256(b"kept").hexdigest()
+    assert {path.name for path in tmp_path.rglob("*") if path.is_file()} == {kept}
+    assert len(files) == 3
@@ -0,0 +1,69 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import update
+
+from app.models.user import User
+from app.services.audit import AuditLog, audit_log
+from app.tests.conftest import TestingSessionLocal
+from app.tests.test_items_api import login
+
+
+async def test_audit_trail_is_written_in_batches_and_paged(
+    client: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that item changes are buffered, flushed and paged newest first."""
+    monkeypatch.setattr(audit_log, "session_factory", TestingSessionLocal)
+    await login(client, "audited@example.com")
+    user_id = (await client.get("/users/me")).json()["id"]
+    item = (await client.post("/api/items", json={"title": "Audited"})).json()
+    await client.patch(f"/api/items/{item['id']}", json={"title": "Renamed"})
+    await client.delete(f"/api/items/{item['id']}")
+
+    written = audit_log.snapshot()["written"]
+    assert await audit_log.flush() >= 3
+    assert audit_log.snapshot()["written"] > written
+    assert audit_log.snapshot()["buffered"] == 0
+
+    response = await client.get("/admin/audit")
+    assert response.status_code == 403
+
+    async with TestingSessionLocal() as session:
+        await session.execute(
+            update(User)
+            .where(User.email == "audited@example.com")  # type: ignore[arg-type]
+            .values(is_superuser=True),
+        )
+        await session.commit()
+
+    response = await client.get(
+        "/admin/audit",
+        params={"actor_id": user_id, "limit": 2},
+    )
+    page = response.json()
+    assert [event["action"] for event in page["events"]] == [
+        "item.delete",
+        "item.update",
+    ]
+    assert page["events"][1]["details"] == {"fields": ["title"]}
+
+    response = await client.get(
+        "/admin/audit",
+        params={"actor_id": user_id, "before": page["next_before"]},
+    )
+    page = response.json()
+    assert [event["action"] for event in page["events"]] == ["item.create"]
+    assert page["next_before"] is None
+
+
+async def test_audit_buffer_is_bounded_and_flushed_on_stop():
+    log = AuditLog(TestingSessionLocal, max_events=2, batch_size=10)
+    log.start()
+    for n in range(3):
+        log.record("test.event", target_id=n)
+    assert log.snapshot()["dropped"] == 1
+
+    await log.stop()
+    snapshot = log.snapshot()
+    assert snapshot["written"] == 2
+    assert snapshot["buffered"] == 0
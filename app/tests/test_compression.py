@@ -0,0 +1,87 @@
+from httpx import ASGITransport, AsyncClient
+from starlette.applications import Starlette
+from starlette.responses import HTMLResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from app.core.compression import CompressionMiddleware, negotiate
+from app.core.templates import minify_html
+
+PAGE = "<p>" + "hello world " * 500 + "</p>"
+
+
+async def page(request):
+    return HTMLResponse(PAGE, headers={"ETag": '"v1"'})
+
+
+async def fragment(request):
+    return HTMLResponse("<tr><td>one row</td></tr>")
+
+
+async def stream(request):
+    async def chunks():
+        yield PAGE.encode()
+        yield PAGE.encode()
+
+    return StreamingResponse(chunks(), media_type="text/html")
+
+
+async def encoded(request):
+    return Response(PAGE, media_type="text/html", headers={"Content-Encoding": "br"})
+
+
+async def png(request):
+    return Response(b"\x89PNG" * 1000, media_type="image/png")
+
+
+def test_negotiate_honours_q_values_and_preference():
+    offered = ["br", "zstd", "gzip"]
+    assert negotiate("gzip, deflate, br", offered) == "br"
+    assert negotiate("gzip;q=1.0, br;q=0.5", offered) == "gzip"
+    assert negotiate("br;q=0, gzip", offered) == "gzip"
+    assert negotiate("*", offered) == "br"
+    assert negotiate("identity", offered) is None
+    assert negotiate("", offered) is None
+
+
+async def test_compression_skips_small_streamed_and_encoded_responses():
+    """Test that only whole, compressible, large enough bodies are compressed."""
+    app = Starlette(
+        routes=[
+            Route("/page", page),
+            Route("/fragment", fragment),
+            Route("/stream", stream),
+            Route("/encoded", encoded),
+            Route("/png", png),
+        ],
+    )
+    app.add_middleware(CompressionMiddleware, encodings=["gzip"])
+    transport = ASGITransport(app=app)
+    headers = {"Accept-Encoding": "gzip"}
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/page", headers=headers)
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.headers["etag"] == 'W/"v1"'
+        assert int(response.headers["content-length"]) < len(PAGE)
+        assert response.text == PAGE
+
+        response = await client.get("/page", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+        assert response.headers["vary"] == "Accept-Encoding"
+
+        for path in ("/fragment", "/stream", "/png"):
+            response = await client.get(path, headers=headers)
+            assert "content-encoding" not in response.headers, path
+
+        response = await client.get("/encoded", headers=headers)
+        assert response.headers["content-encoding"] == "br"
+
+
+def test_minify_html_keeps_verbatim_elements():
+    source = (
+        "<div>\n    <p>a</p>\n\n  <pre>  x\n   y</pre>\n  <textarea>\n  t</textarea>"
+    )
+    assert (
+        minify_html(source)
+        == "<div>\n<p>a</p>\n<pre>  x\n   y</pre>\n<textarea>\n  t</textarea>"
+    )
@@ -0,0 +1,57 @@
+from httpx import AsyncClient
+from sqlalchemy import select, update
+
+from app.models.tag import Tag
+from app.services import backfills  # noqa: F401 - registers migrations
+from app.services.data_migrations import migration_status, run_migration
+from app.tests.conftest import TestingSessionLocal
+from app.tests.test_items_api import login
+
+
+async def test_data_migration_resumes_from_its_checkpoint(client: AsyncClient) -> None:
+    """Test batched runs, resuming after a stop, and not re-running when done."""
+    await login(client, "backfill@example.com")
+    await client.post(
+        "/api/items/batch",
+        json={
+            "items": [
+                {"title": "One", "tags": ["a", "b"]},
+                {"title": "Two", "tags": ["b", "c"]},
+            ],
+        },
+    )
+    async with TestingSessionLocal() as session:
+        await session.execute(update(Tag).values(item_count=0))
+        await session.commit()
+        status = {row["name"]: row for row in await migration_status(session)}
+    assert status["tags.item_counts"]["status"] == "pending"
+
+    checkpoint = await run_migration(
+        TestingSessionLocal,
+        "tags.item_counts",
+        batch_size=2,
+        max_batches=1,
+    )
+    assert (checkpoint.status, checkpoint.batches, checkpoint.rows) == (
+        "running",
+        1,
+        2,
+    )
+
+    checkpoint = await run_migration(TestingSessionLocal, "tags.item_counts")
+    assert (checkpoint.status, checkpoint.batches, checkpoint.rows) == ("done", 2, 3)
+
+    async with TestingSessionLocal() as session:
+        result = await session.execute(select(Tag.name, Tag.item_count))
+        counts = dict(result.tuples().all())
+        status = {row["name"]: row for row in await migration_status(session)}
+    assert counts == {"a": 1, "b": 2, "c": 1}
+    assert status["tags.item_counts"]["status"] == "done"
+
+    # A finished migration is not run again.
+    async with TestingSessionLocal() as session:
+        await session.execute(update(Tag).values(item_count=0))
+        await session.commit()
+    await run_migration(TestingSessionLocal, "tags.item_counts")
+    async with TestingSessionLocal() as session:
+        assert await session.scalar(select(Tag.item_count).limit(1)) == 0
@@ -0,0 +1,91 @@
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from app.core import database
+from app.core.config import settings
+from app.core.database import (
+    PROJECT_ROOT,
+    Base,
+    SchemaRevisionError,
+    check_schema_revision,
+    migration_heads,
+)
+
+
+def _write_revision(directory: Path, revision: str, down: str) -> None:
+    (directory / f"{revision}_step.py").write_text(
+        f"revision: str = {revision!r}\n"
+        f"down_revision: str | tuple[str, ...] | None = {down}\n",
+    )
+
+
+def test_migration_heads(tmp_path: Path) -> None:
+    """Test that heads are found by parsing scripts, including merges."""
+    assert migration_heads(tmp_path) == set()
+
+    _write_revision(tmp_path, "a1", "None")
+    _write_revision(tmp_path, "b2", "'a1'")
+    _write_revision(tmp_path, "c3", "'a1'")
+    assert migration_heads(tmp_path) == {"b2", "c3"}
+
+    _write_revision(tmp_path, "d4", "('b2', 'c3')")
+    assert migration_heads(tmp_path) == {"d4"}
+
+
+def test_migrations_build_the_model_schema(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that upgrading an empty database to head matches the models."""
+    database = tmp_path / "migrated.db"
+    monkeypatch.setattr(settings, "DATABASE_URL", f"sqlite+aiosqlite:///{database}")
+    # No ini file, so env.py leaves the test run's logging config alone.
+    config = Config()
+    config.set_main_option("script_location", str(PROJECT_ROOT / "alembic"))
+    command.upgrade(config, "head")
+
+    engine = create_engine(f"sqlite:///{database}")
+    with engine.connect() as conn:
+        context = MigrationContext.configure(conn)
+        assert context.get_current_heads() == tuple(migration_heads())
+        assert compare_metadata(context, Base.metadata) == []
+    engine.dispose()
+
+
+async def test_schema_check_requires_migrations(tmp_path: Path) -> None:
+    """Test that an empty versions dir or an unstamped database fails."""
+    with pytest.raises(SchemaRevisionError, match="No migration scripts"):
+        await check_schema_revision(tmp_path)
+
+    # The app's database is never stamped in the test run.
+    with pytest.raises(SchemaRevisionError, match="no alembic_version"):
+        await check_schema_revision()
+
+
+async def test_schema_check_explains_pre_migration_databases(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that a database made by the baseline create_all is told to stamp."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/old.db")
+    monkeypatch.setattr(database, "engine", engine)
+    try:
+        with pytest.raises(SchemaRevisionError, match="alembic upgrade head"):
+            await check_schema_revision()
+
+        async with engine.begin() as conn:
+            await conn.run_sync(
+                Base.metadata.create_all,
+                tables=[Base.metadata.tables[name] for name in ("user", "items")],
+            )
+        with pytest.raises(SchemaRevisionError, match="alembic stamp 0001"):
+            await check_schema_revision()
+    finally:
+        await engine.dispose()
@@ -0,0 +1,103 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.api import diagnostics
+from app.api.admin import current_superuser
+from app.core.diagnostics import CPUProfiler, CPUProfilerMiddleware, by_label
+from app.services.items import ItemRow
+
+
+def diagnostics_client() -> AsyncClient:
+    app = FastAPI()
+    app.include_router(diagnostics.router, prefix="/admin/diagnostics")
+    app.dependency_overrides[current_superuser] = lambda: None
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+
+async def test_diagnostics_are_not_mounted_by_default(client: AsyncClient) -> None:
+    response = await client.post("/admin/diagnostics/memory/start")
+    assert response.status_code == 404
+
+
+async def test_memory_snapshot_diff_and_object_counts():
+    """Test tracing, the diff against a baseline and live object counts."""
+    async with diagnostics_client() as client:
+        response = await client.post("/admin/diagnostics/memory/snapshot")
+        assert response.status_code == 409
+
+        response = await client.post("/admin/diagnostics/memory/start")
+        assert response.json()["tracing"] is True
+        try:
+            await client.post("/admin/diagnostics/memory/snapshot")
+            rows = [
+                ItemRow(id=n, title=f"Row {n}" * 10, description=None)
+                for n in range(5000)
+            ]
+            response = await client.get(
+                "/admin/diagnostics/memory/diff",
+                params={"limit": 5},
+            )
+            top = response.json()["top"]
+            assert any(site["file"] == __file__ for site in top)
+            assert top[0]["size_diff_kib"] > 0
+
+            response = await client.get("/admin/diagnostics/objects")
+            assert response.json()["objects"]["ItemRow"] >= len(rows)
+        finally:
+            response = await client.post("/admin/diagnostics/memory/stop")
+        assert response.json()["tracing"] is False
+
+
+async def test_cpu_profile_attributes_samples_to_routes():
+    """Test that a route hogging the event loop shows up in collapsed stacks."""
+
+    def spin(seconds: float) -> None:
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            pass
+
+    app = FastAPI()
+    app.include_router(diagnostics.router, prefix="/admin/diagnostics")
+    app.dependency_overrides[current_superuser] = lambda: None
+    app.add_middleware(CPUProfilerMiddleware)
+
+    @app.get("/busy", name="busy_route")
+    async def busy() -> None:
+        await asyncio.sleep(0.05)
+        spin(0.3)
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test",
+    ) as client:
+        profile, _ = await asyncio.gather(
+            client.get(
+                "/admin/diagnostics/cpu",
+                params={"seconds": 0.5, "interval_ms": 2},
+            ),
+            client.get("/busy"),
+        )
+
+    assert profile.headers["content-disposition"].endswith('.folded"')
+    lines = profile.text.splitlines()
+    busy_stacks = [line for line in lines if line.startswith("route:busy_route;")]
+    assert any("spin" in line for line in busy_stacks)
+    assert all(line.rpartition(" ")[2].isdigit() for line in lines)
+
+
+@pytest.mark.parametrize("loop", ["asyncio", "uvloop"])
+def test_cpu_profile_counts_a_waiting_loop_as_idle(loop: str) -> None:
+    """Test idle detection on asyncio's loop and on uvloop (which waits in C)."""
+    loop_factory = (
+        pytest.importorskip("uvloop").new_event_loop
+        if loop == "uvloop"
+        else asyncio.new_event_loop
+    )
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        stacks = runner.run(CPUProfiler().profile(seconds=0.2, interval=0.002))
+    labels = by_label(stacks)
+    assert labels["(idle)"] > sum(labels.values()) * 0.9
@@ -0,0 +1,33 @@
+from starlette.requests import Request
+
+from app.core.templates import templates
+from app.main import app
+from app.models.item import Item
+from app.services.items import ItemRow
+
+
+def test_item_row_renders_like_orm_item():
+    request = Request(
+        {
+            "type": "http",
+            "app": app,
+            "router": app.router,
+            "method": "GET",
+            "scheme": "http",
+            "server": ("test", 80),
+            "root_path": "",
+            "path": "/items",
+            "query_string": b"",
+            "headers": [],
+        },
+    )
+    template = templates.get_template("items/_item_row.jinja2")
+    context = {"request": request, "page": 2, "per_page": 10, "search": "x"}
+
+    for description in ("Some text", None):
+        orm = Item(id=7, title="Title", description=description)
+        row = ItemRow(id=7, title="Title", description=description)
+        assert template.render(item=orm, **context) == template.render(
+            item=row,
+            **context,
+        )
@@ -0,0 +1,47 @@
+import re
+
+from httpx import AsyncClient
+
+from app.services.item_scroll import AdaptivePageSize, scroll_prefetch
+from app.tests.test_items_api import login
+
+SENTINEL_URL = re.compile(r'id="items-scroll-sentinel"\s+hx-get="([^"]+)"')
+
+
+async def test_infinite_scroll_walks_every_item_once(client: AsyncClient) -> None:
+    """Test the keyset chunks, the sentinel chain and next-chunk prefetch."""
+    await login(client, "scroll@example.com")
+    await client.post(
+        "/api/items/batch",
+        json={"items": [{"title": f"Scroll {n}"} for n in range(35)]},
+    )
+    hits = scroll_prefetch.snapshot()["hits"]
+
+    response = await client.get(
+        "/items",
+        params={"scroll": "true"},
+        headers={"HX-Request": "true"},
+    )
+    assert "Showing" not in response.text
+    seen = re.findall(r'id="item-(\d+)"', response.text)
+    while match := SENTINEL_URL.search(response.text):
+        response = await client.get(
+            match.group(1).replace("&amp;", "&"),
+            headers={"HX-Request": "true"},
+        )
+        assert response.status_code == 200
+        seen += re.findall(r'id="item-(\d+)"', response.text)
+
+    assert len(seen) == len(set(seen)) == 35
+    assert scroll_prefetch.snapshot()["hits"] > hits
+
+
+def test_adaptive_page_size_targets_latency():
+    sizer = AdaptivePageSize(target_ms=50, minimum=10, maximum=100, alpha=0.5)
+    assert sizer.size() == 10
+    sizer.observe(elapsed_ms=20, rows=20)  # 1 ms per row
+    assert sizer.size() == 50
+    sizer.observe(elapsed_ms=60, rows=20)  # 3 ms per row -> EWMA 2 ms
+    assert sizer.size() == 25
+    sizer.observe(elapsed_ms=1, rows=100)
+    assert sizer.size() == 49
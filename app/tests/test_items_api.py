@@ -0,0 +1,164 @@
+import html
+import re
+
+import pytest
+from httpx import AsyncClient
+
+
+async def login(client: AsyncClient, email: str) -> None:
+    password = "a-long-password"  # noqa: S105
+    await client.post("/auth/register", json={"email": email, "password": password})
+    response = await client.post(
+        "/auth/cookie/login",
+        data={"username": email, "password": password},
+    )
+    assert response.status_code == 204
+    # The auth cookie is Secure; re-set it so it is sent to http://test.
+    client.cookies.set("auth", response.cookies["auth"])
+
+
+async def test_items_json_api(client: AsyncClient) -> None:
+    """Test create, batch create, cursor pagination, update and delete."""
+    await login(client, "api@example.com")
+
+    response = await client.post("/api/items", json={"title": "First"})
+    assert response.status_code == 201
+    first = response.json()
+    assert first["title"] == "First"
+    assert first["description"] is None
+
+    response = await client.post(
+        "/api/items/batch",
+        json={"items": [{"title": f"Batch {n}"} for n in range(4)]},
+    )
+    assert response.status_code == 201
+    assert [item["title"] for item in response.json()] == [
+        f"Batch {n}" for n in range(4)
+    ]
+
+    response = await client.get("/api/items", params={"limit": 3})
+    page = response.json()
+    assert [item["title"] for item in page["items"]] == ["First", "Batch 0", "Batch 1"]
+    response = await client.get(
+        "/api/items",
+        params={"limit": 3, "cursor": page["next_cursor"]},
+    )
+    page = response.json()
+    assert [item["title"] for item in page["items"]] == ["Batch 2", "Batch 3"]
+    assert page["next_cursor"] is None
+
+    response = await client.patch(
+        f"/api/items/{first['id']}",
+        json={"description": "Updated"},
+    )
+    assert response.json() == {**first, "description": "Updated", "version": 2}
+
+    response = await client.delete(f"/api/items/{first['id']}")
+    assert response.status_code == 204
+    response = await client.get(f"/api/items/{first['id']}")
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Item not found"}
+
+
+async def test_items_json_api_requires_auth(client: AsyncClient) -> None:
+    """Test that the JSON API answers 401 instead of redirecting."""
+    client.cookies.clear()
+    response = await client.get("/api/items")
+    assert response.status_code == 401
+
+
+async def test_stale_item_version_is_rejected(client: AsyncClient) -> None:
+    """Test that an edit based on an old version gets a 409, not a lost update."""
+    await login(client, "versions@example.com")
+    item = (await client.post("/api/items", json={"title": "Draft"})).json()
+    assert item["version"] == 1
+
+    response = await client.get(f"/items/{item['id']}/edit")
+    assert 'name="version" value="1"' in response.text
+
+    response = await client.put(
+        f"/items/{item['id']}",
+        json={"title": "First tab", "version": 1},
+    )
+    assert response.status_code == 200
+    assert "First tab" in response.text
+
+    response = await client.put(
+        f"/items/{item['id']}",
+        json={"title": "Second tab", "version": 1},
+    )
+    assert response.status_code == 409
+    assert 'name="version" value="2"' in response.text
+
+    response = await client.patch(
+        f"/api/items/{item['id']}",
+        json={"title": "API", "version": 1},
+    )
+    assert response.status_code == 409
+
+    # The API returns the version to send back.
+    current = (await client.get(f"/api/items/{item['id']}")).json()
+    assert current["version"] == 2
+    response = await client.patch(
+        f"/api/items/{item['id']}",
+        json={"title": "API", "version": current["version"]},
+    )
+    assert response.json()["version"] == 3
+
+    # Retagging alone is checked against the version and bumps it.
+    response = await client.patch(
+        f"/api/items/{item['id']}",
+        json={"tags": ["urgent"], "version": 2},
+    )
+    assert response.status_code == 409
+    response = await client.patch(
+        f"/api/items/{item['id']}",
+        json={"tags": ["urgent"], "version": 3},
+    )
+    assert response.json()["version"] == 4
+
+    response = await client.delete(f"/items/{item['id']}")
+    assert response.status_code == 200
+    response = await client.delete(f"/items/{item['id']}")
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize(
+    "view",
+    [{}, {"scroll": "true"}, {"tag": "keep"}, {"include_archived": "true"}],
+)
+async def test_create_and_delete_keep_the_list_view(
+    client: AsyncClient,
+    view: dict[str, str],
+) -> None:
+    """Test that the list re-rendered after a change keeps its mode and filter."""
+    await login(client, f"view-{'-'.join(view) or 'paged'}@example.com")
+    await client.post("/api/items", json={"title": "Other"})
+    headers = {"HX-Request": "true"}
+    other_listed = "tag" not in view
+    mode = [
+        f"scroll={'scroll' in view}",
+        f"include_archived={'include_archived' in view}",
+    ]
+
+    response = await client.post(
+        "/items",
+        params=view,
+        json={"title": "New", "tags": ["keep"]},
+        headers=headers,
+    )
+    assert ">New</div>" in response.text
+    assert (">Other</div>" in response.text) is other_listed
+    new_id = (await client.get("/api/items")).json()["items"][-1]["id"]
+    match = re.search(rf'hx-delete="([^"]*/items/{new_id}\?[^"]+)"', response.text)
+    assert match is not None
+    delete_url = html.unescape(match[1])
+    assert all(param in delete_url for param in mode)
+    assert f"tag={view.get('tag', '')}&" in delete_url
+
+    response = await client.delete(delete_url, headers=headers)
+    assert response.status_code == 200
+    assert ">New</div>" not in response.text
+    assert (">Other</div>" in response.text) is other_listed
+    if other_listed:
+        assert all(param in response.text for param in mode)
@@ -0,0 +1,90 @@
+import logging
+from typing import Any
+
+from fastapi_users.db import SQLAlchemyUserDatabase
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.job import Job
+from app.models.user import User, UserManager, user_token
+from app.services import user_hooks  # noqa: F401 - registers job handlers
+from app.services.jobs import HANDLERS, JobWorkerPool, enqueue
+from app.tests.conftest import TestingSessionLocal
+
+
+async def test_job_runs_and_is_deleted():
+    """Test that a claimed job runs its handler and is removed."""
+    seen: list[dict[str, Any]] = []
+
+    async def handler(payload: dict[str, Any], _: AsyncSession) -> None:
+        seen.append(payload)
+
+    HANDLERS["test.ok"] = handler
+    async with TestingSessionLocal() as session:
+        await enqueue(session, "test.ok", {"n": 1})
+        await session.commit()
+
+    pool = JobWorkerPool(TestingSessionLocal)
+    assert await pool.run_one() is True
+    assert await pool.run_one() is False
+    assert seen == [{"n": 1}]
+    assert pool.metrics.succeeded == 1
+
+    async with TestingSessionLocal() as session:
+        assert (await session.execute(select(Job))).first() is None
+
+
+async def test_failing_job_is_retried_then_failed(monkeypatch):
+    """Test that failures back off and end as 'failed' after max attempts."""
+
+    async def handler(payload: dict[str, Any], _: AsyncSession) -> None:
+        raise ValueError("boom")
+
+    HANDLERS["test.fail"] = handler
+    monkeypatch.setattr(settings, "JOBS_MAX_ATTEMPTS", 2)
+    monkeypatch.setattr(settings, "JOBS_RETRY_BACKOFF", 0)
+    async with TestingSessionLocal() as session:
+        await enqueue(session, "test.fail", {})
+        await session.commit()
+
+    pool = JobWorkerPool(TestingSessionLocal)
+    assert await pool.run_one() is True
+    assert await pool.run_one() is True
+    assert await pool.run_one() is False
+    assert (pool.metrics.retried, pool.metrics.failed) == (1, 1)
+
+    async with TestingSessionLocal() as session:
+        job = (await session.execute(select(Job))).scalar_one()
+    assert job.status == "failed"
+    assert job.attempts == 2
+    assert job.last_error == "ValueError: boom"
+
+
+async def test_user_tokens_are_minted_by_the_job_not_stored(caplog):
+    """Test that reset tokens stay out of jobs.payload but can be minted."""
+    async with TestingSessionLocal() as session:
+        user = User(
+            email="token@example.com",
+            hashed_password="x",  # noqa: S106
+            is_active=True,
+        )
+        session.add(user)
+        await session.commit()
+        manager = UserManager(SQLAlchemyUserDatabase(session, User))
+        await manager.forgot_password(user)
+        job = (await session.execute(select(Job))).scalar_one()
+        assert job.payload == {"user_id": str(user.id), "email": user.email}
+
+        token = await user_token(session, user, "reset")
+        assert token is not None
+        await manager.reset_password(token, "a-new-long-password")
+        # Verified users get no new verification token.
+        user.is_verified = True
+        assert await user_token(session, user, "verify") is None
+
+    caplog.set_level(logging.DEBUG, logger="app.services.user_hooks")
+    pool = JobWorkerPool(TestingSessionLocal)
+    assert await pool.run_one() is True
+    assert pool.metrics.succeeded == 1
+    assert "Reset token for token@example.com: " in caplog.text
@@ -0,0 +1,74 @@
+import json
+import logging
+from logging.handlers import QueueHandler
+
+import pytest
+from fastapi.testclient import TestClient
+from httpx import AsyncClient
+
+from app.core.logs import JsonFormatter
+from app.core.templates import DeferredTemplateResponse
+from app.main import app
+from app.tests.conftest import engine
+from app.tests.test_items_api import login
+
+
+async def test_access_log_records_route_user_and_db_time(
+    client: AsyncClient,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Test the structured access log of an authenticated request."""
+    await login(client, "logs@example.com")
+    caplog.clear()
+
+    with caplog.at_level(logging.INFO, logger="app.access"):
+        response = await client.get("/items")
+    assert response.status_code == 200
+
+    (record,) = [r for r in caplog.records if r.name == "app.access"]
+    fields = record.fields  # type: ignore[attr-defined]
+    assert fields["route"] == "list_items"
+    assert fields["status"] == 200
+    assert fields["user_id"] is not None
+    assert fields["db_queries"] > 0
+    assert fields["duration_ms"] >= fields["db_ms"] > 0
+    assert fields["duration_ms"] >= fields["db_hold_ms"] > 0
+
+    line = json.loads(JsonFormatter().format(record))
+    assert line["message"] == "GET /items 200"
+    assert line["route"] == "list_items"
+
+
+async def test_templates_render_after_the_connection_is_released(
+    client: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that no pooled connection is checked out while a page renders."""
+    await login(client, "hold@example.com")
+    await client.post("/api/items", json={"title": "Held"})
+
+    checked_out = []
+    render = DeferredTemplateResponse.render
+
+    def recording_render(self: DeferredTemplateResponse, content: str | None) -> bytes:
+        # Response.__init__ renders the empty placeholder body too.
+        if content is not None:
+            checked_out.append(engine.pool.checkedout())  # type: ignore[attr-defined]
+        return render(self, content)
+
+    monkeypatch.setattr(DeferredTemplateResponse, "render", recording_render)
+    response = await client.get("/items")
+    assert response.status_code == 200
+    assert "Held" in response.text
+    assert checked_out == [0]
+
+
+def test_logging_is_set_up_by_the_lifespan_only():
+    """Test that importing the app leaves logging alone until it starts."""
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+    assert not any(isinstance(handler, QueueHandler) for handler in handlers)
+
+    with TestClient(app):
+        assert [type(handler) for handler in root.handlers] == [QueueHandler]
+    assert root.handlers == handlers
@@ -33,3 +33,11 @@ def test_items_requires_auth():
         response = client.get("/items", follow_redirects=False)
         # Should redirect to login or return 401
         assert response.status_code in [302, 401]
+
+
+def test_readiness():
+    """Test that the readiness probe reports ready once startup has run."""
+    with TestClient(app) as client:
+        response = client.get("/ready")
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"
@@ -0,0 +1,60 @@
+from httpx import AsyncClient
+
+from app.core.page_cache import page_cache
+from app.tests.test_items_api import login
+
+
+async def test_anonymous_pages_are_served_prerendered(client: AsyncClient) -> None:
+    """Test hits, precompressed variants, ETag revalidation and the bypass."""
+    client.cookies.clear()
+    page_cache.clear()
+    before = page_cache.snapshot()
+
+    first = await client.get("/auth/login", headers={"Accept-Encoding": "gzip"})
+    second = await client.get("/auth/login", headers={"Accept-Encoding": "gzip"})
+    assert first.status_code == second.status_code == 200
+    assert second.headers["content-encoding"] == "gzip"
+    assert second.text == first.text
+    assert page_cache.snapshot()["hits"] == before["hits"] + 1
+    assert "Cookie" in first.headers["vary"]
+    assert "Cookie" in second.headers["vary"]
+
+    response = await client.get(
+        "/auth/login",
+        headers={"If-None-Match": second.headers["etag"]},
+    )
+    assert response.status_code == 304
+
+    # Parameters the templates read are part of the key; others are ignored.
+    response = await client.get("/auth/login", params={"registered": "true"})
+    assert "Account created successfully" in response.text
+    assert page_cache.snapshot()["pages"] == 2
+    response = await client.get("/auth/login", params={"utm_source": "x"})
+    assert "Account created successfully" not in response.text
+    assert page_cache.snapshot()["pages"] == 2
+
+    await login(client, "page-cache@example.com")
+    response = await client.get("/")
+    assert "page-cache@example.com" in response.text
+    assert "Cookie" in response.headers["vary"]
+    assert page_cache.snapshot()["bypassed"] == before["bypassed"] + 1
+
+
+async def test_host_is_normalised_in_the_cache_key(client: AsyncClient) -> None:
+    """Test that spellings of one host share a page and bad hosts bypass."""
+    client.cookies.clear()
+    page_cache.clear()
+    before = page_cache.snapshot()
+
+    for host in ("test", "TEST:80", "test."):
+        response = await client.get("/auth/register", headers={"Host": host})
+        assert response.status_code == 200
+    assert page_cache.snapshot()["pages"] == 1
+    assert page_cache.snapshot()["hits"] == before["hits"] + 2
+
+    response = await client.get("/auth/register", headers={"Host": "test:8080"})
+    assert page_cache.snapshot()["pages"] == 2
+
+    response = await client.get("/auth/register", headers={"Host": "te st/x"})
+    assert page_cache.snapshot()["pages"] == 2
+    assert page_cache.snapshot()["bypassed"] == before["bypassed"] + 1
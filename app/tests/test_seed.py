@@ -0,0 +1,41 @@
+from app.services.seed import (
+    TITLE_MAX_LENGTH,
+    SeedOptions,
+    generate_item_chunk,
+    generate_users,
+    item_chunks,
+    item_counts,
+)
+
+
+def test_item_counts_are_exact_and_deterministic():
+    """Test that the heavy-tailed split adds up and repeats for a seed."""
+    options = SeedOptions(users=50, items_per_user=20, seed=1)
+    counts = item_counts(options)
+    assert sum(counts) == 1_000
+    assert counts == item_counts(options)
+    assert max(counts) > options.items_per_user
+
+
+def test_generated_rows_are_deterministic():
+    """Test that users and items are identical across runs with one seed."""
+    options = SeedOptions(users=5, seed=3)
+    users = generate_users(options, "hash")
+    assert users == generate_users(options, "hash")
+    assert len({user["email"] for user in users}) == 5
+
+    owners = [(user["id"], 10) for user in users]
+    items = generate_item_chunk(options.seed, 0, owners)
+    assert items == generate_item_chunk(options.seed, 0, owners)
+    assert len(items) == 50
+    assert all(0 < len(item["title"]) <= TITLE_MAX_LENGTH for item in items)
+
+
+def test_heavy_users_are_split_across_chunks():
+    """Test that no chunk exceeds the batch size, whatever a user owns."""
+    options = SeedOptions(users=3, seed=3)
+    users = generate_users(options, "hash")
+    chunks = list(item_chunks(users, [25, 3, 4], batch_size=10))
+    assert [sum(count for _, count in chunk) for chunk in chunks] == [10, 10, 10, 2]
+    assert chunks[0] == [(users[0]["id"], 10)]
+    assert chunks[2] == [(users[0]["id"], 5), (users[1]["id"], 3), (users[2]["id"], 2)]
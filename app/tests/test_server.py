@@ -0,0 +1,64 @@
+import sys
+
+import pytest
+from uvicorn.main import main as uvicorn_cli
+
+from app.core.config import Settings
+from app.core.server import (
+    APP_PATH,
+    GUNICORN_WORKER,
+    production_command,
+    worker_count,
+)
+
+
+def option(command: list[str], name: str) -> str:
+    return command[command.index(name) + 1]
+
+
+def test_uvicorn_command_from_settings():
+    """Test that SERVER_* settings become valid uvicorn options."""
+    settings = Settings(
+        SERVER_WORKERS=3,
+        SERVER_PORT=9000,
+        SERVER_KEEPALIVE=7,
+        SERVER_LIMIT_CONCURRENCY=500,
+        ACCESS_LOG=True,
+    )
+    command = production_command(settings)
+    assert command[:4] == [sys.executable, "-m", "uvicorn", APP_PATH]
+    assert option(command, "--workers") == "3"
+    assert option(command, "--port") == "9000"
+    assert option(command, "--timeout-keep-alive") == "7"
+    assert option(command, "--limit-concurrency") == "500"
+    assert "--no-access-log" in command
+
+    # uvicorn's own CLI accepts every option we pass.
+    context = uvicorn_cli.make_context("uvicorn", command[3:])
+    assert context.params["workers"] == 3
+    assert context.params["limit_concurrency"] == 500
+
+    command = production_command(Settings(SERVER_UDS="/run/app.sock"))
+    assert option(command, "--uds") == "/run/app.sock"
+    assert "--host" not in command
+
+
+def test_gunicorn_command_when_preloading():
+    """Test the gunicorn command line and the default worker count."""
+    settings = Settings(SERVER_PRELOAD=True, SERVER_HOST="127.0.0.1")
+    command = production_command(settings)
+    assert command[:4] == [sys.executable, "-m", "gunicorn", APP_PATH]
+    assert "--preload" in command
+    assert option(command, "--worker-class") == GUNICORN_WORKER
+    assert option(command, "--bind") == "127.0.0.1:8000"
+    assert option(command, "--workers") == str(worker_count(settings))
+    assert worker_count(settings) >= 1
+
+
+def test_gunicorn_worker_config():
+    """Test that the gunicorn worker passes our settings on to uvicorn."""
+    pytest.importorskip("gunicorn")
+    from app.core.gunicorn_worker import Worker
+
+    assert Worker.CONFIG_KWARGS["server_header"] is False
+    assert Worker.CONFIG_KWARGS["loop"] in ("uvloop", "asyncio")
@@ -0,0 +1,158 @@
+import uuid
+from collections import Counter
+
+import pytest
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.schema import CreateTable
+
+from app.core.database import Base
+from app.core.sharding import SHARD_METADATA, SHARDED_TABLES, HashRing, ShardRouter
+from app.models.attachment import Attachment
+from app.models.id_sequence import IdSequence
+from app.models.item import Item
+
+
+def test_hash_ring_is_stable_and_balanced():
+    nodes = ["a", "b", "c"]
+    ring = HashRing(nodes)
+    owners = [str(uuid.UUID(int=n)) for n in range(3000)]
+
+    assert [ring.node_for(o) for o in owners] == [
+        HashRing(nodes).node_for(o) for o in owners
+    ]
+    counts = Counter(ring.node_for(o) for o in owners)
+    assert min(counts.values()) > 600
+
+    # Adding a node only moves keys onto the new node.
+    grown = HashRing([*nodes, "d"])
+    moved = [o for o in owners if grown.node_for(o) != ring.node_for(o)]
+    assert all(grown.node_for(o) == "d" for o in moved)
+    assert len(moved) < len(owners) / 2
+
+
+def test_shard_tables_have_no_foreign_keys_to_user():
+    for table in SHARD_METADATA.sorted_tables:
+        ddl = str(CreateTable(table).compile(dialect=postgresql.dialect()))
+        assert "REFERENCES items" in ddl or "REFERENCES" not in ddl
+
+
+async def create_primary(tmp_path):
+    primary = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/primary.db")
+    async with primary.begin() as conn:
+        await conn.run_sync(
+            Base.metadata.create_all,
+            tables=[*SHARDED_TABLES, IdSequence.__table__],
+        )
+    return primary
+
+
+@pytest.mark.asyncio
+async def test_rebalance_moves_items_to_owner_shard(tmp_path):
+    """Test that moved items and their attachments keep their ids."""
+    primary = await create_primary(tmp_path)
+    urls = [f"sqlite+aiosqlite:///{tmp_path}/shard{n}.db" for n in range(2)]
+    router = ShardRouter(urls, primary=primary)
+    await router.create_tables()
+    owner_id = uuid.uuid4()
+    source = next(url for url in urls if url != router.shard_for(owner_id))
+    try:
+        ids = await router.allocators["items"].allocate(5)
+        async with router.engines[source].begin() as conn:
+            await conn.execute(
+                insert(Item),
+                [
+                    {"id": item_id, "title": f"item {n}", "owner_id": owner_id}
+                    for n, item_id in enumerate(ids)
+                ],
+            )
+            [file_id] = await router.allocators["attachments"].allocate(1)
+            await conn.execute(
+                insert(Attachment).values(
+                    id=file_id,
+                    item_id=ids[0],
+                    owner_id=owner_id,
+                    filename="a.txt",
+                    content_type="text/plain",
+                    size=1,
+                    sha256="0" * 64,
+                ),
+            )
+
+        assert await router.rebalance(owner_id, batch_size=2) == 5
+
+        async with router.session_for(owner_id) as session:
+            rows = await session.execute(
+                select(Item.id, Item.title)
+                .where(Item.owner_id == owner_id)
+                .order_by(Item.id),
+            )
+            assert [tuple(row) for row in rows] == [
+                (item_id, f"item {n}") for n, item_id in enumerate(ids)
+            ]
+            attachment = await session.scalar(select(Attachment))
+            assert (attachment.id, attachment.item_id) == (file_id, ids[0])
+        async with router.engines[source].connect() as conn:
+            assert await conn.scalar(select(func.count()).select_from(Item)) == 0
+    finally:
+        await router.dispose()
+        await primary.dispose()
+
+
+@pytest.mark.asyncio
+async def test_allocated_ids_are_unique_across_shards(tmp_path):
+    """Test that ids start above existing rows and never repeat."""
+    primary = await create_primary(tmp_path)
+    async with primary.begin() as conn:
+        await conn.execute(
+            insert(Item).values(id=41, title="old", owner_id=uuid.uuid4()),
+        )
+    urls = [f"sqlite+aiosqlite:///{tmp_path}/shard{n}.db" for n in range(2)]
+    router = ShardRouter(urls, primary=primary)
+    other = ShardRouter(urls, primary=primary)  # another worker
+    await router.create_tables()
+    try:
+        allocators = [router.allocators["items"], other.allocators["items"]]
+        for allocator in allocators:
+            allocator.block_size = 3
+        ids = [
+            item_id
+            for _ in range(4)
+            for allocator in allocators
+            for item_id in await allocator.allocate(2)
+        ]
+        assert min(ids) == 42
+        assert len(set(ids)) == len(ids)
+    finally:
+        await router.dispose()
+        await other.dispose()
+        await primary.dispose()
+
+
+@pytest.mark.asyncio
+async def test_rebalance_moves_items_off_the_primary(tmp_path):
+    """Test that items written before sharding was enabled reach a shard."""
+    primary = await create_primary(tmp_path)
+    router = ShardRouter(
+        [f"sqlite+aiosqlite:///{tmp_path}/shard{n}.db" for n in range(2)],
+        primary=primary,
+    )
+    await router.create_tables()
+    owner_id = uuid.uuid4()
+    try:
+        async with primary.begin() as conn:
+            await conn.execute(
+                insert(Item),
+                [{"title": f"old {n}", "owner_id": owner_id} for n in range(3)],
+            )
+
+        assert await router.rebalance(owner_id) == 3
+
+        async with router.session_for(owner_id) as session:
+            assert await session.scalar(select(func.count()).select_from(Item)) == 3
+        async with primary.connect() as conn:
+            assert await conn.scalar(select(func.count()).select_from(Item)) == 0
+    finally:
+        await router.dispose()
+        await primary.dispose()
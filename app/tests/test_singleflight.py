@@ -0,0 +1,48 @@
+import asyncio
+
+from app.core.singleflight import SingleFlight
+
+
+async def test_concurrent_identical_reads_share_one_execution() -> None:
+    """Test coalescing of identical reads and invalidation by writes."""
+    flight = SingleFlight()
+    calls = 0
+    release = asyncio.Event()
+
+    async def fetch() -> int:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return calls
+
+    readers = [asyncio.create_task(flight.do("u1", "page-1", fetch)) for _ in range(3)]
+    other_key = asyncio.create_task(flight.do("u1", "page-2", fetch))
+    await asyncio.sleep(0)
+    # A write in scope: later readers don't join the in-flight read.
+    flight.invalidate("u1")
+    after_write = asyncio.create_task(flight.do("u1", "page-1", fetch))
+    await asyncio.sleep(0)
+    release.set()
+
+    results = await asyncio.gather(*readers, other_key, after_write)
+    assert results[:3] == [results[0]] * 3
+    assert calls == 3
+    assert flight.snapshot()["coalesced"] == 2
+    assert flight.snapshot()["in_flight"] == 0
+
+
+def test_generations_are_bounded_and_never_go_back():
+    """Test that evicted scopes keep a generation at least their last one."""
+    flight = SingleFlight(max_scopes=2)
+    before = flight.generation("a")
+    flight.invalidate("a")
+    invalidated = flight.generation("a")
+    assert invalidated > before
+
+    flight.invalidate("b")
+    flight.invalidate("c")
+    assert flight.snapshot()["scopes"] == 2
+    # "a" was evicted, and its generation didn't return to an older value.
+    assert flight.generation("a") >= invalidated
+    flight.invalidate("a")
+    assert flight.generation("a") > invalidated
@@ -0,0 +1,56 @@
+import uuid
+
+from httpx import AsyncClient
+
+from app.services.suggestions import TitleIndex, TitleIndexCache
+from app.tests.test_items_api import login
+
+
+def test_title_index_matches_word_prefixes():
+    index = TitleIndex([(1, "Grocery list"), (2, "Gift ideas"), (3, "Packing list")])
+    assert index.complete("gr", 10) == ["Grocery list"]
+    assert index.complete("LI", 10) == ["Grocery list", "Packing list"]
+    assert index.complete("g", 1) == ["Gift ideas"]
+
+    index.put(2, "Holiday gifts")
+    index.discard(1)
+    assert index.complete("g", 10) == ["Holiday gifts"]
+    assert index.complete("li", 10) == ["Packing list"]
+
+
+async def test_cache_evicts_least_recently_used_owner():
+    cache = TitleIndexCache(max_entries=3)
+    first, second = uuid.uuid4(), uuid.uuid4()
+
+    async def load_first():
+        return [(1, "alpha beta")]
+
+    async def load_second():
+        return [(2, "gamma delta")]
+
+    assert await cache.complete(first, "a", load_first) == ["alpha beta"]
+    assert await cache.complete(second, "d", load_second) == ["gamma delta"]
+    assert cache.snapshot()["users"] == 1
+    assert cache.snapshot()["evictions"] == 1
+
+    cache.put(second, 3, "epsilon")
+    assert await cache.complete(second, "eps", load_second) == ["epsilon"]
+    assert cache.snapshot()["builds"] == 2
+
+
+async def test_suggest_endpoint_tracks_writes(client: AsyncClient) -> None:
+    """Test suggestions for the logged-in user, updated by item writes."""
+    await login(client, "suggest@example.com")
+    await client.post("/api/items", json={"title": "Weekly report"})
+
+    response = await client.get("/items/suggest", params={"search": "wee"})
+    assert '<option value="Weekly report">' in response.text
+
+    response = await client.post("/api/items", json={"title": "Weekend plans"})
+    item_id = response.json()["id"]
+    response = await client.get("/items/suggest", params={"search": "wee"})
+    assert "Weekend plans" in response.text
+
+    await client.delete(f"/api/items/{item_id}")
+    response = await client.get("/items/suggest", params={"search": "wee"})
+    assert "Weekend plans" not in response.text
@@ -0,0 +1,115 @@
+import re
+import time
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from app.models.item import Item
+from app.models.tag import Tag
+from app.services.tags import FacetCache, _create_tags, set_item_tags
+from app.tests.conftest import TestingSessionLocal
+from app.tests.test_items_api import login
+
+FACET = re.compile(r"(\w+) <span class=\"opacity-75\">\((\d+)\)</span>")
+
+
+async def facets(client: AsyncClient, **params: str) -> dict[str, int]:
+    response = await client.get(
+        "/items",
+        params=params,
+        headers={"HX-Request": "true"},
+    )
+    return {name: int(count) for name, count in FACET.findall(response.text)}
+
+
+async def test_tag_filter_combines_with_search_and_facets(client: AsyncClient) -> None:
+    """Test filtering by tag with a search, and facet counts per search."""
+    await login(client, "tags@example.com")
+    response = await client.post(
+        "/api/items/batch",
+        json={
+            "items": [
+                {"title": "Buy milk", "tags": "Home, errand"},
+                {"title": "Buy stamps", "tags": ["errand"]},
+                {"title": "Write report", "tags": ["work"]},
+            ],
+        },
+    )
+    assert response.status_code == 201
+
+    response = await client.get("/api/items", params={"tag": "errand"})
+    assert [row["title"] for row in response.json()["items"]] == [
+        "Buy milk",
+        "Buy stamps",
+    ]
+
+    response = await client.get(
+        "/items",
+        params={"tag": "home", "search": "buy"},
+        headers={"HX-Request": "true"},
+    )
+    assert "Buy milk" in response.text
+    assert "Buy stamps" not in response.text
+
+    assert await facets(client) == {"errand": 2, "home": 1, "work": 1}
+    assert await facets(client, search="stamps") == {"errand": 1}
+
+
+async def test_facet_counts_follow_retagging_and_deletes(client: AsyncClient) -> None:
+    """Test that tag counts are adjusted by updates and deletes."""
+    await login(client, "retag@example.com")
+    first = (
+        await client.post("/api/items", json={"title": "One", "tags": ["a", "b"]})
+    ).json()
+    second = (
+        await client.post("/api/items", json={"title": "Two", "tags": ["a"]})
+    ).json()
+    assert await facets(client) == {"a": 2, "b": 1}
+
+    response = await client.patch(
+        f"/api/items/{first['id']}",
+        json={"tags": ["b", "c"]},
+    )
+    assert response.status_code == 200
+    assert await facets(client) == {"a": 1, "b": 1, "c": 1}
+
+    await client.delete(f"/api/items/{second['id']}")
+    assert await facets(client) == {"b": 1, "c": 1}
+
+    response = await client.delete(f"/items/{first['id']}")
+    assert response.status_code == 200
+    assert await facets(client) == {}
+
+
+def test_facet_cache_entries_expire(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that cached counts expire, so other workers' writes show up."""
+    cache = FacetCache(max_entries=10, ttl=5)
+    now = 1000.0
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    cache.put("key", [("a", 1)])
+    assert cache.get("key") == [("a", 1)]
+    now += 5
+    assert cache.get("key") is None
+    assert cache.snapshot()["entries"] == 0
+
+
+async def test_concurrently_created_tags_are_reused(client: AsyncClient) -> None:
+    """Test that losing the race to create a tag reuses the winner's."""
+    await login(client, "tag-race@example.com")
+    item = (await client.post("/api/items", json={"title": "Raced"})).json()
+    async with TestingSessionLocal() as session:
+        result = await session.execute(
+            select(Item.owner_id).where(Item.id == item["id"]),
+        )
+        owner_id = result.scalar_one()
+        winner = Tag(owner_id=owner_id, name="shared")
+        session.add(winner)
+        await session.commit()
+
+        tag_ids = await _create_tags(session, owner_id, ["fresh", "shared"])
+        assert tag_ids["shared"] == winner.id
+        await set_item_tags(session, owner_id, item["id"], ["fresh", "shared"])
+        await session.commit()
+
+    assert await facets(client) == {"fresh": 1, "shared": 1}